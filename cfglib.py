@@ -95,6 +95,86 @@ migrate_opts = [
                help='Number retry if except Performing error'),
     cfg.IntOpt('time_wait', default='5',
                help='Time wait if except Performing error'),
+    cfg.IntOpt('instances_workers', default='1',
+               help='Number of instances migrated at the same time'),
+    cfg.BoolOpt('instances_pipeline', default=False,
+                help='migrate instances by stages: the next instances are '
+                     'prepared while the current one is transferred, '
+                     'instances_workers processes for every stage'),
+    cfg.IntOpt('pipeline_queue_size', default='1',
+               help='Number of prepared instances waiting for transfer'),
+    cfg.StrOpt('work_queue', default='',
+               help='path to the SQLite work queue of instances for '
+                    'workers (fab worker) on transition hosts, empty - '
+                    'instances are migrated by this process only'),
+    cfg.IntOpt('work_queue_lease', default='600',
+               help='Seconds a job of the work queue is kept by a worker '
+                    'which does not renew it (the worker died), then it '
+                    'is given to another worker'),
+    cfg.IntOpt('scheduler_workers', default='1',
+               help='Number of tasks of the process run at the same time'),
+    cfg.BoolOpt('auto_parallel', default=False,
+                help='run tasks of the process together if the keys of the '
+                     'namespace they read and write do not overlap, '
+                     'see fab dependencies'),
+    cfg.IntOpt('thread_workers', default='0',
+               help='Number of thread tasks (&) run at the same time, '
+                    '0 - no limit'),
+    cfg.IntOpt('max_transfers', default='0',
+               help='Max number of data transfers run at the same time, '
+                    'the number is adapted to the throughput up to it, '
+                    '0 - no limit'),
+    cfg.IntOpt('transfer_epoch', default='60',
+               help='Seconds between adjustments of the number of '
+                    'transfers'),
+    cfg.IntOpt('async_workers', default='20',
+               help='Number of API calls of coroutine tasks run at the '
+                    'same time'),
+    cfg.BoolOpt('memoize', default=False,
+                help='do the same work for instances of the same image '
+                     'once: base images are downloaded once to temp of '
+                     'the cloud and copied for every instance, results '
+                     'are kept in lock_path during the migration'),
+    cfg.StrOpt('lock_path', default='',
+               help='directory of locks of resources shared by workers '
+                    '(images, networks), it has to be shared with workers '
+                    'of the work queue on other hosts, empty - temporary '
+                    'directory'),
+    cfg.StrOpt('journal_path', default='',
+               help='path to the journal for resuming of migration, '
+                    'empty - no journal'),
+    cfg.StrOpt('profile_path', default='',
+               help='path prefix of the profiling reports of tasks, '
+                    'empty - no profiling'),
+    cfg.ListOpt('profile_tasks', default=[],
+                help='names of classes of tasks run under cProfile'),
+    cfg.StrOpt('throughput_path', default='migrate.throughput',
+               help='path to the history of throughput between hosts, '
+                    'empty - no history'),
+    cfg.IntOpt('default_throughput', default='50',
+               help='throughput in MB/s between hosts without history'),
+    cfg.IntOpt('status_timeout', default='3600',
+               help='seconds to wait for a volume or an image to get '
+                    'a status'),
+    cfg.BoolOpt('quarantine_instances', default=True,
+                help='put failed instances to quarantine and go on with '
+                     'the other ones instead of stopping the migration'),
+    cfg.IntOpt('task_retry', default='0',
+               help='Number of retries of a failed task of an instance'),
+    cfg.IntOpt('task_retry_backoff', default='5',
+               help='Seconds before the first retry of a task, doubled '
+                    'with every next one'),
+    cfg.StrOpt('migration_order', default='fifo',
+               help='order of migration of instances: fifo - as they are '
+                    'found, lpt - largest first (sizes are taken from the '
+                    'plan), waves - by waves of instances without shared '
+                    'volumes, tenant after tenant'),
+    cfg.IntOpt('wave_size', default='0',
+               help='Max number of instances in a wave of the plan, '
+                    '0 - no limit'),
+    cfg.IntOpt('wave_host_limit', default='2',
+               help='Max number of instances of a source host in a wave '
+                    'of the plan, 0 - no limit'),
 ]
 
 mail = cfg.OptGroup(name='mail',
@@ -125,6 +205,21 @@ src_mysql_opts = [
                help='driver for connection'),
 ]
 
+def api_rate_opts():
+    """ Limits of API calls of a service, see rate_limit.TokenBucket """
+
+    return [
+        cfg.FloatOpt('api_read_rate', default='0',
+                     help='API calls reading (get, list) per second, '
+                          'shared by all the workers, 0 - no limit'),
+        cfg.FloatOpt('api_write_rate', default='0',
+                     help='API calls writing (create, update, delete) per '
+                          'second, shared by all the workers, 0 - no limit'),
+        cfg.IntOpt('api_burst', default='1',
+                   help='Number of API calls allowed at once over the rate')
+    ]
+
+
 src_compute = cfg.OptGroup(name='src_compute',
                            title='Config service for compute')
 
@@ -139,7 +234,7 @@ src_compute_opts = [
                help='convert ephemeral disk to'),
     cfg.StrOpt('host_eph_drv', default='-',
                help='host ephemeral drive')
-]
+] + api_rate_opts()
 
 
 src_storage = cfg.OptGroup(name='src_storage',
@@ -162,7 +257,7 @@ src_storage_opts = [
                help='name of pool for volumes in Ceph RBD storage'),
     cfg.StrOpt('snapshot_name_template', default='snapshot-',
                help='template for creating names of snapshots on storage backend')
-]
+] + api_rate_opts()
 
 src_image = cfg.OptGroup(name='src_image',
                          title='Config service for images')
@@ -172,15 +267,18 @@ src_image_opts = [
                help='name service for images'),
     cfg.StrOpt('backend', default='file',
                help='backend for images')
-]
+] + api_rate_opts()
 
 src_identity = cfg.OptGroup(name='src_identity',
                             title='Config service for identity')
 
 src_identity_opts = [
     cfg.StrOpt('service', default='keystone',
-               help='name service for keystone')
-]
+               help='name service for keystone'),
+    cfg.IntOpt('catalog_ttl', default='300',
+               help='seconds tenants, users, services and endpoints are '
+                    'kept before they are listed again, 0 - every time')
+] + api_rate_opts()
 
 
 src_network = cfg.OptGroup(name='src_network',
@@ -190,7 +288,7 @@ src_network_opts = [
     cfg.StrOpt('service', default='auto',
                help='name service for network, '
                     'auto - detect avaiable service')
-]
+] + api_rate_opts()
 
 src_objstorage = cfg.OptGroup(name='src_objstorage',
                               title='Config service for object storage')
@@ -228,7 +326,7 @@ dst_compute_opts = [
                help='convert ephemeral disk to'),
     cfg.StrOpt('host_eph_drv', default='-',
                help='host ephemeral drive')
-]
+] + api_rate_opts()
 
 
 dst_storage = cfg.OptGroup(name='dst_storage',
@@ -251,7 +349,7 @@ dst_storage_opts = [
                help='name of pool for volumes in Ceph RBD storage'),
     cfg.StrOpt('snapshot_name_template', default='snapshot-',
                help='template for creating names of snapshots on storage backend')
-]
+] + api_rate_opts()
 
 dst_image = cfg.OptGroup(name='dst_image',
                          title='Config service for images')
@@ -263,15 +361,18 @@ dst_image_opts = [
                 help='convert to raw images'),
     cfg.StrOpt('backend', default='file',
                help='backend for images')
-]
+] + api_rate_opts()
 
 dst_identity = cfg.OptGroup(name='dst_identity',
                             title='Config service for identity')
 
 dst_identity_opts = [
     cfg.StrOpt('service', default='keystone',
-               help='name service for keystone')
-]
+               help='name service for keystone'),
+    cfg.IntOpt('catalog_ttl', default='300',
+               help='seconds tenants, users, services and endpoints are '
+                    'kept before they are listed again, 0 - every time')
+] + api_rate_opts()
 
 
 dst_network = cfg.OptGroup(name='dst_network',
@@ -283,7 +384,7 @@ dst_network_opts = [
                     'auto - detect available service'),
     cfg.ListOpt('interfaces_for_instance', default='net04',
                 help='list interfaces for connection to instance')
-]
+] + api_rate_opts()
 
 dst_objstorage = cfg.OptGroup(name='dst_objstorage',
                               title='Config service for object storage')
@@ -32,5 +32,14 @@ class CloudFerry(object):
     def __init__(self, config):
         self.config = config
 
-    def migrate(self, scenario=None):
+    def migrate(self, scenario=None, resume=None, plan_path=None):
+        pass
+
+    def plan(self, path):
+        pass
+
+    def work(self, queue_path, scenario=None):
+        pass
+
+    def dependencies(self, scenario=None):
         pass
@@ -17,15 +17,22 @@ import cloud
 import cloud_ferry
 from cloudferrylib.base.action import copy_var, rename_info, merge, is_end_iter, get_info_iter, create_reference
 from cloudferrylib.os.actions import identity_transporter
+from cloudferrylib.scheduler import dependencies
 from cloudferrylib.scheduler import scheduler
 from cloudferrylib.scheduler import namespace
 from cloudferrylib.scheduler import cursor
+from cloudferrylib.scheduler import journal
+from cloudferrylib.utils import concurrency
+from cloudferrylib.utils import locks
+from cloudferrylib.utils import plan as migration_plan
+from cloudferrylib.utils import profiler
 from cloudferrylib.os.image import glance_image
 from cloudferrylib.os.storage import cinder_storage
 from cloudferrylib.os.network import neutron
 from cloudferrylib.os.identity import keystone
 from cloudferrylib.os.compute import nova_compute
 from cloudferrylib.os.actions import get_info_images
+from cloudferrylib.os.actions import make_plan
 from cloudferrylib.os.actions import transport_instance
 from cloudferrylib.os.actions import attach_used_volumes_via_compute
 from cloudferrylib.os.actions import cleanup_images
@@ -66,6 +73,14 @@ from cloudferrylib.utils.drivers import ssh_file_to_ceph
 from cloudferrylib.os.actions import get_filter
 from cloudferrylib.os.actions import deploy_snapshots
 from cloudferrylib.base.action import is_option
+from cloudferrylib.base.action import distributed_iter
+from cloudferrylib.base.action import parallel_iter
+from cloudferrylib.base.action import pipeline_iter
+from cloudferrylib.base.action import quarantine
+from cloudferrylib.scheduler import coroutine
+from cloudferrylib.scheduler import retry
+
+LOG = utl.get_log(__name__)
 
 
 class OS2OSFerry(cloud_ferry.CloudFerry):
@@ -88,14 +103,20 @@ class OS2OSFerry(cloud_ferry.CloudFerry):
             'SSHFileToFile': ssh_file_to_file.SSHFileToFile,
             'SSHFileToCeph': ssh_file_to_ceph.SSHFileToCeph
         }
+        coroutine.init(self.config.migrate.async_workers)
+        concurrency.init(self.config.migrate.max_transfers,
+                         self.config.migrate.transfer_epoch)
+        locks.init(self.config.migrate.lock_path)
 
-    def migrate(self, scenario=None):
+    def migrate(self, scenario=None, resume=None, plan_path=None):
         namespace_scheduler = namespace.Namespace({
             '__init_task__': self.init,
             'info_result': {
                 utl.INSTANCES_TYPE: {}
             }
         })
+        if plan_path:
+            namespace_scheduler.vars['plan'] = migration_plan.load(plan_path)
         if not scenario:
             process_migration = self.process_migrate()
         else:
@@ -103,8 +124,58 @@ class OS2OSFerry(cloud_ferry.CloudFerry):
             scenario.load_scenario()
             process_migration = scenario.get_net()
         process_migration = cursor.Cursor(process_migration)
-        scheduler_migr = scheduler.Scheduler(namespace=namespace_scheduler, cursor=process_migration)
-        scheduler_migr.start()
+        workers = self.config.migrate.scheduler_workers
+        thread_workers = self.config.migrate.thread_workers
+        if workers > 1:
+            scheduler_migr = scheduler.DagScheduler(namespace=namespace_scheduler, cursor=process_migration,
+                                                    workers=workers, thread_workers=thread_workers,
+                                                    auto_parallel=self.config.migrate.auto_parallel)
+        else:
+            scheduler_migr = scheduler.Scheduler(namespace=namespace_scheduler, cursor=process_migration,
+                                                 thread_workers=thread_workers)
+        if resume:
+            journal.Journal(resume, self.init).load(namespace_scheduler, process_migration)
+        journal_path = self.config.migrate.journal_path or resume
+        if journal_path:
+            scheduler_migr.addJournal(journal.Journal(journal_path, self.init))
+        profile_path = self.config.migrate.profile_path
+        if profile_path:
+            task_profiler = profiler.Profiler(self.config.migrate.profile_tasks)
+            task_profiler.install()
+            scheduler_migr.addProfiler(task_profiler)
+        try:
+            scheduler_migr.start()
+        finally:
+            locks.get_manager().cleanup()
+            if profile_path:
+                task_profiler.uninstall()
+        if profile_path:
+            task_profiler.dump(profile_path)
+        quarantined = namespace_scheduler.vars.get('quarantine')
+        if quarantined:
+            LOG.error("Quarantined, not migrated: %s", quarantined)
+
+    def dependencies(self, scenario=None):
+        if not scenario:
+            process_migration = self.process_migrate()
+        else:
+            scenario.init_tasks(self.init)
+            scenario.load_scenario()
+            process_migration = scenario.get_net()
+        return dependencies.report(process_migration)
+
+    def plan(self, path):
+        namespace_plan = namespace.Namespace({'__init_task__': self.init})
+        process_plan = get_filter.GetFilter(self.init) >> \
+            get_info_instances.GetInfoInstances(self.init, cloud='src_cloud') >> \
+            make_plan.MakePlan(self.init)
+        scheduler_plan = scheduler.Scheduler(namespace=namespace_plan,
+                                             cursor=cursor.Cursor(process_plan))
+        scheduler_plan.start()
+        if scheduler_plan.status_error == scheduler.ERROR:
+            raise scheduler_plan.exception
+        migration_plan.dump(namespace_plan.vars['plan'], path)
+        return namespace_plan.vars['plan']
 
     def process_migrate(self):
         task_resources_transporting = self.transport_resources()
@@ -122,10 +193,65 @@ class OS2OSFerry(cloud_ferry.CloudFerry):
         act_get_filter = get_filter.GetFilter(self.init)
         act_get_info_inst = get_info_instances.GetInfoInstances(self.init, cloud='src_cloud')
         act_cleanup_images = cleanup_images.CleanupImages(self.init)
-        get_next_instance = get_info_iter.GetInfoIter(self.init)
+        policy = self.config.migrate.migration_order
+        get_next_instance = get_info_iter.GetInfoIter(self.init, policy=policy)
         rename_info_iter = rename_info.RenameInfo(self.init, name_result, name_data)
         is_instances = is_end_iter.IsEndIter(self.init)
+        workers = self.config.migrate.instances_workers
+        is_quarantine = self.config.migrate.quarantine_instances
+
+        quarantine_name = 'quarantine' if is_quarantine else None
+
+        if self.config.migrate.work_queue:
+            trans_all_inst = distributed_iter.DistributedIter(
+                self.init,
+                self.migrate_process_instance_isolated,
+                self.config.migrate.work_queue,
+                workers,
+                policy=policy,
+                quarantine_name=quarantine_name,
+                lease=self.config.migrate.work_queue_lease)
+            return act_get_filter >> \
+                act_get_info_inst >> \
+                init_iteration_instance >> \
+                trans_all_inst >> \
+                rename_info_iter >> \
+                act_cleanup_images
 
+        if self.config.migrate.instances_pipeline:
+            trans_all_inst = pipeline_iter.PipelineIter(
+                self.init,
+                [lambda: self.isolate(self.prepare_process_instance()),
+                 lambda: self.isolate(self.transport_process_instance())],
+                workers,
+                queue_size=self.config.migrate.pipeline_queue_size,
+                policy=policy,
+                quarantine_name=quarantine_name)
+            return act_get_filter >> \
+                act_get_info_inst >> \
+                init_iteration_instance >> \
+                trans_all_inst >> \
+                rename_info_iter >> \
+                act_cleanup_images
+
+        if workers > 1:
+            trans_all_inst = parallel_iter.ParallelIter(
+                self.init,
+                self.migrate_process_instance_isolated,
+                workers,
+                policy=policy,
+                quarantine_name=quarantine_name)
+            return act_get_filter >> \
+                act_get_info_inst >> \
+                init_iteration_instance >> \
+                trans_all_inst >> \
+                rename_info_iter >> \
+                act_cleanup_images
+
+        act_quarantine = None
+        if is_quarantine:
+            act_quarantine = quarantine.Quarantine(self.init) - is_instances
+        self.isolate(trans_one_inst, act_quarantine)
         transport_instances_and_dependency_resources = \
             act_get_filter >> \
             act_get_info_inst >> \
@@ -138,6 +264,45 @@ class OS2OSFerry(cloud_ferry.CloudFerry):
             act_cleanup_images
         return transport_instances_and_dependency_resources
 
+    def work(self, queue_path, scenario=None):
+        """
+        Migrating instances put to the work queue by migrate, by the net of
+        the DistributedIter of the scenario if it is given.
+        """
+
+        net_factory = self.migrate_process_instance_isolated
+        if scenario:
+            scenario.init_tasks(self.init)
+            scenario.load_scenario()
+            iters = [t for t in scenario.tasks.itervalues()
+                     if isinstance(t, distributed_iter.DistributedIter)]
+            if iters:
+                net_factory = iters[0].net_factory
+        worker = distributed_iter.DistributedIter(
+            self.init, net_factory, queue_path,
+            lease=self.config.migrate.work_queue_lease)
+        return worker.work({'__init_task__': self.init})
+
+    def migrate_process_instance_isolated(self):
+        return self.isolate(self.migrate_process_instance())
+
+    def isolate(self, net, error_handler=None):
+        """
+        Retrying tasks of the net by migrate.task_retry and going on with
+        error_handler when they fail anyway.
+        """
+
+        policy = None
+        if self.config.migrate.task_retry:
+            policy = retry.RetryPolicy(self.config.migrate.task_retry,
+                                       self.config.migrate.task_retry_backoff)
+        for elem in cursor.Cursor.elements(net):
+            if policy:
+                elem.with_retry(policy)
+            if error_handler:
+                elem.on_error(error_handler)
+        return net
+
     def init_iteration_instance(self, data, name_backup, name_iter):
         init_iteration_instance = copy_var.CopyVar(self.init, data, name_backup, True) >>\
                                   create_reference.CreateReference(self.init, data, name_iter)
@@ -145,7 +310,7 @@ class OS2OSFerry(cloud_ferry.CloudFerry):
 
     def migration_images(self):
         act_get_info_images = get_info_images.GetInfoImages(self.init, cloud='src_cloud')
-        act_deploy_images = copy_g2g.CopyFromGlanceToGlance(self.init)
+        act_deploy_images = copy_g2g.CopyFromGlanceToGlance(self.init).depends_on(act_get_info_images)
         return act_get_info_images >> act_deploy_images
 
     def save_result(self, data1, data2, result, resources_name):
@@ -193,6 +358,9 @@ class OS2OSFerry(cloud_ferry.CloudFerry):
         task_images_trans = self.migration_images()
         act_comp_res_trans = transport_compute_resources.TransportComputeResources(self.init)
         act_network_trans = networks_transporter.NetworkTransporter(self.init)
+        task_images_trans.go_start().depends_on(act_identity_trans)
+        act_comp_res_trans.depends_on(act_identity_trans)
+        act_network_trans.depends_on(act_identity_trans)
         return act_identity_trans >> task_images_trans >> act_network_trans >> act_comp_res_trans
 
     def migrate_images_by_instances(self):
@@ -212,8 +380,6 @@ class OS2OSFerry(cloud_ferry.CloudFerry):
         return transport_images >> task_transport_volumes
 
     def migrate_instance(self):
-        act_map_com_info = map_compute_info.MapComputeInfo(self.init)
-        act_net_prep = prepare_networks.PrepareNetworks(self.init, cloud='dst_cloud')
         act_deploy_instances = transport_instance.TransportInstance(self.init)
         act_i_to_f = load_compute_image_to_file.LoadComputeImageToFile(self.init, cloud='dst_cloud')
         act_merge = merge_base_and_diff.MergeBaseDiff(self.init, cloud='dst_cloud')
@@ -248,20 +414,28 @@ class OS2OSFerry(cloud_ferry.CloudFerry):
                                      process_merge_diff_and_base
         act_post_transport_instance = (act_is_not_copy_diff_file |
                                        act_transport_ephemeral) >> act_trans_diff_file
-        return act_net_prep >> \
-               act_map_com_info >> \
-               act_pre_transport_instance >> \
+        return act_pre_transport_instance >> \
                act_deploy_instances >> \
                act_post_transport_instance >> \
                act_transport_ephemeral
 
+    def prepare_instance(self):
+        act_map_com_info = map_compute_info.MapComputeInfo(self.init)
+        act_net_prep = prepare_networks.PrepareNetworks(self.init, cloud='dst_cloud')
+        return act_net_prep >> act_map_com_info
+
     def migrate_process_instance(self):
-        act_attaching = attach_used_volumes_via_compute.AttachVolumesCompute(self.init, cloud='dst_cloud')
+        return self.prepare_process_instance() >> self.transport_process_instance()
+
+    def prepare_process_instance(self):
         act_stop_vms = stop_vm.StopVms(self.init, cloud='src_cloud')
-        act_start_vms = start_vm.StartVms(self.init, cloud='dst_cloud')
         #transport_resource_inst = self.migrate_resources_by_instance_via_ssh()
         transport_resource_inst = self.migrate_resources_by_instance()
+        return act_stop_vms >> transport_resource_inst >> self.prepare_instance()
+
+    def transport_process_instance(self):
+        act_attaching = attach_used_volumes_via_compute.AttachVolumesCompute(self.init, cloud='dst_cloud')
+        act_start_vms = start_vm.StartVms(self.init, cloud='dst_cloud')
         transport_inst = self.migrate_instance()
         act_dissociate_floatingip = dissociate_floatingip_via_compute.DissociateFloatingip(self.init, cloud='src_cloud')
-        return act_stop_vms >> transport_resource_inst >> transport_inst >> \
-               act_attaching >> act_dissociate_floatingip >> act_start_vms
+        return transport_inst >> act_attaching >> act_dissociate_floatingip >> act_start_vms
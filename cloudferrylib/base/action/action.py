@@ -13,7 +13,21 @@
 # limitations under the License.
 
 
+import hashlib
+import json
+
 from cloudferrylib.scheduler import task
+from cloudferrylib.utils import locks
+from cloudferrylib.utils import utils as utl
+
+
+LOG = utl.get_log(__name__)
+
+
+def get_digest(inputs):
+    """ Stable digest of json serializable inputs """
+
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True)).hexdigest()
 
 
 class Action(task.Task):
@@ -32,6 +46,32 @@ class Action(task.Task):
     def run(self, **kwargs):
         pass
 
+    def is_memoized(self):
+        return bool(self.cfg and self.cfg.migrate.memoize)
+
+    def memoize(self, kind, inputs, func, valid=None):
+        """
+        Result of func() computed once for the inputs during the migration
+        and shared by all the workers (see locks.once), so the result has
+        to be json serializable. A result which doesn't pass valid(result)
+        any more (the file or image it refers to is gone) is computed
+        again, invalidate drops it explicitly.
+        """
+
+        if not self.is_memoized():
+            return func()
+        key = get_digest(inputs)
+        result = locks.once(kind, key, func)
+        if valid is None or valid(result):
+            return result
+        LOG.info("Memoized %s of %s is not valid any more", kind, inputs)
+        locks.get_manager().forget(kind, key)
+        return locks.once(kind, key, func)
+
+    def invalidate(self, kind, inputs):
+        if self.is_memoized():
+            locks.get_manager().forget(kind, get_digest(inputs))
+
     def save(self):
         pass
 
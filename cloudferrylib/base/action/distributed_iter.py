@@ -0,0 +1,167 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import os
+import socket
+import threading
+import time
+
+from cloudferrylib.base.action import parallel_iter
+from cloudferrylib.scheduler import pool
+from cloudferrylib.utils import ordering
+from cloudferrylib.utils import utils as utl
+from cloudferrylib.utils import work_queue
+
+
+LOG = utl.get_log(__name__)
+
+POLL_INTERVAL = 5
+LEASE = 600
+
+
+class DistributedIter(parallel_iter.ParallelIter):
+    """
+    Puts every object of iter_info_name as a job to the work queue and
+    waits for workers to migrate them, results and failures are handled as
+    in ParallelIter. Workers are `fab worker` processes, possibly on other
+    transition hosts, each one with its own config, ssh agent and tunnels;
+    the coordinator also runs `workers` of them itself.
+
+    A worker renews the lease of its job while it runs it, a job not
+    renewed for `lease` seconds (the worker died) is taken by another
+    worker. Jobs left when no local worker is alive and no job has been
+    renewed or finished for `lease` seconds are failed. queue_path and
+    lease are work_queue and work_queue_lease of the config by default.
+    """
+
+    def __init__(self, init, net_factory, queue_path=None, workers=None,
+                 iter_info_name='info_iter', info_name='info',
+                 result_name='info_result',
+                 resource_name=utl.INSTANCES_TYPE,
+                 policy=None, quarantine_name=None,
+                 poll_interval=POLL_INTERVAL, lease=None):
+        self.queue_path = queue_path
+        self.poll_interval = poll_interval
+        self.lease = lease
+        super(DistributedIter, self).__init__(
+            init, net_factory, workers,
+            iter_info_name=iter_info_name, info_name=info_name,
+            result_name=result_name, resource_name=resource_name,
+            policy=policy, quarantine_name=quarantine_name)
+        if self.queue_path is None and self.cfg:
+            self.queue_path = self.cfg.migrate.work_queue
+        if self.lease is None:
+            self.lease = (self.cfg.migrate.work_queue_lease if self.cfg
+                          else LEASE)
+
+    def is_enabled(self):
+        return bool(self.cfg and self.cfg.migrate.work_queue)
+
+    def run(self, **kwargs):
+        objs = kwargs[self.iter_info_name][self.resource_name]
+        result = kwargs[self.result_name]
+        queue = work_queue.WorkQueue(self.queue_path, self.lease)
+        queue.reset()
+        policy = ordering.get_policy(self.policy)
+        left = set()
+        for obj_id, obj in policy.order(objs, kwargs.get('plan')):
+            queue.put(obj_id, obj, self.resource_name)
+            left.add(obj_id)
+        objs.clear()
+        queue.seal()
+        failed = {}
+        progress = time.time()
+        with pool.ProcessPool(self.workers) as workers:
+            for num in xrange(self.workers):
+                workers.submit(num, self.work, kwargs,
+                               '%s-%d' % (socket.gethostname(), num))
+            while left:
+                for job in workers.poll():
+                    try:
+                        job.get()
+                    except Exception as e:
+                        LOG.error("Local worker %s failed: %s", job.key, e)
+                for job in queue.collect():
+                    progress = time.time()
+                    left.discard(job.key)
+                    if job.state == work_queue.DONE:
+                        result[self.resource_name].update(
+                            job.result[self.resource_name])
+                    else:
+                        failed[job.key] = pool.WorkerError(
+                            "%s failed on %s: %s" % (job.key, job.worker,
+                                                     job.error))
+                if left and not workers.is_busy() and self.is_stalled(
+                        queue, progress):
+                    for key in left:
+                        queue.fail(key, "no worker is alive")
+                    progress = time.time()
+                    continue
+                if left:
+                    time.sleep(self.poll_interval)
+        return self.finish(kwargs, result, failed)
+
+    def is_stalled(self, queue, progress):
+        """ Nothing is done or renewed by workers for the lease """
+
+        now = time.time()
+        last_update = queue.last_update() or 0
+        return (now - progress > self.lease and
+                now - last_update > self.lease)
+
+    def work(self, variables, name=None):
+        """
+        Running jobs of the queue until it is sealed and there are no
+        more jobs, returns the number of jobs done.
+        """
+
+        name = name or '%s-%d' % (socket.gethostname(), os.getpid())
+        queue = work_queue.WorkQueue(self.queue_path, self.lease)
+        count = 0
+        while True:
+            job = queue.claim(name)
+            if job is None:
+                if queue.is_sealed() and not self.has_jobs(queue):
+                    return count
+                time.sleep(self.poll_interval)
+                continue
+            LOG.info("Worker %s migrates %s %s", name, job.kind, job.key)
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=self.renew,
+                                         args=(queue, job.key, name, stop))
+            heartbeat.daemon = True
+            heartbeat.start()
+            try:
+                info, _ = self.run_one(variables, job.key, job.payload)
+            except Exception as e:
+                LOG.exception("Worker %s failed on %s", name, job.key)
+                queue.fail(job.key, "%s: %s" % (e.__class__.__name__, e))
+            else:
+                queue.done(job.key, info)
+            finally:
+                stop.set()
+                heartbeat.join()
+            count += 1
+
+    @staticmethod
+    def has_jobs(queue):
+        """ Jobs are left to be claimed (running ones may be reclaimed) """
+
+        counts = queue.counts()
+        return bool(counts.get(work_queue.PENDING) or
+                    counts.get(work_queue.RUNNING))
+
+    def renew(self, queue, key, name, stop):
+        while not stop.wait(self.lease / 4.0):
+            queue.renew(key, name)
@@ -14,23 +14,32 @@
 
 
 from cloudferrylib.base.action import action
+from cloudferrylib.utils import ordering
 from cloudferrylib.utils import utils as utl
+import collections
 import copy
 
 
 class GetInfoIter(action.Action):
 
-    def __init__(self, init, iter_info_name='info_iter', info_name='info', resource_name=utl.INSTANCES_TYPE):
+    def __init__(self, init, iter_info_name='info_iter', info_name='info', resource_name=utl.INSTANCES_TYPE,
+                 policy=None):
         self.iter_info_name = iter_info_name
         self.info_name = info_name
         self.resource_name = resource_name
+        self.policy = policy
         super(GetInfoIter, self).__init__(init)
+        if self.policy is None and self.cfg:
+            self.policy = self.cfg.migrate.migration_order
 
-    def run(self, **kwargs):
+    def run(self, plan=None, **kwargs):
         info = kwargs[self.iter_info_name]
         objs = info[self.resource_name]
-        obj_id = objs.keys()[0]
-        obj = objs.pop(obj_id)
+        if self.policy and not isinstance(objs, collections.OrderedDict):
+            # ordered once, so that popitem gives objects in the policy order
+            objs = info[self.resource_name] = collections.OrderedDict(
+                reversed(ordering.get_policy(self.policy).order(objs, plan)))
+        obj_id, obj = objs.popitem()
         new_info = {
             self.resource_name: {obj_id: obj}
         }
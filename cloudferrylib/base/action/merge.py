@@ -27,8 +27,13 @@ class Merge(action.Action):
         super(Merge, self).__init__(init)
 
     def run(self, **kwargs):
-        data1 = copy.deepcopy(kwargs[self.data1])
-        data2 = copy.deepcopy(kwargs[self.data2])
+        data1 = kwargs[self.data1]
+        data2 = kwargs[self.data2]
+        if self.result != self.data2:
+            data2 = copy.copy(data2)
+            data2[self.resources_name] = copy.copy(data2[self.resources_name])
+        # Result is accumulated in data2 itself, so merge of one object
+        # doesn't depend on how many objects are merged already
         data2[self.resources_name].update(
             data1[self.resources_name]
         )
@@ -0,0 +1,145 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+
+from cloudferrylib.base.action import action
+from cloudferrylib.base.action import quarantine as quarantine_record
+from cloudferrylib.scheduler import cursor
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import pool
+from cloudferrylib.scheduler import scheduler
+from cloudferrylib.utils import ordering
+from cloudferrylib.utils import profiler
+from cloudferrylib.utils import utils as utl
+
+
+LOG = utl.get_log(__name__)
+
+
+class ParallelIter(action.Action):
+    """
+    Runs the net built by net_factory for every object of iter_info_name
+    in at most `workers` processes at a time (instances_workers of the
+    config by default). Every run gets its own copy of the namespace with
+    one object in info_name, its info_name after the run is merged into
+    result_name. Objects are started in the order of the ordering policy
+    (migration_order of the config by default). Failed objects are put to
+    quarantine_name if it is given and quarantine_instances is on,
+    otherwise the action fails after all the objects are done.
+    """
+
+    def __init__(self, init, net_factory, workers=None,
+                 iter_info_name='info_iter', info_name='info',
+                 result_name='info_result',
+                 resource_name=utl.INSTANCES_TYPE,
+                 policy=None, quarantine_name=None):
+        self.net_factory = net_factory
+        self.workers = workers
+        self.policy = policy
+        self.quarantine_name = quarantine_name
+        self.iter_info_name = iter_info_name
+        self.info_name = info_name
+        self.result_name = result_name
+        self.resource_name = resource_name
+        super(ParallelIter, self).__init__(init)
+        if self.workers is None:
+            self.workers = (self.cfg.migrate.instances_workers if self.cfg
+                            else 1)
+        if self.policy is None:
+            self.policy = (self.cfg.migrate.migration_order if self.cfg
+                           else ordering.FIFO)
+        if self.cfg and not self.cfg.migrate.quarantine_instances:
+            self.quarantine_name = None
+
+    def is_enabled(self):
+        """ The config asks to migrate objects by this iterator """
+
+        return bool(self.cfg and self.cfg.migrate.instances_workers > 1)
+
+    def run(self, **kwargs):
+        objs = kwargs[self.iter_info_name][self.resource_name]
+        result = kwargs[self.result_name]
+        failed = {}
+        policy = ordering.get_policy(self.policy)
+        if hasattr(policy, 'waves'):
+            waves = policy.waves(objs, kwargs.get('plan'))
+        else:
+            waves = [policy.order(objs, kwargs.get('plan'))]
+        objs.clear()
+        with pool.ProcessPool(self.workers) as workers:
+            for wave in waves:
+                for obj_id, obj in wave:
+                    workers.submit(obj_id, self.run_one, kwargs, obj_id, obj)
+                for job in workers.wait_all():
+                    try:
+                        info, records = job.get()
+                    except Exception as e:
+                        failed[job.key] = e
+                        continue
+                    if records:
+                        profiler.get_profiler().merge(records)
+                    result[self.resource_name].update(
+                        info[self.resource_name])
+        return self.finish(kwargs, result, failed)
+
+    def finish(self, kwargs, result, failed):
+        if failed and self.quarantine_name:
+            quarantine = kwargs.get(self.quarantine_name) or {}
+            objs = quarantine.setdefault(self.resource_name, {})
+            for obj_id, e in failed.iteritems():
+                LOG.error("%s %s is quarantined: %s", self.resource_name,
+                          obj_id, e)
+                objs[obj_id] = quarantine_record.make_record(
+                    e, getattr(e, 'task', None))
+            return {
+                self.result_name: result,
+                self.quarantine_name: quarantine
+            }
+        if failed:
+            raise RuntimeError("Migration of %s failed: %s" % (
+                self.resource_name,
+                ", ".join("%s (%s)" % (k, e) for k, e in failed.iteritems())))
+        return {
+            self.result_name: result
+        }
+
+    def run_one(self, variables, obj_id, obj):
+        variables = dict(variables)
+        variables[namespace.CHILDREN] = dict()
+        variables[self.info_name] = {
+            self.resource_name: {obj_id: obj}
+        }
+        namespace_one = namespace.Namespace(variables)
+        records = self.run_net(namespace_one, self.net_factory())
+        return namespace_one.vars[self.info_name], records
+
+    @staticmethod
+    def run_net(namespace_one, net):
+        """
+        Running the net in the namespace, profiling records of its tasks
+        are returned to be merged in the parent process.
+        """
+
+        scheduler_one = scheduler.Scheduler(namespace=namespace_one,
+                                            cursor=cursor.Cursor(net))
+        profiler_one = None
+        if profiler.get_profiler():
+            profiler_one = profiler.get_profiler().fork()
+            scheduler_one.addProfiler(profiler_one)
+        scheduler_one.start()
+        if scheduler_one.status_error == scheduler.ERROR:
+            # the failed task goes to the quarantine record
+            scheduler_one.exception.task = str(scheduler_one.failed_task)
+            raise scheduler_one.exception
+        return profiler_one.records if profiler_one else None
@@ -0,0 +1,120 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import collections
+
+from cloudferrylib.base.action import parallel_iter
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import pool
+from cloudferrylib.utils import ordering
+from cloudferrylib.utils import profiler
+from cloudferrylib.utils import utils as utl
+
+
+class PipelineIter(parallel_iter.ParallelIter):
+    """
+    Runs every object of iter_info_name through the stages, the nets built
+    by stage factories one after another, like a pipeline: every stage has
+    its own `workers` processes, so the next objects are prepared while the
+    current one is transferred. At most queue_size objects wait between two
+    stages (pipeline_queue_size of the config by default), which limits the
+    number of objects taken from the source and not finished yet. Results
+    and failures are handled as in ParallelIter.
+    """
+
+    def __init__(self, init, stages, workers=None, queue_size=None,
+                 iter_info_name='info_iter', info_name='info',
+                 result_name='info_result',
+                 resource_name=utl.INSTANCES_TYPE,
+                 policy=None, quarantine_name=None):
+        self.stages = stages
+        super(PipelineIter, self).__init__(
+            init, None, workers,
+            iter_info_name=iter_info_name, info_name=info_name,
+            result_name=result_name, resource_name=resource_name,
+            policy=policy, quarantine_name=quarantine_name)
+        if queue_size is None:
+            queue_size = (self.cfg.migrate.pipeline_queue_size if self.cfg
+                          else 1)
+        self.queue_size = max(queue_size, 1)
+
+    def is_enabled(self):
+        return bool(self.cfg and self.cfg.migrate.instances_pipeline)
+
+    def run(self, **kwargs):
+        objs = kwargs[self.iter_info_name][self.resource_name]
+        result = kwargs[self.result_name]
+        policy = ordering.get_policy(self.policy)
+        queues = [collections.deque() for _ in self.stages]
+        running = [0] * len(self.stages)
+        states = {}
+        failed = {}
+        for obj_id, obj in policy.order(objs, kwargs.get('plan')):
+            states[obj_id] = dict(kwargs)
+            states[obj_id][namespace.CHILDREN] = dict()
+            states[obj_id][self.info_name] = {
+                self.resource_name: {obj_id: obj}
+            }
+            queues[0].append(obj_id)
+        objs.clear()
+        with pool.ProcessPool(None) as workers:
+            self.spawn(workers, queues, running, states)
+            for job in workers.wait_all():
+                stage, obj_id = job.key
+                running[stage] -= 1
+                try:
+                    written, deleted, records = job.get()
+                except Exception as e:
+                    failed[obj_id] = e
+                    del states[obj_id]
+                    self.spawn(workers, queues, running, states)
+                    continue
+                if records:
+                    profiler.get_profiler().merge(records)
+                state = states[obj_id]
+                state.update(written)
+                for key in deleted:
+                    state.pop(key, None)
+                if stage + 1 < len(self.stages):
+                    queues[stage + 1].append(obj_id)
+                else:
+                    info = states.pop(obj_id)[self.info_name]
+                    result[self.resource_name].update(
+                        info[self.resource_name])
+                self.spawn(workers, queues, running, states)
+        return self.finish(kwargs, result, failed)
+
+    def spawn(self, workers, queues, running, states):
+        # later stages first, so that they free the queues of earlier ones
+        for stage in reversed(xrange(len(self.stages))):
+            while (queues[stage] and running[stage] < self.workers and
+                   not self.is_full(queues, running, stage)):
+                obj_id = queues[stage].popleft()
+                running[stage] += 1
+                workers.submit((stage, obj_id), self.run_stage, stage,
+                               states[obj_id])
+
+    def is_full(self, queues, running, stage):
+        """ Objects started by the stage would not fit in the next queue """
+
+        if stage + 1 == len(self.stages):
+            return False
+        return len(queues[stage + 1]) + running[stage] >= self.queue_size
+
+    def run_stage(self, stage, variables):
+        namespace_stage = namespace.Namespace(variables).fork()
+        records = self.run_net(namespace_stage, self.stages[stage]())
+        written, deleted = namespace_stage.vars.changes()
+        written.pop(namespace.CHILDREN, None)
+        return written, deleted, records
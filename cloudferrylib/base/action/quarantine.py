@@ -0,0 +1,62 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+
+from cloudferrylib.base.action import action
+from cloudferrylib.scheduler.namespace import ERROR_INFO
+from cloudferrylib.utils import utils as utl
+
+
+LOG = utl.get_log(__name__)
+
+
+def make_record(error, task=None):
+    """ Quarantine record of an object, error is an exception or a text """
+
+    if isinstance(error, Exception):
+        error = "%s: %s" % (error.__class__.__name__, error)
+    return {
+        'task': task,
+        'error': error
+    }
+
+
+class Quarantine(action.Action):
+    """
+    Puts objects of info_name, which failed to migrate, aside to
+    quarantine_name together with the error, so that the migration goes on
+    with the other objects. Use it as the error handler of the tasks of one
+    object (see Element.on_error).
+    """
+
+    def __init__(self, init, info_name='info',
+                 quarantine_name='quarantine',
+                 resource_name=utl.INSTANCES_TYPE):
+        self.info_name = info_name
+        self.quarantine_name = quarantine_name
+        self.resource_name = resource_name
+        super(Quarantine, self).__init__(init)
+
+    def run(self, **kwargs):
+        error = kwargs.get(ERROR_INFO, {})
+        quarantine = kwargs.get(self.quarantine_name) or {}
+        objs = quarantine.setdefault(self.resource_name, {})
+        for obj_id in kwargs[self.info_name][self.resource_name]:
+            LOG.error("%s %s is quarantined: %s", self.resource_name, obj_id,
+                      error.get('error'))
+            objs[obj_id] = make_record(error.get('error'),
+                                       error.get('task'))
+        return {
+            self.quarantine_name: quarantine
+        }
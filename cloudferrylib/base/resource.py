@@ -12,17 +12,41 @@
 # See the License for the specific language governing permissions and#
 # limitations under the License.
 
+import weakref
+
+from cloudferrylib.scheduler import coroutine
 from cloudferrylib.utils import proxy_client
+from cloudferrylib.utils import rate_limit
+
+
+# Resources are referenced from the migration info. Forked workers pass
+# them back to the parent by id, so the parent gets its own objects back.
+_resources = weakref.WeakValueDictionary()
+
+
+def get_resource(resource_id):
+    return _resources[resource_id]
 
 
 class Resource(object):
     def __init__(self):
-        pass
+        _resources[id(self)] = self
 
-    def proxy(self, client, cfg):
+    def proxy(self, client, cfg, service=None):
         retry = cfg.migrate.retry
         time_wait = cfg.migrate.time_wait
-        return proxy_client.Proxy(client, retry, time_wait)
+        limits = cfg.get(service) or {}
+        limiter = rate_limit.get_limiter(
+            cfg.cloud.get('host'), service,
+            float(limits.get('api_read_rate') or 0),
+            float(limits.get('api_write_rate') or 0),
+            int(limits.get('api_burst') or 1))
+        return proxy_client.Proxy(client, retry, time_wait, limiter)
+
+    def get_async(self):
+        """ Methods of the adapter return calls for coroutines """
+
+        return coroutine.Adapter(self)
 
     def read_info(self, opts={}):
         pass
@@ -44,3 +68,6 @@ class Resource(object):
 
     def __deepcopy__(self, memo):
         return self
+
+    def __reduce__(self):
+        return get_resource, (id(self),)
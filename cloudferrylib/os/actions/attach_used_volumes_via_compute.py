@@ -12,8 +12,6 @@
 # See the License for the specific language governing permissions and#
 # limitations under the License.
 
-import copy
-
 from cloudferrylib.base.action import action
 from cloudferrylib.utils import utils as utl
 
@@ -21,7 +19,6 @@ from cloudferrylib.utils import utils as utl
 class AttachVolumesCompute(action.Action):
 
     def run(self, info, **kwargs):
-        info = copy.deepcopy(info)
         # import pdb; pdb.set_trace()
         compute_resource = self.cloud.resources[utl.COMPUTE_RESOURCE]
         storage_resource = self.cloud.resources[utl.STORAGE_RESOURCE]
@@ -13,17 +13,14 @@
 # limitations under the License.
 
 
-import copy
-
 from cloudferrylib.base.action import action
+from cloudferrylib.os.actions import convert_image_to_file
 from cloudferrylib.utils import utils as utl
 
 
 class CleanupImages(action.Action):
 
     def run(self, info, **kwargs):
-        info = copy.deepcopy(info)
-
         src_img = self.src_cloud.resources[utl.IMAGE_RESOURCE]
         dst_img = self.dst_cloud.resources[utl.IMAGE_RESOURCE]
 
@@ -46,4 +43,6 @@ class CleanupImages(action.Action):
             map(src_img.delete_image, src_img.get_img_id_list_by_checksum(chs))
             map(dst_img.delete_image, dst_img.get_img_id_list_by_checksum(chs))
 
+        convert_image_to_file.ConvertImageToFile.remove_cached()
+
         return {}
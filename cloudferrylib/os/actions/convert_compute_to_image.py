@@ -13,8 +13,6 @@
 # limitations under the License.
 
 
-import copy
-
 from cloudferrylib.base.action import action
 from cloudferrylib.utils import utils as utl
 
@@ -36,7 +34,6 @@ class ConvertComputeToImage(action.Action):
         self.target_output = target_output
 
     def run(self, info=None, **kwargs):
-        info = copy.deepcopy(info)
         image_info = {utl.IMAGES_TYPE: {}}
         images_body = image_info[utl.IMAGES_TYPE]
         image_resource = self.cloud.resources[utl.IMAGE_RESOURCE]
@@ -13,23 +13,24 @@
 # limitations under the License.
 
 from cloudferrylib.base.action import action
-import copy
+from cloudferrylib.utils import utils as utl
 
 
 class ConvertImageToCompute(action.Action):
 
     def run(self, images_info=None, compute_ignored_images={}, **kwargs):
-        images_info = copy.deepcopy(images_info)
-        instance_info = {'instances': compute_ignored_images}
+        instance_info = {'instances': dict(compute_ignored_images)}
         for image in images_info['images'].itervalues():
             if 'instance' not in image['meta']:
                 continue
             instances = image['meta']['instance']
             for instance in instances:
                 if image['image']:
-                    instance['instance']['image_id'] = image['image']['id']
+                    image_id = image['image']['id']
                 else:
-                    instance['instance']['image_id'] = None
+                    image_id = None
+                instance = utl.update_path(instance, ['instance', 'image_id'],
+                                           image_id)
                 instance_info['instances'][
                     instance['instance']['id']] = instance
         return {'info': instance_info}
@@ -1,11 +1,32 @@
 from fabric.api import run, settings, env
 from cloudferrylib.base.action import action
 from cloudferrylib.utils import forward_agent
+from cloudferrylib.utils import locks
 
 
 class ConvertImageToFile(action.Action):
 
     def run(self, image_id=None, base_filename=None, **kwargs):
+        cfg = self.cloud.cloud_config.cloud
+        if not self.is_memoized():
+            self.download(image_id, base_filename)
+            return
+        # instances of the same image share one download on the host, every
+        # one gets its own copy as the base file is changed by the merge
+        # (CleanupImages removes it at the end of the migration)
+        cache_file = "%s/image_%s_base" % (cfg.temp, image_id)
+        self.memoize('image_file', [cfg.host, image_id],
+                     lambda: self.cache(image_id, cache_file),
+                     valid=self.file_exists)
+        with settings(host_string=cfg.host):
+            run("cp %s %s" % (cache_file, base_filename))
+
+    def cache(self, image_id, filename):
+        self.download(image_id, filename)
+        return {'host': self.cloud.cloud_config.cloud.host,
+                'path': filename}
+
+    def download(self, image_id, filename):
         cfg = self.cloud.cloud_config.cloud
         with settings(host_string=cfg.host):
             with forward_agent(env.key_filename):
@@ -17,5 +38,18 @@ class ConvertImageToFile(action.Action):
                      cfg.tenant,
                      cfg.host,
                      image_id,
-                     base_filename))
+                     filename))
+        return filename
+
+    @staticmethod
+    def file_exists(cached):
+        with settings(host_string=cached['host'], warn_only=True):
+            return run("test -f %s" % cached['path']).succeeded
+
+    @staticmethod
+    def remove_cached():
+        """ Removing base images downloaded once for the instances """
 
+        for cached in locks.get_manager().pop_results('image_file'):
+            with settings(host_string=cached['host'], warn_only=True):
+                run("rm -f %s" % cached['path'])
@@ -17,7 +17,6 @@ from cloudferrylib.base.action import converter
 from cloudferrylib.utils import utils as utl
 
 from cloudferrylib.utils import utils
-import copy
 LOG = utils.get_log(__name__)
 CEPH = 'ceph'
 ACTIVE = 'active'
@@ -36,14 +35,13 @@ class ConvertVolumeToImage(converter.Converter):
     def run(self, storage_info={}, **kwargs):
         self.disk_format = self.cfg.migrate.disk_format
         self.container_format = self.cfg.migrate.container_format
-        volumes_info = copy.deepcopy(storage_info)
         resource_storage = self.cloud.resources[utl.STORAGE_RESOURCE]
         resource_image = self.cloud.resources[utl.IMAGE_RESOURCE]
         images_info = {}
         if not require_methods(['upload_volume_to_image'], resource_storage):
             raise RuntimeError("No require methods")
         images_from_volumes = {}
-        for volume_id, volume in volumes_info[utl.VOLUMES_TYPE].iteritems():
+        for volume_id, volume in storage_info[utl.VOLUMES_TYPE].iteritems():
             vol = volume['volume']
             LOG.debug(
                 "| | uploading volume %s [%s] to image service bootable=%s" % (
@@ -59,7 +57,7 @@ class ConvertVolumeToImage(converter.Converter):
             img_new = {
                 utl.IMAGE_BODY: (
                     image_vol[utl.IMAGES_TYPE][image_id][utl.IMAGE_BODY]),
-                utl.META_INFO: volume[utl.META_INFO]
+                utl.META_INFO: dict(volume[utl.META_INFO])
             }
             img_new[utl.META_INFO][utl.VOLUME_BODY] = vol
             images_from_volumes[image_id] = img_new
@@ -19,7 +19,6 @@ from cloudferrylib.os.actions import task_transfer
 from cloudferrylib.utils.drivers import ssh_ceph_to_ceph
 from cloudferrylib.utils import rbd_util
 from cloudferrylib.utils import utils as utl
-import copy
 
 
 OLD_ID = 'old_id'
@@ -28,18 +27,14 @@ OLD_ID = 'old_id'
 class DeployVolSnapshots(action.Action):
 
     def run(self, storage_info=None, identity_info=None, **kwargs):
-        storage_info = copy.deepcopy(storage_info)
-        deploy_info = copy.deepcopy(storage_info)
-        deploy_info.update(identity_info)
-        storage_info.update(identity_info)
         volume_resource = self.cloud.resources[utl.STORAGE_RESOURCE]
-        for vol_id, vol in deploy_info[utl.VOLUMES_TYPE].iteritems():
+        for vol_id, vol in storage_info[utl.VOLUMES_TYPE].iteritems():
             if vol['snapshots']:
 
                 vol_info = vol[utl.VOLUME_BODY]
 
                 snapshots_list = \
-                    [snap_info for snap_info in vol['snapshots'].values()]
+                    [dict(snap_info) for snap_info in vol['snapshots'].values()]
 
                 snapshots_list.sort(key=lambda x: x['created_at'])
 
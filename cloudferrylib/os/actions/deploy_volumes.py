@@ -15,7 +15,6 @@
 
 from cloudferrylib.base.action import action
 from cloudferrylib.utils import utils as utl
-import copy
 
 
 OLD_ID = 'old_id'
@@ -24,10 +23,14 @@ OLD_ID = 'old_id'
 class DeployVolumes(action.Action):
 
     def run(self, storage_info={}, identity_info={}, **kwargs):
-        storage_info = copy.deepcopy(storage_info)
-        deploy_info = copy.deepcopy(storage_info)
+        deploy_info = dict(storage_info)
         deploy_info.update(identity_info)
-        storage_info.update(identity_info)
+        # storage resource writes ids of new volumes to their bodies
+        deploy_info[utl.VOLUMES_TYPE] = {}
+        for vol_id, vol in storage_info[utl.VOLUMES_TYPE].iteritems():
+            vol = dict(vol)
+            vol[utl.VOLUME_BODY] = dict(vol[utl.VOLUME_BODY])
+            deploy_info[utl.VOLUMES_TYPE][vol_id] = vol
         volume_resource = self.cloud.resources[utl.STORAGE_RESOURCE]
         new_ids = volume_resource.deploy(deploy_info)
         storage_info_new = {
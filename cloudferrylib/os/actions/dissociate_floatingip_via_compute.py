@@ -13,8 +13,6 @@
 # limitations under the License.
 
 
-import copy
-
 from cloudferrylib.base.action import action
 from cloudferrylib.utils import utils as utl
 
@@ -23,10 +21,9 @@ class DissociateFloatingip(action.Action):
 
     def run(self, info=None, **kwargs):
         if self.cfg.migrate.keep_floatingip:
-            info_compute = copy.deepcopy(info)
             compute_resource = self.cloud.resources[utl.COMPUTE_RESOURCE]
 
-            instances = info_compute[utl.INSTANCES_TYPE]
+            instances = info[utl.INSTANCES_TYPE]
 
             for instance in instances.values():
                 networks_info = instance[utl.INSTANCE_BODY][utl.INTERFACES]
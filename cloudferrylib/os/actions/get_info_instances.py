@@ -14,6 +14,7 @@
 
 
 from cloudferrylib.base.action import action
+from cloudferrylib.utils import plan as migration_plan
 from cloudferrylib.utils import utils as utl
 
 
@@ -21,7 +22,11 @@ class GetInfoInstances(action.Action):
     def __init__(self, init, cloud=None):
         super(GetInfoInstances, self).__init__(init, cloud)
 
-    def run(self, **kwargs):
+    def run(self, plan=None, **kwargs):
+        if plan:
+            return {
+                'info': plan[migration_plan.INFO]
+            }
         search_opts = kwargs.get('search_opts', None)
         compute_resource = self.cloud.resources[utl.COMPUTE_RESOURCE]
         info = compute_resource.read_info(search_opts=search_opts)
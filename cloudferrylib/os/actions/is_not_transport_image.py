@@ -13,7 +13,6 @@
 # limitations under the License.
 
 
-import copy
 from cloudferrylib.base.action import action
 from cloudferrylib.utils import utils as utl
 
@@ -26,7 +25,6 @@ DEFAULT = 1
 class IsNotTransportImage(action.Action):
     def run(self, info=None, **kwargs):
         self.set_next_path(DEFAULT)
-        info = copy.deepcopy(info)
         src_compute = self.src_cloud.resources[utl.COMPUTE_RESOURCE]
         backend_ephem_drv_src = src_compute.config.compute.backend
         instance_boot = info[utl.INSTANCES_TYPE].values()[0][utl.INSTANCE_BODY]['boot_mode']
@@ -0,0 +1,90 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+from cloudferrylib.base.action import action
+from cloudferrylib.os.actions import transport_ephemeral
+from cloudferrylib.utils import plan as migration_plan
+from cloudferrylib.utils import throughput
+from cloudferrylib.utils import utils as utl
+from cloudferrylib.utils import waves
+
+
+GB = migration_plan.GB
+
+
+class MakePlan(action.Action):
+    """
+    Estimates bytes to move and time of migration of every instance of info
+    from sizes of flavors and volumes and from throughput between hosts
+    measured in the previous runs. Instances are grouped into waves by
+    their dependencies. The plan keeps info itself, so applying the plan
+    doesn't need to discover instances again.
+    """
+
+    def run(self, info=None, **kwargs):
+        src_compute = self.src_cloud.resources[utl.COMPUTE_RESOURCE]
+        src_storage = self.src_cloud.resources[utl.STORAGE_RESOURCE]
+        src_network = self.src_cloud.resources[utl.NETWORK_RESOURCE]
+        dst_compute = self.dst_cloud.resources[utl.COMPUTE_RESOURCE]
+        transporter = transport_ephemeral.TRANSPORTER_MAP[
+            src_compute.config.compute.backend][
+            dst_compute.config.compute.backend]
+        history = throughput.ThroughputHistory(
+            self.cfg.migrate.throughput_path,
+            self.cfg.migrate.default_throughput * throughput.MB)
+        flavors = {}
+        instances = {}
+        for instance_id, instance in info[utl.INSTANCES_TYPE].iteritems():
+            body = instance[utl.INSTANCE_BODY]
+            if body['flavor_id'] not in flavors:
+                flavors[body['flavor_id']] = src_compute.get_flavor_from_id(
+                    body['flavor_id'])
+            flavor = flavors[body['flavor_id']]
+            sizes = {
+                utl.DIFF_BODY: (flavor.disk * GB
+                                if instance[utl.DIFF_BODY]['path_src']
+                                else 0),
+                utl.EPHEMERAL_BODY: (flavor.ephemeral * GB
+                                     if body['is_ephemeral'] else 0),
+                utl.VOLUMES_TYPE: sum(
+                    src_storage.get_volume_by_id(v['id']).size * GB
+                    for v in body['volumes'])
+            }
+            host_src = instance[utl.DIFF_BODY]['host_src']
+            instances[instance_id] = {
+                'name': body['name'],
+                'host_src': host_src,
+                'transporter': transporter,
+                migration_plan.BYTES: sizes,
+                migration_plan.ESTIMATE: history.estimate(
+                    sum(sizes.values()), host_src)
+            }
+        sizes = dict((instance_id, sum(i[migration_plan.BYTES].values()))
+                     for instance_id, i in instances.iteritems())
+        plan_waves = waves.plan_waves(
+            info[utl.INSTANCES_TYPE], sizes,
+            {'networks': src_network.get_networks()},
+            max_size=self.cfg.migrate.wave_size,
+            host_limit=self.cfg.migrate.wave_host_limit)
+        return {
+            'plan': {
+                migration_plan.INSTANCES: instances,
+                waves.WAVES: plan_waves,
+                migration_plan.BYTES: sum(sum(i[migration_plan.BYTES].values())
+                                          for i in instances.itervalues()),
+                migration_plan.ESTIMATE: sum(i[migration_plan.ESTIMATE]
+                                             for i in instances.itervalues()),
+                migration_plan.INFO: info
+            }
+        }
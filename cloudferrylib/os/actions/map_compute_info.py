@@ -15,7 +15,6 @@
 
 from cloudferrylib.base.action import action
 from cloudferrylib.utils import utils as utl
-import copy
 INSTANCES = 'instances'
 DIFF = 'diff'
 
@@ -27,7 +26,7 @@ class MapComputeInfo(action.Action):
 
     def run(self, info=None, **kwargs):
 
-        new_compute_info = copy.deepcopy(info)
+        new_compute_info = info
 
         src_compute = self.src_cloud.resources[utl.COMPUTE_RESOURCE]
         dst_compute = self.dst_cloud.resources[utl.COMPUTE_RESOURCE]
@@ -38,13 +37,17 @@ class MapComputeInfo(action.Action):
         dst_flavors_dict = \
             {flavor.name: flavor.id for flavor in dst_compute.get_flavor_list()}
 
-        for instance_id, instance in new_compute_info[utl.INSTANCES_TYPE].iteritems():
+        for instance_id, instance in info[utl.INSTANCES_TYPE].iteritems():
             _instance = instance['instance']
             flavor_name = src_flavors_dict[_instance['flavor_id']]
-            _instance['flavor_id'] = dst_flavors_dict[flavor_name]
             path_dst = "%s/%s" % (self.dst_cloud.cloud_config.cloud.temp, "temp%s_base" % instance_id)
-            instance[DIFF][PATH_DST] = path_dst
-            instance[DIFF][HOST_DST] = self.dst_cloud.getIpSsh()
+            instance = utl.update_path(instance, ['instance', 'flavor_id'],
+                                       dst_flavors_dict[flavor_name])
+            instance = utl.update_path(instance, [DIFF, PATH_DST], path_dst)
+            instance = utl.update_path(instance, [DIFF, HOST_DST],
+                                       self.dst_cloud.getIpSsh())
+            new_compute_info = utl.update_path(
+                new_compute_info, [utl.INSTANCES_TYPE, instance_id], instance)
         return {
             'info': new_compute_info
         }
@@ -13,8 +13,6 @@
 # limitations under the License.
 
 
-import copy
-
 from fabric.api import env
 from fabric.api import run
 from fabric.api import settings
@@ -65,7 +63,6 @@ class PostTransportInstance(action.Action):
     # TODO constants
 
     def run(self, info=None, **kwargs):
-        info = copy.deepcopy(info)
         #Init before run
         src_compute = self.src_cloud.resources[utl.COMPUTE_RESOURCE]
         dst_compute = self.dst_cloud.resources[utl.COMPUTE_RESOURCE]
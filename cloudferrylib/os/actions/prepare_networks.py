@@ -13,9 +13,8 @@
 # limitations under the License.
 
 
-import copy
-
 from cloudferrylib.base.action import action
+from cloudferrylib.utils import locks
 from cloudferrylib.utils import utils as utl
 
 
@@ -23,14 +22,13 @@ class PrepareNetworks(action.Action):
 
     def run(self, info=None, **kwargs):
 
-        info_compute = copy.deepcopy(info)
-
         network_resource = self.cloud.resources[utl.NETWORK_RESOURCE]
         identity_resource = self.cloud.resources[utl.IDENTITY_RESOURCE]
 
         keep_ip = self.cfg.migrate.keep_ip
 
-        instances = info_compute[utl.INSTANCES_TYPE]
+        info_compute = info
+        instances = info[utl.INSTANCES_TYPE]
         for (id_inst, inst) in instances.iteritems():
             params = []
             networks_info = inst[utl.INSTANCE_BODY][utl.INTERFACES]
@@ -40,31 +38,39 @@ class PrepareNetworks(action.Action):
             for src_net in networks_info:
                 dst_net = network_resource.get_network(src_net, tenant_id,
                                                        keep_ip)
-                port_id = network_resource.check_existing_port(dst_net['id'],
-                                                               src_net['mac'])
-                if port_id:
-                    network_resource.delete_port(port_id)
                 sg_ids = []
                 for sg in network_resource.get_security_groups():
                     if sg['tenant_id'] == tenant_id:
                         if sg['name'] in security_groups:
                             sg_ids.append(sg['id'])
-                port = network_resource.create_port(dst_net['id'],
-                                                    src_net['mac'],
-                                                    src_net['ip'],
-                                                    tenant_id,
-                                                    keep_ip,
-                                                    sg_ids)
+                # ports of the network are created by one worker at a time,
+                # so kept addresses of parallel instances don't collide
+                with locks.lock('network', dst_net['id']):
+                    port_id = network_resource.check_existing_port(
+                        dst_net['id'], src_net['mac'])
+                    if port_id:
+                        network_resource.delete_port(port_id)
+                    port = network_resource.create_port(dst_net['id'],
+                                                        src_net['mac'],
+                                                        src_net['ip'],
+                                                        tenant_id,
+                                                        keep_ip,
+                                                        sg_ids)
                 if self.cfg.migrate.keep_floatingip:
                     if src_net['floatingip']:
                         dst_flotingips = network_resource.get_floatingips()
                         dst_flotingips_map = \
-                            {fl_ip['floating_ip_address']: fl_ip['id'] for fl_ip in dst_flotingips}
-                        dst_floatingip_id = dst_flotingips_map[src_net['floatingip']]
-                        floating_ip = network_resource.update_floatingip(dst_floatingip_id, port['id'])
+                            {fl_ip['floating_ip_address']: fl_ip for fl_ip in dst_flotingips}
+                        dst_floatingip = dst_flotingips_map[src_net['floatingip']]
+                        # floating IPs of a pool are associated by one
+                        # worker at a time
+                        with locks.lock('floatingip', dst_floatingip['floating_network_id']):
+                            floating_ip = network_resource.update_floatingip(dst_floatingip['id'], port['id'])
                 params.append({'net-id': dst_net['id'], 'port-id': port['id']})
-            instances[id_inst][utl.INSTANCE_BODY]['nics'] = params
-        info_compute[utl.INSTANCES_TYPE] = instances
+            info_compute = utl.update_path(
+                info_compute,
+                [utl.INSTANCES_TYPE, id_inst, utl.INSTANCE_BODY, 'nics'],
+                params)
         return {
             'info': info_compute
         }
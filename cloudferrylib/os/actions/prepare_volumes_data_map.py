@@ -16,7 +16,6 @@
 
 from cloudferrylib.base.action import action
 from cloudferrylib.utils import utils as utl
-import copy
 
 
 class PrepareVolumesDataMap(action.Action):
@@ -30,10 +29,8 @@ class PrepareVolumesDataMap(action.Action):
         volumes_data_map = {}
         src_vol_info = kwargs[self.src_vol_info_name]
         dst_vol_info = kwargs[self.dst_vol_info_name]
-        src_storage_info = copy.deepcopy(src_vol_info)
-        src_volumes = src_storage_info[utl.VOLUMES_TYPE]
-        dst_storage_info = copy.deepcopy(dst_vol_info)
-        dst_volumes = dst_storage_info[utl.VOLUMES_TYPE]
+        src_volumes = src_vol_info[utl.VOLUMES_TYPE]
+        dst_volumes = dst_vol_info[utl.VOLUMES_TYPE]
 
         for dst_id, vol in dst_volumes.iteritems():
             src_id = vol[utl.OLD_ID]
@@ -41,14 +38,18 @@ class PrepareVolumesDataMap(action.Action):
             src_path = src_volumes[src_id][utl.VOLUME_BODY]['path']
             dst_host = vol[utl.VOLUME_BODY]['host']
             dst_path = vol[utl.VOLUME_BODY]['path']
-            volumes_data_map[dst_id] = vol
+            volumes_data_map[dst_id] = dict(vol)
             volumes_data_map[dst_id][utl.OLD_ID] = src_id
+            volumes_data_map[dst_id][utl.VOLUME_BODY] = \
+                dict(vol[utl.VOLUME_BODY])
             volumes_data_map[dst_id][utl.VOLUME_BODY].update({
                 utl.HOST_SRC: src_host,
                 utl.PATH_SRC: src_path,
                 utl.HOST_DST: dst_host,
                 utl.PATH_DST: dst_path
             })
+            volumes_data_map[dst_id][utl.META_INFO] = \
+                dict(vol[utl.META_INFO])
             volumes_data_map[dst_id][utl.META_INFO].update(src_volumes[src_id][utl.META_INFO])
         volumes = {
             utl.VOLUMES_TYPE: volumes_data_map
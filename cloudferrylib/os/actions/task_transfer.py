@@ -13,7 +13,12 @@
 # limitations under the License.
 
 
+import time
+
 from cloudferrylib.base.action import action
+from cloudferrylib.utils import concurrency
+from cloudferrylib.utils import plan as migration_plan
+from cloudferrylib.utils import throughput
 from cloudferrylib.utils import utils as utl
 
 
@@ -30,12 +35,39 @@ class TaskTransfer(action.Action):
         self.resource_root_name = resource_root_name
         self.input_info = input_info
 
-    def run(self, **kwargs):
+    def run(self, plan=None, **kwargs):
         info = kwargs[self.input_info]
         data_for_trans = info[self.resource_name]
 
-        for item in data_for_trans.itervalues():
+        for item_id, item in data_for_trans.iteritems():
             data = item[self.resource_root_name]
-            self.driver.transfer(data)
+            size = self.get_size(plan, item_id, data)
+            with concurrency.transfer_slot() as stream:
+                start = time.time()
+                self.driver.transfer(data)
+                stream.bytes = size
+            if size:
+                self.record_throughput(data, size, time.time() - start)
 
         return {}
+
+    def get_size(self, plan, item_id, data):
+        """ Bytes of the transfer by the plan or by the size of volume """
+
+        planned = (plan or {}).get(self.resource_name, {}).get(item_id, {})
+        size = planned.get(migration_plan.BYTES, {}).get(
+            self.resource_root_name)
+        if not size and data.get('size'):
+            size = data['size'] * migration_plan.GB
+        return size
+
+    def record_throughput(self, data, size, seconds):
+        """ Saving throughput of the transfer """
+
+        if not self.cfg.migrate.throughput_path:
+            return
+        history = throughput.ThroughputHistory(
+            self.cfg.migrate.throughput_path)
+        history.record(data.get('host_src'), data.get('host_dst'), size,
+                       seconds)
+        history.save()
@@ -13,8 +13,6 @@
 # limitations under the License.
 
 
-import copy
-
 from cloudferrylib.base.action import action
 from cloudferrylib.utils import utils as utl
 
@@ -22,7 +20,6 @@ from cloudferrylib.utils import utils as utl
 class TransportComputeResources(action.Action):
 
     def run(self, info=None, identity_info=None, **kwargs):
-        info = copy.deepcopy(info)
         target = 'resources'
 
         src_compute = self.src_cloud.resources[utl.COMPUTE_RESOURCE]
@@ -13,8 +13,6 @@
 # limitations under the License.
 
 
-import copy
-
 from fabric.api import env
 from fabric.api import run
 from fabric.api import settings
@@ -66,7 +64,6 @@ class TransportEphemeral(action.Action):
     # TODO constants
 
     def run(self, info=None, **kwargs):
-        info = copy.deepcopy(info)
         #Init before run
         new_info = {
             utl.INSTANCES_TYPE: {
@@ -138,15 +135,16 @@ class TransportEphemeral(action.Action):
         qemu_img_src = src_cloud.qemu_img
 
         temp_path_src = temp_src+"/%s"+utl.DISK_EPHEM
-        for inst_id, inst in instances.iteritems():
+        for inst_id, inst in instances.items():
 
             path_src_id_temp = temp_path_src % inst_id
             host_compute_dst = inst[EPHEMERAL][HOST_DST]
-            inst[EPHEMERAL][BACKING_FILE_DST] = qemu_img_dst.detect_backing_file(inst[EPHEMERAL][PATH_DST],
-                                                                                 host_compute_dst)
+            backing_file_dst = qemu_img_dst.detect_backing_file(inst[EPHEMERAL][PATH_DST],
+                                                                host_compute_dst)
+            inst = utl.update_path(inst, [EPHEMERAL, BACKING_FILE_DST], backing_file_dst)
             self.delete_remote_file_on_compute(inst[EPHEMERAL][PATH_DST], host_dst, host_compute_dst)
             qemu_img_src.convert(utl.QCOW2, 'rbd:%s' % inst[EPHEMERAL][PATH_SRC], path_src_id_temp)
-            inst[EPHEMERAL][PATH_SRC] = path_src_id_temp
+            instances[inst_id] = utl.update_path(inst, [EPHEMERAL, PATH_SRC], path_src_id_temp)
 
         transporter.run(info=info)
 
@@ -165,12 +163,12 @@ class TransportEphemeral(action.Action):
             resource_name=utl.INSTANCES_TYPE,
             resource_root_name=utl.EPHEMERAL_BODY)
 
-        for inst_id, inst in instances.iteritems():
+        for inst_id, inst in instances.items():
             path_src = inst[EPHEMERAL][PATH_SRC]
             path_src_temp_raw = path_src + "." + utl.RAW
 
             host_src = inst[EPHEMERAL][HOST_SRC]
             qemu_img_src.convert(utl.RAW, path_src, path_src_temp_raw, host_src)
-            inst[EPHEMERAL][PATH_SRC] = path_src_temp_raw
+            instances[inst_id] = utl.update_path(inst, [EPHEMERAL, PATH_SRC], path_src_temp_raw)
 
         transporter.run(info=info)
@@ -13,8 +13,6 @@
 # limitations under the License.
 
 
-import copy
-
 from fabric.api import env
 from fabric.api import run
 from fabric.api import settings
@@ -60,7 +58,6 @@ class TransportInstance(action.Action):
     # TODO constants
 
     def run(self, info=None, **kwargs):
-        info = copy.deepcopy(info)
         new_info = {
             utl.INSTANCES_TYPE: {
             }
@@ -83,12 +80,10 @@ class TransportInstance(action.Action):
         }
 
     def deploy_instance(self, dst_cloud, info):
-        info = copy.deepcopy(info)
         dst_compute = dst_cloud.resources[COMPUTE]
 
         new_ids = dst_compute.deploy(info)
-        for i in new_ids.iterkeys():
-            dst_compute.wait_for_status(i, 'active')
+        dst_compute.wait_for_status(new_ids.keys(), 'active')
         new_info = dst_compute.read_info(search_opts={'id': new_ids.keys()})
         for i in new_ids.iterkeys():
             dst_compute.change_status('shutoff', instance_id=i)
@@ -100,8 +95,6 @@ class TransportInstance(action.Action):
         return info
 
     def prepare_ephemeral_drv(self, info, new_info, map_new_to_old_ids):
-        info = copy.deepcopy(info)
-        new_info = copy.deepcopy(new_info)
         for new_id, old_id in map_new_to_old_ids.iteritems():
             instance_old = info[INSTANCES][old_id]
             instance_new = new_info[INSTANCES][new_id]
@@ -35,8 +35,9 @@ class UploadFileToImage(action.Action):
             image_id = info[INSTANCES][instance_id][utl.INSTANCE_BODY]['image_id']
             base_file = "%s/%s" % (self.cloud.cloud_config.cloud.temp, "temp%s_base" % instance_id)
             image_name = "%s-image" % instance_id
-            images = img_res.read_info(image_id=image_id)[utl.IMAGES_TYPE]
-            image_format = images[image_id][utl.IMAGE_BODY]['disk_format']
+            image_format = self.memoize(
+                'disk_format', [cfg.host, image_id],
+                lambda: self.get_disk_format(img_res, image_id))
             if img_res.config.image.convert_to_raw:
                 image_format = utl.RAW
             # action
@@ -57,3 +58,8 @@ class UploadFileToImage(action.Action):
         return {
             'info': info
         }
+
+    @staticmethod
+    def get_disk_format(img_res, image_id):
+        images = img_res.read_info(image_id=image_id)[utl.IMAGES_TYPE]
+        return images[image_id][utl.IMAGE_BODY]['disk_format']
@@ -14,13 +14,15 @@
 
 
 import copy
-import time
+import datetime
 from sqlalchemy import exc
 
 from novaclient.v1_1 import client as nova_client
 
 from cloudferrylib.base import compute
+from cloudferrylib.scheduler import coroutine
 from cloudferrylib.utils import mysql_connector
+from cloudferrylib.utils import poller
 from cloudferrylib.utils import timeout_exception
 from cloudferrylib.utils import utils as utl
 
@@ -44,7 +46,9 @@ class NovaCompute(compute.Compute):
         self.identity = cloud.resources['identity']
         self.mysql_connector = mysql_connector.MysqlConnector(config.mysql,
                                                               'nova')
-        self.nova_client = self.proxy(self.get_client(), config)
+        self.nova_client = self.proxy(self.get_client(), config,
+                                      utl.COMPUTE_RESOURCE)
+        self.status_poller = None
 
     def get_client(self, params=None):
         """Getting nova client. """
@@ -438,7 +442,9 @@ class NovaCompute(compute.Compute):
                                                  marker=marker, limit=limit)
         else:
             if type(ids) is list:
-                return [self.nova_client.servers.get(i) for i in ids]
+                return coroutine.run([
+                    coroutine.call(self.nova_client.servers.get, i)
+                    for i in ids])
             else:
                 return [self.nova_client.servers.get(ids)]
 
@@ -458,7 +464,7 @@ class NovaCompute(compute.Compute):
             'unpaused': lambda instance: instance.unpause(),
             'suspend': lambda instance: instance.suspend(),
             'status': lambda status: lambda instance: self.wait_for_status(
-                instance_id,
+                instance.id,
                 status)
         }
         map_status = {
@@ -513,14 +519,31 @@ class NovaCompute(compute.Compute):
             return True
 
     def wait_for_status(self, id_obj, status, limit_retry=90):
-        count = 0
-        getter = self.nova_client.servers
-        while getter.get(id_obj).status.lower() != status.lower():
-            time.sleep(2)
-            count += 1
-            if count > limit_retry:
-                raise timeout_exception.TimeoutException(
-                    getter.get(id_obj).status.lower(), status, "Timeout exp")
+        """
+        Waiting for the instance (or every instance of the list id_obj)
+        to get the status, limit_retry * 2 seconds at most.
+        """
+
+        ids = id_obj if isinstance(id_obj, list) else [id_obj]
+        status_poller = self.get_status_poller()
+        for i in ids:
+            status_poller.add(i, status, timeout=limit_retry * 2)
+        status_poller.wait(ids)
+
+    def get_status_poller(self):
+        if self.status_poller is None:
+            self.status_poller = poller.StatusPoller(
+                self.nova_client.servers.get,
+                self.get_changed_instances,
+                changes_since=True)
+        return self.status_poller
+
+    def get_changed_instances(self, since=None):
+        search_opts = {'all_tenants': True}
+        if since:
+            search_opts['changes-since'] = datetime.datetime.utcfromtimestamp(
+                since).isoformat()
+        return self.nova_client.servers.list(search_opts=search_opts)
 
     def get_flavor_from_id(self, flavor_id):
         return self.nova_client.flavors.get(flavor_id)
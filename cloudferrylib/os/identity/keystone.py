@@ -13,11 +13,16 @@
 # limitations under the License.
 
 
+import itertools
+
 from keystoneclient.v2_0 import client as keystone_client
 
 from cloudferrylib.base import identity
+from cloudferrylib.scheduler import coroutine
+from cloudferrylib.utils import catalog
 from cloudferrylib.utils import GeneratorPassword
 from cloudferrylib.utils import Postman
+from cloudferrylib.utils import mysql_connector
 from cloudferrylib.utils import Templater
 from cloudferrylib.utils import utils as utl
 
@@ -26,6 +31,9 @@ LOG = utl.get_log(__name__)
 
 NOVA_SERVICE = 'nova'
 
+# (user, tenant) pairs asked for roles at a time without the keystone DB
+ROLES_CHUNK_SIZE = 1000
+
 
 class KeystoneIdentity(identity.Identity):
     """The main class for working with OpenStack Keystone Identity Service."""
@@ -33,7 +41,8 @@ class KeystoneIdentity(identity.Identity):
     def __init__(self, config, cloud):
         super(KeystoneIdentity, self).__init__()
         self.config = config
-        self.keystone_client = self.proxy(self.get_client(), config)
+        self.keystone_client = self.proxy(self.get_client(), config,
+                                          utl.IDENTITY_RESOURCE)
         self.mysql_connector = cloud.mysql_connector
         self.cloud = cloud
         self.postman = None
@@ -44,6 +53,18 @@ class KeystoneIdentity(identity.Identity):
                                    self.config['mail']['server'])
         self.templater = Templater()
         self.generator = GeneratorPassword()
+        ttl = float((config.get(utl.IDENTITY_RESOURCE) or {}).get(
+            'catalog_ttl') or 0)
+        self.tenants = catalog.Catalog(self.keystone_client.tenants.list,
+                                       ttl=ttl)
+        self.users = catalog.Catalog(self.keystone_client.users.list,
+                                     ttl=ttl)
+        self.services = catalog.Catalog(self.keystone_client.services.list,
+                                        keys=('id', 'name', 'type'),
+                                        ttl=ttl)
+        self.endpoints = catalog.Catalog(
+            self.keystone_client.endpoints.list,
+            keys=('id', 'service_id'), ttl=ttl)
 
     @staticmethod
     def convert(identity_obj, cfg):
@@ -131,24 +152,22 @@ class KeystoneIdentity(identity.Identity):
     def get_service_name_by_type(self, service_type):
         """Getting service_name from keystone. """
 
-        for service in self.get_services_list():
-            if service.type == service_type:
-                return service.name
-        return NOVA_SERVICE
+        service = self.services.get('type', service_type)
+        return service.name if service else NOVA_SERVICE
 
     def get_public_endpoint_service_by_id(self, service_id):
         """Getting endpoint public URL from keystone. """
 
-        for endpoint in self.keystone_client.endpoints.list():
-            if endpoint.service_id == service_id:
-                return endpoint.publicurl
+        endpoint = self.endpoints.get('service_id', service_id)
+        if endpoint:
+            return endpoint.publicurl
 
     def get_service_id(self, service_name):
         """Getting service_id from keystone. """
 
-        for service in self.get_services_list():
-            if service.name == service_name:
-                return service.id
+        service = self.services.get('name', service_name)
+        if service:
+            return service.id
 
     def get_endpoint_by_service_name(self, service_name):
         """ Getting endpoint public URL by service name from keystone. """
@@ -166,37 +185,37 @@ class KeystoneIdentity(identity.Identity):
         return func
 
     def get_tenant_id_by_name(self, name):
-        for tenant in self.get_tenants_list():
-            if tenant.name == name:
-                return tenant.id
-        return None
+        tenant = self.tenants.get('name', name)
+        return tenant.id if tenant else None
 
     def get_tenant_by_name(self, tenant_name):
         """ Getting tenant by name from keystone. """
 
-        for tenant in self.get_tenants_list():
-            if tenant.name == tenant_name:
-                return tenant
+        return self.tenants.get('name', tenant_name)
 
     def get_tenant_by_id(self, tenant_id):
         """ Getting tenant by id from keystone. """
 
-        return self.keystone_client.tenants.get(tenant_id)
+        tenant = self.tenants.get('id', tenant_id)
+        if tenant is None:
+            tenant = self.keystone_client.tenants.get(tenant_id)
+            self.tenants.add(tenant)
+        return tenant
 
     def get_services_list(self):
         """ Getting list of available services from keystone. """
 
-        return self.keystone_client.services.list()
+        return self.services.list()
 
     def get_tenants_list(self):
         """ Getting list of tenants from keystone. """
 
-        return self.keystone_client.tenants.list()
+        return self.tenants.list()
 
     def get_users_list(self):
         """ Getting list of users from keystone. """
 
-        return self.keystone_client.users.list()
+        return self.users.list()
 
     def get_roles_list(self):
         """ Getting list of available roles from keystone. """
@@ -216,28 +235,34 @@ class KeystoneIdentity(identity.Identity):
     def create_tenant(self, tenant_name, description=None, enabled=True):
         """ Create new tenant in keystone. """
 
-        return self.keystone_client.tenants.create(tenant_name=tenant_name,
-                                                   description=description,
-                                                   enabled=enabled)
+        tenant = self.keystone_client.tenants.create(tenant_name=tenant_name,
+                                                     description=description,
+                                                     enabled=enabled)
+        self.tenants.add(tenant)
+        return tenant
 
     def create_user(self, name, password=None, email=None, tenant_id=None,
                     enabled=True):
         """ Create new user in keystone. """
 
-        return self.keystone_client.users.create(name=name,
+        user = self.keystone_client.users.create(name=name,
                                                  password=password,
                                                  email=email,
                                                  tenant_id=tenant_id,
                                                  enabled=enabled)
+        self.users.add(user)
+        return user
 
     def update_tenant(self, tenant_id, tenant_name=None, description=None,
                       enabled=None):
         """Update a tenant with a new name and description."""
 
-        return self.keystone_client.tenants.update(tenant_id,
-                                                   tenant_name=tenant_name,
-                                                   description=description,
-                                                   enabled=enabled)
+        tenant = self.keystone_client.tenants.update(tenant_id,
+                                                     tenant_name=tenant_name,
+                                                     description=description,
+                                                     enabled=enabled)
+        self.tenants.add(tenant)
+        return tenant
 
     def update_user(self, user, **kwargs):
         """Update user data.
@@ -245,7 +270,9 @@ class KeystoneIdentity(identity.Identity):
         Supported arguments include ``name``, ``email``, and ``enabled``.
         """
 
-        return self.keystone_client.users.update(user, **kwargs)
+        user = self.keystone_client.users.update(user, **kwargs)
+        self.users.add(user)
+        return user
 
     def get_auth_token_from_user(self):
         return self.keystone_client.auth_token_from_user
@@ -321,17 +348,60 @@ class KeystoneIdentity(identity.Identity):
         return info
 
     def _get_user_tenants_roles(self):
-        user_tenants_roles = {}
+        """
+        Roles of users by tenant names, tenants without roles of the user
+        are left out.
+        """
+
+        users = self.get_users_list()
         tenants = self.get_tenants_list()
-        for user in self.get_users_list():
-            user_tenants_roles[user.name] = {}
-            for tenant in tenants:
-                roles = []
-                for role in self.roles_for_user(user.id, tenant.id):
-                    roles.append({'role': {'name': role.name, 'id': role.id}})
-                user_tenants_roles[user.name][tenant.name] = roles
+        try:
+            assignments = self._get_role_assignments_from_db()
+        except Exception as e:
+            LOG.warning("Can't read role assignments from keystone DB (%s), "
+                        "asking roles of every user in every tenant", e)
+            assignments = self._get_role_assignments(users, tenants)
+        user_names = {user.id: user.name for user in users}
+        tenant_names = {tenant.id: tenant.name for tenant in tenants}
+        user_tenants_roles = {user.name: {} for user in users}
+        for user_id, tenant_id, role in assignments:
+            if user_id not in user_names or tenant_id not in tenant_names:
+                continue
+            user_tenants_roles[user_names[user_id]].setdefault(
+                tenant_names[tenant_id], []).append({'role': role})
         return user_tenants_roles
 
+    def _get_role_assignments_from_db(self):
+        """ (user id, tenant id, role) of all the roles by one query """
+
+        roles = {role.id: role.name for role in self.get_roles_list()}
+        connector = mysql_connector.MysqlConnector(self.config.mysql,
+                                                   'keystone')
+        rows = connector.execute(
+            "SELECT actor_id, target_id, role_id FROM assignment "
+            "WHERE type = 'UserProject'")
+        return [(user_id, tenant_id, {'name': roles[role_id], 'id': role_id})
+                for user_id, tenant_id, role_id in rows if role_id in roles]
+
+    def _get_role_assignments(self, users, tenants):
+        """
+        (user id, tenant id, role) of all the roles by the API, the calls
+        are run by coroutine workers (migrate.async_workers) at a time.
+        """
+
+        pairs = ((user.id, tenant.id) for user in users for tenant in tenants)
+        while True:
+            chunk = list(itertools.islice(pairs, ROLES_CHUNK_SIZE))
+            if not chunk:
+                break
+            results = coroutine.run([
+                coroutine.call(self.roles_for_user, user_id, tenant_id)
+                for user_id, tenant_id in chunk])
+            for (user_id, tenant_id), roles in zip(chunk, results):
+                for role in roles:
+                    yield user_id, tenant_id, {'name': role.name,
+                                               'id': role.id}
+
     def _upload_user_passwords(self, users, user_passwords):
         for _user in users:
             user = _user['user']
@@ -351,12 +421,16 @@ class KeystoneIdentity(identity.Identity):
             # to change self role without logout
             if user['name'] == self.keystone_client.username:
                 continue
+            tenants_roles = user_tenants_roles.get(user['name'], {})
             for _tenant in tenants:
                 tenant = _tenant['tenant']
+                roles = tenants_roles.get(tenant['name'])
+                if not roles:
+                    continue
                 exists_roles = [role.name for role in
                                 self.roles_for_user(_user['meta']['new_id'],
                                                     _tenant['meta']['new_id'])]
-                for _role in user_tenants_roles[user['name']][tenant['name']]:
+                for _role in roles:
                     role = _role['role']
                     if role['name'] in exists_roles:
                         continue
@@ -15,7 +15,6 @@
 
 import copy
 import json
-import time
 
 from fabric.api import run
 from fabric.api import settings
@@ -23,7 +22,10 @@ from fabric.api import settings
 from glanceclient.v1 import client as glance_client
 
 from cloudferrylib.base import image
+from cloudferrylib.utils import concurrency
 from cloudferrylib.utils import file_like_proxy
+from cloudferrylib.utils import locks
+from cloudferrylib.utils import poller
 from cloudferrylib.utils import utils as utl
 
 
@@ -41,7 +43,9 @@ class GlanceImage(image.Image):
         self.host = config.cloud.host
         self.cloud = cloud
         self.identity_client = cloud.resources['identity']
-        self.glance_client = self.proxy(self.get_client(), config)
+        self.glance_client = self.proxy(self.get_client(), config,
+                                        utl.IMAGE_RESOURCE)
+        self.status_poller = None
         super(GlanceImage, self).__init__(config)
 
     def get_client(self):
@@ -191,18 +195,11 @@ class GlanceImage(image.Image):
                     migrate_images_list.append(
                         (dst_img_checksums[checksum_current], meta))
                     continue
-                migrate_image = self.create_image(
-                    name=gl_image['image']['name'],
-                    container_format=gl_image['image']['container_format'],
-                    disk_format=gl_image['image']['disk_format'],
-                    is_public=gl_image['image']['is_public'],
-                    protected=gl_image['image']['protected'],
-                    size=gl_image['image']['size'],
-                    properties=gl_image['image']['properties'],
-                    data=file_like_proxy.FileLikeProxy(
-                        gl_image['image'],
-                        callback,
-                        self.config['migrate']['speed_limit']))
+                # workers migrating instances of the same image wait for
+                # the first one to upload it and reuse the image
+                with locks.lock('image', (checksum_current, name_current)):
+                    migrate_image = self.upload_image(gl_image['image'],
+                                                      callback)
                 migrate_images_list.append((migrate_image, meta))
             else:
                 empty_image_list[image_id_src] = gl_image
@@ -213,9 +210,48 @@ class GlanceImage(image.Image):
         new_info['images'].update(empty_image_list)
         return new_info
 
-    def wait_for_status(self, id_res, status):
-        while self.glance_client.images.get(id_res).status != status:
-            time.sleep(1)
+    def upload_image(self, image_info, callback=None):
+        for dst_image in self.get_image_list():
+            if (dst_image.checksum == image_info['checksum'] and
+                    dst_image.name == image_info['name']):
+                return dst_image
+        with concurrency.transfer_slot() as stream:
+            migrate_image = self.create_image(
+                name=image_info['name'],
+                container_format=image_info['container_format'],
+                disk_format=image_info['disk_format'],
+                is_public=image_info['is_public'],
+                protected=image_info['protected'],
+                size=image_info['size'],
+                properties=image_info['properties'],
+                data=file_like_proxy.FileLikeProxy(
+                    image_info,
+                    callback,
+                    self.config['migrate']['speed_limit']))
+            stream.bytes = image_info['size']
+        return migrate_image
+
+    def wait_for_status(self, id_res, status, timeout=None):
+        """
+        Waiting for the image (or every image of the list id_res) to get
+        the status, migrate.status_timeout seconds by default.
+        """
+
+        ids = id_res if isinstance(id_res, list) else [id_res]
+        if timeout is None:
+            timeout = self.config.migrate.status_timeout
+        status_poller = self.get_status_poller()
+        for i in ids:
+            status_poller.add(i, status, timeout=timeout)
+        status_poller.wait(ids)
+
+    def get_status_poller(self):
+        if self.status_poller is None:
+            self.status_poller = poller.StatusPoller(
+                self.glance_client.images.get,
+                lambda since: self.glance_client.images.list(
+                    filters={'is_public': None}))
+        return self.status_poller
 
     def patch_image(self, backend_storage, image_id):
         if backend_storage == 'ceph':
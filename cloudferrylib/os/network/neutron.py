@@ -38,7 +38,8 @@ class NeutronNetwork(network.Network):
         self.cloud = cloud
         self.identity_client = cloud.resources['identity']
         # TODO: implement switch to quantumclient if we have quantum-server
-        self.neutron_client = self.proxy(self.get_client(), config)
+        self.neutron_client = self.proxy(self.get_client(), config,
+                                         utl.NETWORK_RESOURCE)
 
     def get_client(self):
         return neutron_client.Client(
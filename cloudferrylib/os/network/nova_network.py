@@ -20,13 +20,15 @@ from fabric.api import settings
 from novaclient.v1_1 import client as nova_client
 
 from cloudferrylib.base import network
+from cloudferrylib.utils import utils as utl
 from cloudferrylib.utils.utils import forward_agent
 
 
 class NovaNetwork(network.Network):
     def __init__(self, config, cloud):
         super(NovaNetwork, self).__init__(config)
-        self.nova_client = self.proxy(self.get_client(), config)
+        self.nova_client = self.proxy(self.get_client(), config,
+                                      utl.NETWORK_RESOURCE)
         self.cloud = cloud
 
     def get_client(self):
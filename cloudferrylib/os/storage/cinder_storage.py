@@ -13,15 +13,15 @@
 # limitations under the License.
 
 
-import time
-
 from fabric.api import run
 from fabric.api import settings
 
 from cinderclient.v1 import client as cinder_client
 
 from cloudferrylib.base import storage
+from cloudferrylib.scheduler import coroutine
 from cloudferrylib.utils import mysql_connector
+from cloudferrylib.utils import poller
 from cloudferrylib.utils import utils as utl
 
 
@@ -42,7 +42,9 @@ class CinderStorage(storage.Storage):
             if config.mysql.host else self.host
         self.cloud = cloud
         self.identity_client = cloud.resources[utl.IDENTITY_RESOURCE]
-        self.cinder_client = self.proxy(self.get_client(config), config)
+        self.cinder_client = self.proxy(self.get_client(config), config,
+                                        utl.STORAGE_RESOURCE)
+        self.status_poller = None
         super(CinderStorage, self).__init__(config)
 
     def get_client(self, params=None):
@@ -59,14 +61,21 @@ class CinderStorage(storage.Storage):
 
     def read_info(self, **kwargs):
         info = {utl.VOLUMES_TYPE: {}}
-        for vol in self.get_volumes_list(search_opts=kwargs):
-            volume = self.convert_volume(vol, self.config, self.cloud)
+        vols = self.get_volumes_list(search_opts=kwargs)
+        volumes = [self.convert_volume(vol, self.config, self.cloud)
+                   for vol in vols]
+        snaps_of_volumes = [[] for _ in volumes]
+        if self.config.migrate.keep_volume_snapshots:
+            # snapshots of all the volumes are listed at the same time
+            snaps_of_volumes = coroutine.run([
+                self.get_async().get_snapshots_list(
+                    search_opts={'volume_id': volume['id']})
+                for volume in volumes])
+        for vol, volume, snaps in zip(vols, volumes, snaps_of_volumes):
             snapshots = {}
-            if self.config.migrate.keep_volume_snapshots:
-                search_opts = {'volume_id': volume['id']}
-                for snap in self.get_snapshots_list(search_opts=search_opts):
-                    snapshot = self.convert_snapshot(snap, volume, self.config, self.cloud)
-                    snapshots[snapshot['id']] = snapshot
+            for snap in snaps:
+                snapshot = self.convert_snapshot(snap, volume, self.config, self.cloud)
+                snapshots[snapshot['id']] = snapshot
             info[utl.VOLUMES_TYPE][vol.id] = {utl.VOLUME_BODY: volume,
                                               'snapshots': snapshots,
                                               utl.META_INFO: {
@@ -151,9 +160,27 @@ class CinderStorage(storage.Storage):
     def get_status(self, resource_id):
         return self.cinder_client.volumes.get(resource_id).status
 
-    def wait_for_status(self, resource_id, status, limit_retry=60):
-        while self.get_status(resource_id) != status:
-            time.sleep(1)
+    def wait_for_status(self, resource_id, status, timeout=None):
+        """
+        Waiting for the volume (or every volume of the list resource_id)
+        to get the status, migrate.status_timeout seconds by default.
+        """
+
+        ids = resource_id if isinstance(resource_id, list) else [resource_id]
+        if timeout is None:
+            timeout = self.config.migrate.status_timeout
+        status_poller = self.get_status_poller()
+        for i in ids:
+            status_poller.add(i, status, timeout=timeout)
+        status_poller.wait(ids)
+
+    def get_status_poller(self):
+        if self.status_poller is None:
+            self.status_poller = poller.StatusPoller(
+                self.cinder_client.volumes.get,
+                lambda since: self.get_volumes_list(
+                    search_opts={'all_tenants': True}))
+        return self.status_poller
 
     def deploy_volumes(self, info):
         new_ids = {}
@@ -163,9 +190,10 @@ class CinderStorage(storage.Storage):
             vol_for_deploy = self.convert_to_params(vol)
             volume = self.create_volume(**vol_for_deploy)
             vol[utl.VOLUME_BODY]['id'] = volume.id
-            self.wait_for_status(volume.id, AVAILABLE)
-            self.finish(vol)
             new_ids[volume.id] = vol_id
+        self.wait_for_status(new_ids.keys(), AVAILABLE)
+        for vol in info[utl.VOLUMES_TYPE].itervalues():
+            self.finish(vol)
         return new_ids
 
     def deploy_volumes_db(self, info):
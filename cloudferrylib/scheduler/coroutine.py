@@ -0,0 +1,281 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import collections
+import functools
+import inspect
+import os
+import Queue
+import sys
+import threading
+from multiprocessing import pool as thread_pool
+
+
+DEFAULT_WORKERS = 20
+POLL_INTERVAL = 1
+
+workers = DEFAULT_WORKERS
+
+# loop of the thread, a call run by a worker of a loop may run coroutines
+# too and it gets a loop of its own
+_local = threading.local()
+
+
+class Return(Exception):
+    """ Raised by a coroutine to return a value (generators can't) """
+
+    def __init__(self, value=None):
+        super(Return, self).__init__(value)
+        self.value = value
+
+
+class Call(object):
+    """
+    Blocking call yielded by a coroutine, it is run by a worker thread of
+    the loop. Exclusive calls (fabric commands, fabric state is global) are
+    run one at a time by their own thread.
+    """
+
+    def __init__(self, func, args=(), kwargs=None, exclusive=False):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.exclusive = exclusive
+
+    def __call__(self):
+        try:
+            return True, self.func(*self.args, **self.kwargs)
+        except Exception:
+            return False, sys.exc_info()
+
+
+def call(func, *args, **kwargs):
+    return Call(func, args, kwargs)
+
+
+def remote(func, *args, **kwargs):
+    return Call(func, args, kwargs, exclusive=True)
+
+
+class Future(object):
+    def __init__(self):
+        self.done = False
+        self.result = None
+        self.error = None
+        self.callbacks = []
+
+    def set(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.done = True
+        for callback in self.callbacks:
+            callback(self)
+        self.callbacks = []
+
+    def add_done_callback(self, callback):
+        if self.done:
+            callback(self)
+        else:
+            self.callbacks.append(callback)
+
+    def get(self):
+        if self.error:
+            raise self.error[0], self.error[1], self.error[2]
+        return self.result
+
+
+class Coroutine(object):
+    """ Steps the generator every time what it yielded is done """
+
+    def __init__(self, loop, gen):
+        self.loop = loop
+        self.gen = gen
+        self.future = Future()
+
+    def step(self, future=None):
+        try:
+            if future is None:
+                yielded = self.gen.next()
+            elif future.error:
+                yielded = self.gen.throw(*future.error)
+            else:
+                yielded = self.gen.send(future.result)
+        except StopIteration:
+            self.future.set()
+        except Return as r:
+            self.future.set(r.value)
+        except Exception:
+            self.future.set(error=sys.exc_info())
+        else:
+            self.loop.wrap(yielded).add_done_callback(self.wakeup)
+
+    def wakeup(self, future):
+        self.loop.ready.append((self.step, future))
+
+
+class EventLoop(object):
+    """
+    Runs coroutines, generators which yield what they wait for:
+
+        * Call - a blocking call (API request, remote command), run by one
+          of `workers` threads, the result is sent back to the generator,
+          the exception is raised in it;
+        * another coroutine, its Return value is sent back;
+        * a list of the above - they are run together and the list of
+          their results is sent back.
+
+    All the coroutines are stepped by the thread running the loop, so
+    hundreds of outstanding calls cost only the threads of the loop.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = workers
+        self.pid = None
+        self.pool = None
+        self.exclusive_pool = None
+        self.results = Queue.Queue()
+        self.ready = collections.deque()
+        self.outstanding = 0
+        self.running = False
+
+    def get_pools(self):
+        # threads of the pools don't survive fork of the process
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.pool = thread_pool.ThreadPool(self.workers)
+            self.exclusive_pool = thread_pool.ThreadPool(1)
+            self.results = Queue.Queue()
+            self.outstanding = 0
+        return self.pool, self.exclusive_pool
+
+    def close(self):
+        if self.pid == os.getpid():
+            self.pool.terminate()
+            self.exclusive_pool.terminate()
+        self.pid = None
+
+    def wrap(self, obj):
+        if isinstance(obj, Future):
+            return obj
+        if isinstance(obj, Call):
+            return self.submit(obj)
+        if inspect.isgenerator(obj):
+            coro = Coroutine(self, obj)
+            self.ready.append((coro.step, None))
+            return coro.future
+        if isinstance(obj, (list, tuple)):
+            return self.gather([self.wrap(o) for o in obj])
+        raise TypeError("Coroutine yielded %r, it is not a call, "
+                        "a coroutine or a list of them" % (obj,))
+
+    def submit(self, call):
+        pool, exclusive_pool = self.get_pools()
+        future = Future()
+        self.outstanding += 1
+        (exclusive_pool if call.exclusive else pool).apply_async(
+            call, callback=lambda result: self.results.put((future, result)))
+        return future
+
+    @staticmethod
+    def gather(futures):
+        gathered = Future()
+        left = [len(futures)]
+
+        def done(_):
+            left[0] -= 1
+            if left[0]:
+                return
+            for future in futures:
+                if future.error:
+                    gathered.set(error=future.error)
+                    return
+            gathered.set([f.result for f in futures])
+
+        if not futures:
+            gathered.set([])
+        for future in futures:
+            future.add_done_callback(done)
+        return gathered
+
+    def run(self, coro):
+        """ Running the loop until the coroutine (or calls) are done """
+
+        self.running = True
+        try:
+            return self.run_until_done(self.wrap(coro))
+        finally:
+            self.running = False
+
+    def run_until_done(self, future):
+        while not future.done:
+            while self.ready:
+                step, arg = self.ready.popleft()
+                step(arg)
+            if future.done:
+                break
+            if not self.outstanding:
+                raise RuntimeError("Coroutine waits for nothing")
+            try:
+                done, (success, result) = self.results.get(
+                    timeout=POLL_INTERVAL)
+            except Queue.Empty:
+                continue
+            self.outstanding -= 1
+            if success:
+                done.set(result)
+            else:
+                done.set(error=result)
+        return future.get()
+
+
+class Adapter(object):
+    """
+    Async adapter of an object (a resource of cloudferrylib.os), its
+    methods return Calls to be yielded by coroutines instead of blocking.
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __getattr__(self, name):
+        attr = getattr(self.obj, name)
+        if not callable(attr):
+            return attr
+        return functools.partial(call, attr)
+
+
+def init(num_workers):
+    global workers
+    workers = num_workers or DEFAULT_WORKERS
+
+
+def get_loop():
+    loop = getattr(_local, 'loop', None)
+    if loop is None or loop.workers != workers:
+        if loop:
+            loop.close()
+        loop = _local.loop = EventLoop(workers)
+    return loop
+
+
+def run(coro):
+    loop = get_loop()
+    if not loop.running:
+        return loop.run(coro)
+    # run from a step of a coroutine of the running loop of the thread
+    loop = EventLoop(workers)
+    try:
+        return loop.run(coro)
+    finally:
+        loop.close()
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and#
 # limitations under the License.
 
+import collections
 __author__ = 'mirrorcoder'
 
 DEFAULT = 0
@@ -23,10 +24,19 @@ class Cursor(object):
         self.net = net
         self.next_iter = None
         self.threads = []
+        self.jump_to = None
         self.to_start()
 
+    def jump(self, element):
+        """ The element is the next one, the net goes on from it """
+
+        self.jump_to = element
+
     def next(self):
-        if not self.next_iter:
+        if self.jump_to:
+            self.next_iter, self.jump_to = self.jump_to, None
+            self.threads = [i for i in self.next_iter.parall_elem]
+        elif not self.next_iter:
             self.next_iter = self.net
             self.threads = [i for i in self.next_iter.parall_elem]
         else:
@@ -53,6 +63,31 @@ class Cursor(object):
     def current(self):
         return self.net
 
+    def get_position(self):
+        return self.next_iter, list(self.threads)
+
+    def set_position(self, next_iter, threads):
+        self.next_iter = next_iter
+        self.threads = list(threads)
+
+    @staticmethod
+    def elements(net):
+        """ Getting all elements of the net in the same order every time """
+
+        elements = []
+        visited = set()
+        queue = collections.deque([Cursor.forward_back(net)])
+        while queue:
+            elem = queue.popleft()
+            if elem is None or id(elem) in visited:
+                continue
+            visited.add(id(elem))
+            elements.append(elem)
+            queue.extend(getattr(elem, 'next_element', []))
+            queue.extend(getattr(elem, 'parall_elem', []))
+            queue.append(getattr(elem, 'error_handler', None))
+        return elements
+
     @staticmethod
     def forward_back(net):
         obj = net
@@ -0,0 +1,258 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import ast
+import inspect
+import textwrap
+
+from cloudferrylib.scheduler.task import BaseTask
+
+
+# analysis of run of a class: (reads, writes), keys are constants or
+# ('self', attr) resolved by the instance, None if unknown
+_analyzed = {}
+
+
+class RunAnalyzer(ast.NodeVisitor):
+    """
+    Finds keys of the namespace `run` reads (named arguments, kwargs[key],
+    kwargs.get(key)) and writes (keys of returned dicts). Any other use of
+    kwargs or a return of something else than a dict makes them unknown.
+    """
+
+    def __init__(self, kwargs_name):
+        self.kwargs_name = kwargs_name
+        self.reads = set()
+        self.writes = set()
+        self.reads_known = True
+        self.writes_known = True
+        self.depth = 0
+
+    @staticmethod
+    def get_key(node):
+        if isinstance(node, ast.Index):
+            node = node.value
+        if isinstance(node, ast.Str):
+            return node.s
+        if (isinstance(node, ast.Attribute) and
+                isinstance(node.value, ast.Name) and node.value.id == 'self'):
+            return ('self', node.attr)
+        return None
+
+    def is_kwargs(self, node):
+        return isinstance(node, ast.Name) and node.id == self.kwargs_name
+
+    def visit_FunctionDef(self, node):
+        self.depth += 1
+        if self.depth == 1:
+            self.generic_visit(node)
+        self.depth -= 1
+
+    def visit_Lambda(self, node):
+        pass
+
+    def visit_Subscript(self, node):
+        if self.is_kwargs(node.value):
+            key = self.get_key(node.slice)
+            if key is None:
+                self.reads_known = False
+            else:
+                self.reads.add(key)
+            return
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        func = node.func
+        if (isinstance(func, ast.Attribute) and self.is_kwargs(func.value) and
+                func.attr == 'get' and node.args):
+            key = self.get_key(node.args[0])
+            if key is None:
+                self.reads_known = False
+            else:
+                self.reads.add(key)
+            for arg in node.args[1:]:
+                self.visit(arg)
+            return
+        self.generic_visit(node)
+
+    def visit_Name(self, node):
+        if self.is_kwargs(node):
+            self.reads_known = False
+
+    def add_writes(self, node):
+        if node is None or (isinstance(node, ast.Name) and
+                            node.id == 'None'):
+            return
+        if not isinstance(node, ast.Dict):
+            self.writes_known = False
+            return
+        for key_node in node.keys:
+            key = self.get_key(key_node)
+            if key is None:
+                self.writes_known = False
+            else:
+                self.writes.add(key)
+
+    def visit_Return(self, node):
+        self.add_writes(node.value)
+        self.generic_visit(node)
+
+    def visit_Raise(self, node):
+        # coroutines return by raise coroutine.Return(value)
+        exc = getattr(node, 'type', None)
+        if (isinstance(exc, ast.Call) and
+                getattr(exc.func, 'attr', getattr(exc.func, 'id', None)) ==
+                'Return'):
+            self.add_writes(exc.args[0] if exc.args else None)
+        self.generic_visit(node)
+
+
+def analyze_run(cls):
+    if cls in _analyzed:
+        return _analyzed[cls]
+    run = cls.run
+    func = getattr(run, 'im_func', run)
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+        tree = ast.parse(source).body[0]
+    except (IOError, TypeError, SyntaxError, IndexError):
+        _analyzed[cls] = (None, None)
+        return _analyzed[cls]
+    args, _, kwargs_name, _ = inspect.getargspec(func)
+    analyzer = RunAnalyzer(kwargs_name)
+    analyzer.visit(tree)
+    reads = set(a for a in args[1:]) | analyzer.reads
+    _analyzed[cls] = (reads if analyzer.reads_known else None,
+                      analyzer.writes if analyzer.writes_known else None)
+    return _analyzed[cls]
+
+
+def resolve(task, keys):
+    if keys is None:
+        return None
+    resolved = set()
+    for key in keys:
+        if isinstance(key, tuple):
+            key = getattr(task, key[1], None)
+            if not isinstance(key, basestring):
+                return None
+        resolved.add(key)
+    return resolved
+
+
+def overrides_call(task):
+    """
+    If the task does its work in __call__ instead of run, like waiting
+    for threads does, so it can't be analyzed or run in a worker
+    """
+
+    call = getattr(task.__class__.__call__, 'im_func', None)
+    return call is not BaseTask.__call__.im_func
+
+
+def get_reads_writes(task):
+    """
+    Keys of the namespace the task reads and writes: declared by `reads`
+    and `writes` of the task or found in the source of its run, None if
+    they are unknown. Side effects out of the namespace are not seen, so
+    the inferred keys are only a guess, declare them if it is wrong.
+    """
+
+    if overrides_call(task):
+        return None, None
+    reads, writes = analyze_run(task.__class__)
+    declared_reads = getattr(task, 'reads', None)
+    declared_writes = getattr(task, 'writes', None)
+    reads = (set(declared_reads) if declared_reads is not None
+             else resolve(task, reads))
+    if declared_writes is not None:
+        return reads, set(declared_writes)
+    writes = resolve(task, writes)
+    if writes is not None and not writes:
+        # the task works by side effects (on the clouds) with what it reads,
+        # so it is kept in order with every task touching these keys
+        writes = reads
+    return reads, writes
+
+
+def conflicts(first, second):
+    """ If second has to wait for first, tasks are given by reads, writes """
+
+    (reads1, writes1), (reads2, writes2) = first, second
+    if None in (reads1, writes1, reads2, writes2):
+        return True
+    return bool(writes1 & reads2 or writes1 & writes2 or reads1 & writes2)
+
+
+def infer_depends(window):
+    """ Indexes of the earlier tasks of the window every task waits for """
+
+    keys = [get_reads_writes(task) for task in window]
+    return [set(j for j in xrange(i) if conflicts(keys[j], keys[i]))
+            for i in xrange(len(window))]
+
+
+def get_chain(net):
+    """ Plain tasks of the net linked by >> from its start """
+
+    chain = []
+    elem = net.go_start() if net else None
+    while elem and len(chain) < 10000:
+        chain.append(elem)
+        elem = elem.next_element[0]
+    return chain
+
+
+def format_keys(keys):
+    return '?' if keys is None else ', '.join(sorted(keys)) or '-'
+
+
+def is_plain(task):
+    return (isinstance(task, BaseTask) and len(task.next_element) == 1 and
+            not task.parall_elem)
+
+
+def report(net):
+    """
+    Reads and writes of every step of the net and groups of consecutive
+    steps which can run at the same time (auto_parallel of DagScheduler).
+    Branches and thread tasks split the steps as they do in DagScheduler.
+    """
+
+    chain = get_chain(net)
+    lines = []
+    line = "%-4s %-40s %-40s %s\n"
+    lines.append(line % ('#', 'Task', 'Reads', 'Writes'))
+    for i, task in enumerate(chain):
+        reads, writes = (get_reads_writes(task) if is_plain(task)
+                         else (None, None))
+        lines.append(line % (i, str(task).split('|')[-1],
+                             format_keys(reads), format_keys(writes)))
+    lines.append("Steps which can run at the same time:\n")
+    start = 0
+    while start < len(chain):
+        end = start
+        while end < len(chain) and is_plain(chain[end]):
+            end += 1
+        levels = []
+        for deps in infer_depends(chain[start:end]):
+            levels.append(max([levels[j] + 1 for j in deps] or [0]))
+        for level in sorted(set(levels)):
+            group = [start + i for i, l in enumerate(levels) if l == level]
+            if len(group) > 1:
+                lines.append("  %s\n" % ", ".join(
+                    "%d %s" % (i, str(chain[i]).split('|')[-1])
+                    for i in group))
+        start = end + 1
+    return ''.join(lines)
@@ -0,0 +1,259 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import cPickle
+import os
+
+from cloudferrylib.scheduler.cursor import Cursor, NO_ELEMENT
+from cloudferrylib.scheduler.namespace import CHILDREN
+from cloudferrylib.utils import utils
+
+
+LOG = utils.get_log(__name__)
+
+INIT_TASK = '__init_task__'
+# variables with more objects are journaled by changed objects
+COLLECTION_SIZE = 16
+# records appended before the journal is rewritten as one snapshot
+SNAPSHOT_EVERY = 500
+
+
+class JournalError(Exception):
+    pass
+
+
+def is_collection(value):
+    """
+    The value is a collection of resources like {'instances': {id: info}}
+    big enough to be journaled by its objects, not as a whole.
+    """
+    if not isinstance(value, dict):
+        return False
+    if not all(isinstance(items, dict) for items in value.itervalues()):
+        return False
+    return sum(len(items) for items in value.itervalues()) > COLLECTION_SIZE
+
+
+class Entries(dict):
+    """
+    Objects of a resource of a journaled collection, keys set or removed
+    since the last save are kept in `dirty`, so that a save costs the
+    number of changes, not the size of the collection. Copies and pickles
+    are plain dicts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(Entries, self).__init__(*args, **kwargs)
+        self.dirty = set()
+
+    def __setitem__(self, key, value):
+        super(Entries, self).__setitem__(key, value)
+        self.dirty.add(key)
+
+    def __delitem__(self, key):
+        super(Entries, self).__delitem__(key)
+        self.dirty.add(key)
+
+    def pop(self, key, *default):
+        self.dirty.add(key)
+        return super(Entries, self).pop(key, *default)
+
+    def popitem(self):
+        key, value = super(Entries, self).popitem()
+        self.dirty.add(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).iteritems():
+            self[key] = value
+
+    def clear(self):
+        self.dirty.update(self)
+        super(Entries, self).clear()
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class Journal(object):
+    """
+    Journal of a scheduler run: the position of the cursor, the paths
+    chosen by the branches and the changes of the namespace, appended
+    after every completed task. Big collections of resources are
+    journaled by added, replaced and removed objects, their containers
+    are replaced with Entries to track them. Changes of such objects in
+    place after they are journaled are not seen. Clouds,
+    resources and config are not written, they are saved by name and
+    taken from `init` of the resumed run.
+    """
+
+    def __init__(self, path, init=None):
+        self.path = path
+        self.externals = {}
+        # variables as they were journaled:
+        # name -> (value, Entries of resources or None)
+        self.saved = None
+        self.records = 0
+        if init is not None:
+            self.add_external(INIT_TASK, init)
+            for name, obj in init.iteritems():
+                self.add_external(name, obj)
+                for res_name, res in getattr(obj, 'resources', {}).items():
+                    self.add_external('%s.%s' % (name, res_name), res)
+
+    def add_external(self, name, obj):
+        self.externals[name] = obj
+
+    @staticmethod
+    def index_net(net):
+        return Cursor.elements(net)
+
+    def save(self, namespace, cursor):
+        elements = self.index_net(cursor.current())
+        index = dict((id(elem), i) for i, elem in enumerate(elements))
+        next_iter, threads = cursor.get_position()
+        if next_iter not in (None, NO_ELEMENT):
+            next_iter = index[id(next_iter)]
+        variables = dict(namespace.vars)
+        variables[CHILDREN] = dict()
+        record = {
+            'size': len(elements),
+            'paths': [getattr(elem, 'num_element', None)
+                      for elem in elements],
+            'cursor': (next_iter, [index[id(t)] for t in threads]),
+        }
+        snapshot = self.saved is None or self.records >= SNAPSHOT_EVERY
+        if snapshot:
+            record['vars'] = variables
+        else:
+            record.update(self.diff(variables))
+        self.saved = {}
+        for name, value in variables.iteritems():
+            containers = self.track(value) if is_collection(value) else None
+            self.saved[name] = (value, containers)
+        if snapshot:
+            tmp_path = '%s.tmp' % self.path
+            with open(tmp_path, 'wb') as f:
+                self.dump(f, record)
+            os.rename(tmp_path, self.path)
+            self.records = 0
+        else:
+            with open(self.path, 'ab') as f:
+                self.dump(f, record)
+            self.records += 1
+
+    def diff(self, variables):
+        changed, removed, entries = {}, [], {}
+        for name in self.saved:
+            if name not in variables:
+                removed.append(name)
+        for name, value in variables.iteritems():
+            old_value, containers = self.saved.get(name, (None, None))
+            if (value is not old_value or containers is None or
+                    not is_collection(value) or
+                    not self.same_containers(value, containers)):
+                changed[name] = value
+                continue
+            added, gone = {}, []
+            for res_name, items in containers.iteritems():
+                for key in items.dirty:
+                    if key in items:
+                        added[(res_name, key)] = items[key]
+                    else:
+                        gone.append((res_name, key))
+            if added or gone:
+                entries[name] = (added, gone)
+        return {'changed': changed, 'removed': removed, 'entries': entries}
+
+    @staticmethod
+    def track(value):
+        """ Entries of resources of the collection with nothing dirty """
+
+        for res_name, items in value.items():
+            if type(items) is not Entries:
+                value[res_name] = Entries(items)
+            value[res_name].dirty.clear()
+        return dict(value)
+
+    @staticmethod
+    def same_containers(value, containers):
+        return (len(value) == len(containers) and
+                all(value.get(name) is items
+                    for name, items in containers.iteritems()))
+
+    def dump(self, f, record):
+        externals = dict((id(obj), name)
+                         for name, obj in self.externals.iteritems())
+        pickler = cPickle.Pickler(f, cPickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = lambda obj: externals.get(id(obj))
+        pickler.dump(record)
+
+    def read(self):
+        records = []
+        with open(self.path, 'rb') as f:
+            while True:
+                unpickler = cPickle.Unpickler(f)
+                unpickler.persistent_load = self.get_external
+                try:
+                    records.append(unpickler.load())
+                except EOFError:
+                    break
+                except (cPickle.UnpicklingError, ValueError,
+                        AttributeError, IndexError) as e:
+                    if not records:
+                        raise
+                    LOG.warning("Broken end of journal %s is skipped: %s",
+                                self.path, e)
+                    break
+        return records
+
+    def load(self, namespace, cursor):
+        records = self.read()
+        variables = records[0]['vars']
+        for record in records[1:]:
+            for name in record['removed']:
+                variables.pop(name, None)
+            variables.update(record['changed'])
+            for name, (added, gone) in record['entries'].iteritems():
+                value = variables[name]
+                for res_name, key in gone:
+                    value[res_name].pop(key, None)
+                for (res_name, key), obj in added.iteritems():
+                    value.setdefault(res_name, {})[key] = obj
+        state = records[-1]
+        elements = self.index_net(cursor.current())
+        if len(elements) != state['size']:
+            raise JournalError("Journal %s was written for another process "
+                               "of migration" % self.path)
+        for elem, num in zip(elements, state['paths']):
+            if num is not None:
+                elem.set_next_path(num)
+        next_iter, threads = state['cursor']
+        if next_iter not in (None, NO_ELEMENT):
+            next_iter = elements[next_iter]
+        cursor.set_position(next_iter, [elements[t] for t in threads])
+        namespace.vars.clear()
+        namespace.vars.update(variables)
+        LOG.info("Migration is resumed from journal %s", self.path)
+
+    def get_external(self, name):
+        if name not in self.externals:
+            raise JournalError("Object %s of journal %s is unknown" %
+                               (name, self.path))
+        return self.externals[name]
@@ -11,18 +11,99 @@
 # implied.
 # See the License for the specific language governing permissions and#
 # limitations under the License.
+import collections
 import copy
 __author__ = 'mirrorcoder'
 
 CHILDREN = '__children__'
+ERROR_INFO = '__error__'
+
+
+class ScopeVars(collections.MutableMapping):
+    """
+    Variables of a forked namespace. Values of the parent are seen through
+    the chain of scopes, only values written in this scope are kept here.
+    With is_deep_copy a value of the parent is deep copied the first time
+    it is taken from this scope, not at the moment of fork.
+    """
+
+    def __init__(self, parent, is_deep_copy=False):
+        self.parent = parent
+        self.is_deep_copy = is_deep_copy
+        self.own = dict()
+        self.written = set()
+        self.deleted = set()
+
+    def __getitem__(self, key):
+        if key in self.own:
+            return self.own[key]
+        if key in self.deleted:
+            raise KeyError(key)
+        value = self.parent[key]
+        if self.is_deep_copy:
+            value = self.own[key] = copy.deepcopy(value)
+        return value
+
+    def __setitem__(self, key, value):
+        self.own[key] = value
+        self.written.add(key)
+        self.deleted.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.own.pop(key, None)
+        self.written.discard(key)
+        if key in self.parent:
+            self.deleted.add(key)
+
+    def __contains__(self, key):
+        return key in self.own or (key not in self.deleted and
+                                   key in self.parent)
+
+    def __iter__(self):
+        for key in self.own:
+            yield key
+        for key in self.parent:
+            if key not in self.own and key not in self.deleted:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def changes(self):
+        """
+        Getting values written in this scope and keys deleted in it.
+        Values only read (and deep copied) in this scope are not changes.
+        """
+
+        return (dict((k, self.own[k]) for k in self.written),
+                set(self.deleted))
 
 
 class Namespace:
 
-    def __init__(self, vars={}):
+    def __init__(self, vars=None):
+        vars = dict() if vars is None else vars
         if not CHILDREN in vars:
             vars[CHILDREN] = dict()
         self.vars = vars
 
     def fork(self, is_deep_copy=False):
-        return Namespace(copy.copy(self.vars)) if not is_deep_copy else Namespace(copy.deepcopy(self.vars))
+        return Namespace(ScopeVars(self.vars, is_deep_copy))
+
+    def merge(self, child, keys=None):
+        """
+        Applying what was written and deleted in the forked namespace to
+        this one. `keys` limits the merge to these variables, children of
+        the forked namespace are never merged.
+        """
+
+        written, deleted = child.vars.changes()
+        written.pop(CHILDREN, None)
+        for key, value in written.iteritems():
+            if keys is None or key in keys:
+                self.vars[key] = value
+        for key in deleted:
+            if (keys is None or key in keys) and key in self.vars:
+                del self.vars[key]
@@ -0,0 +1,213 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import collections
+import cPickle
+import multiprocessing
+import Queue
+import traceback
+
+from fabric import state
+
+from cloudferrylib.utils import utils
+
+
+LOG = utils.get_log(__name__)
+
+POLL_INTERVAL = 1
+
+
+class WorkerError(Exception):
+    def __init__(self, msg, tb=None):
+        super(WorkerError, self).__init__(msg, tb)
+        self.msg = msg
+        self.tb = tb
+
+    def __str__(self):
+        return self.msg
+
+
+class Job(object):
+    def __init__(self, key, func, args, kwargs):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+        self.done = False
+
+    def get(self):
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class ProcessPool(object):
+    """
+    Runs jobs in forked processes, at most `size` of them at a time
+    (no limit if size is 0 or None).
+
+    Every job is forked at the moment it is started, so it sees the state
+    of the parent at that moment and nothing has to be sent to it. Only
+    the result (or the exception) of the job is pickled back to the parent.
+    Fabric connections are not shared with the children, the same way as
+    fabric does it in its own parallel mode.
+    """
+
+    def __init__(self, size=1):
+        self.size = max(int(size), 1) if size else None
+        self.queue = multiprocessing.Queue()
+        self.pending = collections.deque()
+        self.running = {}
+        self.finished = collections.deque()
+        self.counter = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.terminate()
+
+    def submit(self, key, func, *args, **kwargs):
+        job = Job(key, func, args, kwargs)
+        self.pending.append(job)
+        self._spawn()
+        return job
+
+    def is_busy(self):
+        return bool(self.pending or self.running or self.finished)
+
+    def wait_any(self):
+        """ Block until any of the submitted jobs is done and return it. """
+
+        if not self.finished:
+            self._collect()
+        return self.finished.popleft() if self.finished else None
+
+    def poll(self):
+        """ Jobs done by now, without waiting for the running ones """
+
+        while True:
+            try:
+                data = self.queue.get_nowait()
+            except Queue.Empty:
+                break
+            self._receive(data)
+        self._reap()
+        self._spawn()
+        jobs = list(self.finished)
+        self.finished.clear()
+        return jobs
+
+    def wait_all(self):
+        job = self.wait_any()
+        while job:
+            yield job
+            job = self.wait_any()
+
+    def wait(self, job):
+        while not job.done:
+            if not self._collect():
+                raise WorkerError("Job %s was not submitted" % job.key)
+        if job in self.finished:
+            self.finished.remove(job)
+        return job.get()
+
+    def _collect(self):
+        while True:
+            self._spawn()
+            if not self.running:
+                return False
+            try:
+                data = self.queue.get(timeout=POLL_INTERVAL)
+            except Queue.Empty:
+                if self._reap():
+                    return True
+                continue
+            if self._receive(data):
+                return True
+
+    def terminate(self):
+        for job, process in self.running.itervalues():
+            process.terminate()
+            process.join()
+        self.running = {}
+        self.pending.clear()
+
+    def _spawn(self):
+        while self.pending and (self.size is None or
+                                len(self.running) < self.size):
+            job = self.pending.popleft()
+            self.counter += 1
+            process = multiprocessing.Process(target=self._work,
+                                              args=(self.counter, job))
+            self.running[self.counter] = (job, process)
+            process.start()
+
+    def _work(self, job_id, job):
+        state.connections.clear()
+        try:
+            data = (True, job.func(*job.args, **job.kwargs))
+        except BaseException as e:
+            tb = traceback.format_exc()
+            if not isinstance(e, Exception):
+                e = WorkerError("Job %s was aborted: %r" % (job.key, e), tb)
+            data = (False, (e, tb))
+        try:
+            data = cPickle.dumps(data, cPickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            msg = ("Result of job %s can't be passed to the parent "
+                   "process: %s (%r)" % (job.key, e, data[1]))
+            data = cPickle.dumps((False, (WorkerError(msg), None)),
+                                 cPickle.HIGHEST_PROTOCOL)
+        self.queue.put((job_id, data))
+
+    def _receive(self, data):
+        job_id, data = data
+        if job_id not in self.running:
+            return None
+        job, process = self.running.pop(job_id)
+        process.join()
+        try:
+            success, result = cPickle.loads(data)
+        except Exception as e:
+            success, result = False, (WorkerError(
+                "Can't load result of job %s: %s" % (job.key, e)), None)
+        if success:
+            self._done(job, result=result)
+        else:
+            error, tb = result
+            if tb:
+                LOG.error("Job %s failed:\n%s", job.key, tb)
+            self._done(job, error=error)
+        self.finished.append(job)
+        return job
+
+    def _reap(self):
+        reaped = False
+        for job_id, (job, process) in self.running.items():
+            if process.exitcode:
+                del self.running[job_id]
+                self._done(job, error=WorkerError(
+                    "Worker of job %s died with exit code %s" %
+                    (job.key, process.exitcode)))
+                self.finished.append(job)
+                reaped = True
+        return reaped
+
+    def _done(self, job, result=None, error=None):
+        job.result = result
+        job.error = error
+        job.done = True
@@ -0,0 +1,74 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import ast
+import importlib
+import inspect
+import os
+
+from cloudferrylib.base.action import action
+
+
+class ActionRegistry(object):
+    """
+    Index of classes of actions by name over packages of actions.
+
+    Classes are found by parsing sources of modules of the packages, all
+    the modules defining a class of the name are kept as candidates and
+    the one where it is an action is taken on lookup. The parsed classes
+    are kept in the `cache` dict between runs and only modules changed
+    since are parsed again. A module is imported the first time one of its
+    actions is taken from the registry.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = {} if cache is None else cache
+        self.index = {}
+        self.changed = False
+
+    def add_package(self, package):
+        path = importlib.import_module(package).__path__[0]
+        modules = self.cache.setdefault(package, {})
+        names = sorted(f[:-3] for f in os.listdir(path) if f.endswith('.py'))
+        for name in set(modules) - set(names):
+            del modules[name]
+            self.changed = True
+        for name in names:
+            file_path = os.path.join(path, '%s.py' % name)
+            mtime = os.path.getmtime(file_path)
+            if name not in modules or modules[name][0] != mtime:
+                modules[name] = (mtime, self.get_classes(file_path))
+                self.changed = True
+            for cls in modules[name][1]:
+                self.index.setdefault(cls, []).append(
+                    '%s.%s' % (package, name))
+
+    @staticmethod
+    def get_classes(file_path):
+        with open(file_path) as f:
+            tree = ast.parse(f.read(), file_path)
+        return [node.name for node in tree.body
+                if isinstance(node, ast.ClassDef)]
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __getitem__(self, name):
+        for module_name in self.index[name]:
+            module = importlib.import_module(module_name)
+            cls = getattr(module, name, None)
+            if inspect.isclass(cls) and issubclass(cls, action.Action):
+                self.index[name] = [module_name]
+                return cls
+        raise KeyError(name)
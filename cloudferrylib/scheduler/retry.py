@@ -0,0 +1,51 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import time
+
+from cloudferrylib.utils import utils
+
+
+LOG = utils.get_log(__name__)
+
+
+class RetryPolicy(object):
+    """
+    Retries a task failed with one of `exceptions` up to `count` times,
+    waiting `backoff` seconds before the first retry and `factor` times
+    longer before every next one, `max_backoff` at most.
+    """
+
+    def __init__(self, count=3, backoff=5, factor=2, max_backoff=300,
+                 exceptions=(Exception,)):
+        self.count = count
+        self.backoff = backoff
+        self.factor = factor
+        self.max_backoff = max_backoff
+        self.exceptions = tuple(exceptions)
+
+    def call(self, func, *args, **kwargs):
+        delay = self.backoff
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except self.exceptions as e:
+                attempt += 1
+                if attempt > self.count:
+                    raise
+                LOG.warning("Attempt %d of %d failed: %s, retry in %s s",
+                            attempt, self.count + 1, e, delay)
+                time.sleep(delay)
+                delay = min(delay * self.factor, self.max_backoff)
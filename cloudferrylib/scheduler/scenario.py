@@ -13,25 +13,40 @@
 # limitations under the License.
 
 __author__ = 'mirrorcoder'
-import cloudferrylib
-import addons
-import imp
+import cPickle
 import os
-import inspect
 import yaml
-from cloudferrylib.base.action import action
+from cloudferrylib.base.action import quarantine
+from cloudferrylib.scheduler import retry
+from cloudferrylib.scheduler.registry import ActionRegistry
+from cloudferrylib.utils import utils
+
+LOG = utils.get_log(__name__)
+
+CACHE_NAME = '.scenario.cache'
 
 
 class Scenario(object):
-    def __init__(self, path_tasks='scenario/tasks.yaml', path_scenario='scenario/migrate.yaml'):
+    def __init__(self, path_tasks='scenario/tasks.yaml', path_scenario='scenario/migrate.yaml',
+                 cache_path=None):
         self.path_tasks = path_tasks
         self.path_scenario = path_scenario
+        if cache_path is None:
+            cache_path = os.path.join(os.path.dirname(path_tasks), CACHE_NAME)
+        self.cache_path = cache_path
+        self.cache = None
+        self.cache_changed = False
+        self.init = {}
+        self.cfg = None
 
     def init_tasks(self, init={}):
-        tasks_file = yaml.load(open(self.path_tasks, 'r'))
-        actions = {}
-        for mod in tasks_file['paths']:
-            actions.update(self.get_actions(mod))
+        self.init = init
+        self.cfg = init.get('cfg')
+        self.tasks = self.create_tasks(init)
+
+    def create_tasks(self, init):
+        tasks_file = self.load_yaml(self.path_tasks)
+        actions = self.get_registry(tasks_file['paths'])
         tasks = {}
         for task in tasks_file['tasks']:
             args = tasks_file['tasks'][task][1:]
@@ -41,17 +56,83 @@ class Scenario(object):
             else:
                 args_map = {}
             tasks[task] = actions[tasks_file['tasks'][task][0]](init, *args, **args_map)
-        self.tasks = tasks
+            self.resolve_factories(tasks[task])
+        return tasks
+
+    def resolve_factories(self, task):
+        """ Names of the process given to iterators become net factories """
+
+        if isinstance(getattr(task, 'net_factory', None), basestring):
+            task.net_factory = self.get_net_factory(task.net_factory)
+        if getattr(task, 'stages', None):
+            task.stages = [self.get_net_factory(stage)
+                           if isinstance(stage, basestring) else stage
+                           for stage in task.stages]
+
+    def get_net_factory(self, name):
+        """
+        Function building the net of the name of the process from new tasks,
+        iterators run it for every object (see ParallelIter).
+        """
+
+        def factory():
+            tasks = self.create_tasks(self.init)
+            process = [{name: self.find_process(self.process, name)}]
+            net = self.construct_net(process, tasks)
+            self.construct_retry(self.process, self.retry, tasks)
+            return net
+        return factory
 
     def load_scenario(self, path_scenario=None):
         if path_scenario is None:
             path_scenario = self.path_scenario
-        migrate = yaml.load(open(path_scenario, 'r'))
+        migrate = self.load_yaml(path_scenario)
         self.process = migrate['process']
         self.namespace = migrate['namespace']
+        self.depends = migrate.get('depends', {})
+        self.on_error = migrate.get('on_error', {})
+        self.retry = migrate.get('retry', {})
+        self.parallel = migrate.get('parallel', {})
 
     def get_net(self):
-        return self.construct_net(self.process, self.tasks)
+        process = self.select_parallel(self.process)
+        net = self.construct_net(process, self.tasks)
+        self.construct_depends(process, self.depends, self.tasks)
+        self.construct_on_error(process, self.on_error, self.tasks)
+        self.construct_retry(process, self.retry, self.tasks)
+        return net
+
+    def select_parallel(self, process):
+        """
+        parallel maps a name of the process to iterators running it, the
+        first one enabled by the config (see ParallelIter.is_enabled) takes
+        the place of the name.
+        """
+
+        selected = []
+        for item in process:
+            name, value = item.items()[0]
+            enabled = [n for n in self.parallel.get(name, [])
+                       if self.tasks[n].is_enabled()]
+            if enabled:
+                item = {enabled[0]: True}
+            elif type(value) is type(list()) and type(value[0]) is type(dict()):
+                item = {name: self.select_parallel(value)}
+            selected.append(item)
+        return selected
+
+    def find_process(self, process, name):
+        """ Value of the name in the process """
+
+        for item in process:
+            key, value = item.items()[0]
+            if key == name:
+                return value
+            if type(value) is type(list()) and type(value[0]) is type(dict()):
+                found = self.find_process(value, name)
+                if found is not None:
+                    return found
+        return None
 
     def construct_net(self, process, tasks):
         net = None
@@ -70,29 +151,123 @@ class Scenario(object):
                 net = net >> elem
         return net
 
-    def get_actions(self, mod):
-        path_split = mod.split(".")
-        module = None
-        if path_split[0] == 'cloudferrylib':
-            module = cloudferrylib
-        elif path_split[0] == 'addons':
-            module = addons
-        for p in path_split[1:]:
-            module = module.__dict__[p]
-        path = module.__path__[0]
-        files = os.listdir(path)
-        list_name_modules = filter(lambda x: (".py" in x) and (".pyc" not in x), files)
-        list_name_modules = map(lambda x: x.replace(".py", ""), list_name_modules)
-        modules = [imp.load_source(name, path+'/%s.py' % name) for name in list_name_modules]
-        actions = {}
-        for module in modules:
-            for item in module.__dict__:
-                if inspect.isclass(module.__dict__[item]) and issubclass(module.__dict__[item], action.Action):
-                    actions[item] = module.__dict__[item]
-        return actions
+    def construct_depends(self, process, depends, tasks):
+        groups = self.get_groups(process)
+        for name, deps in depends.iteritems():
+            if name not in groups:
+                continue
+            names = groups[name]
+            tasks[names[0]].depends_on(
+                *[tasks[n] for dep in deps for n in groups[dep]])
+            for prev, cur in zip(names, names[1:]):
+                if tasks[cur].depends is None:
+                    tasks[cur].depends_on(tasks[prev])
+
+    def construct_on_error(self, process, on_error, tasks):
+        """
+        on_error maps a name of the process to the task run when any of its
+        tasks fails, or to [task, task to go on with after it]. Quarantine
+        handlers are left out when quarantine_instances is off, so a failed
+        instance stops the migration.
+        """
+
+        groups = self.get_groups(process)
+        for name, handler in on_error.iteritems():
+            if name not in groups:
+                continue
+            go_on = None
+            if type(handler) is type(list()):
+                handler, go_on = handler
+            if (isinstance(tasks[handler], quarantine.Quarantine) and
+                    self.cfg and not self.cfg.migrate.quarantine_instances):
+                continue
+            if go_on:
+                tasks[handler] - tasks[go_on]
+            for n in groups[name]:
+                tasks[n].on_error(tasks[handler])
+
+    def construct_retry(self, process, retry_opts, tasks):
+        """
+        retry_opts maps a name of the process to RetryPolicy options, count
+        and backoff are task_retry and task_retry_backoff of the config by
+        default, no retries with count 0.
+        """
+
+        groups = self.get_groups(process)
+        defaults = {}
+        if self.cfg:
+            defaults = {'count': self.cfg.migrate.task_retry,
+                        'backoff': self.cfg.migrate.task_retry_backoff}
+        for name, opts in retry_opts.iteritems():
+            if name not in groups:
+                continue
+            opts = dict(defaults, **(opts or {}))
+            if opts.get('count') == 0:
+                continue
+            policy = retry.RetryPolicy(**opts)
+            for n in groups[name]:
+                tasks[n].with_retry(policy)
+
+    def get_groups(self, process, groups=None):
+        """ Getting names of tasks for every name of the process """
+
+        groups = {} if groups is None else groups
+        for item in process:
+            name, value = item.items()[0]
+            if type(value) is type(list()) and type(value[0]) is type(dict()):
+                self.get_groups(value, groups)
+                groups[name] = sum([groups[i.keys()[0]] for i in value], [])
+            else:
+                groups[name] = [name]
+        return groups
+
+    def get_registry(self, packages):
+        registry = ActionRegistry(self.get_cache().setdefault('actions', {}))
+        for package in packages:
+            registry.add_package(package)
+        self.cache_changed |= registry.changed
+        self.save_cache()
+        return registry
+
+    def load_yaml(self, path):
+        """ Parsed yaml file, taken from the cache while the file is the same """
+
+        stat = os.stat(path)
+        version = (stat.st_mtime, stat.st_size)
+        docs = self.get_cache().setdefault('yaml', {})
+        key = os.path.abspath(path)
+        if key not in docs or docs[key][0] != version:
+            with open(path, 'r') as f:
+                docs[key] = (version, yaml.load(f))
+            self.cache_changed = True
+            self.save_cache()
+        return docs[key][1]
+
+    def get_cache(self):
+        if self.cache is None:
+            self.cache = {}
+            if self.cache_path and os.path.exists(self.cache_path):
+                try:
+                    with open(self.cache_path, 'rb') as f:
+                        self.cache = cPickle.load(f)
+                except Exception as e:
+                    LOG.warning("Can't read cache %s: %s", self.cache_path, e)
+        return self.cache
+
+    def save_cache(self):
+        if not (self.cache_path and self.cache_changed):
+            return
+        tmp_path = '%s.tmp' % self.cache_path
+        try:
+            with open(tmp_path, 'wb') as f:
+                cPickle.dump(self.cache, f, cPickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, self.cache_path)
+            self.cache_changed = False
+        except Exception as e:
+            LOG.warning("Can't write cache %s: %s", self.cache_path, e)
 
     def init_process_migrate(self, path):
-        migrate = yaml.load(open(path, 'r'))
+        migrate = self.load_yaml(path)
         process = migrate['process']
         namespace = migrate['namespace']
         return process, namespace
\ No newline at end of file
@@ -13,12 +13,14 @@
 # limitations under the License.
 
 
-import multiprocessing
 import traceback
 
-from cloudferrylib.scheduler.namespace import Namespace, CHILDREN
+from cloudferrylib.scheduler import dependencies
+from cloudferrylib.scheduler.namespace import Namespace, CHILDREN, ERROR_INFO
+from cloudferrylib.utils import profiler
 from cloudferrylib.utils import utils
 from cursor import Cursor
+from pool import ProcessPool
 from task import BaseTask
 from thread_tasks import WrapThreadTask
 
@@ -35,18 +37,27 @@ class BaseScheduler(object):
         self.namespace = namespace if namespace else Namespace()
         self.status_error = NO_ERROR
         self.cursor = cursor
+        self.journal = None
+        self.profiler = None
+        self.failed_task = None
         self.map_func_task = dict() if not hasattr(
             self,
             'map_func_task') else self.map_func_task
         self.map_func_task[BaseTask()] = self.task_run
 
     def event_start_task(self, task):
+        if self.profiler:
+            self.profiler.start_task(task)
         return True
 
     def event_end_task(self, task):
+        if self.profiler:
+            self.profiler.stop_task(task)
         return True
 
     def event_error_task(self, task, e):
+        if self.profiler:
+            self.profiler.stop_task(task, failed=True)
         return True
 
     def error_task(self, task, e):
@@ -54,45 +65,98 @@ class BaseScheduler(object):
 
     def run_task(self, task):
         if self.event_start_task(task):
-            self.map_func_task[task](task)
+            policy = getattr(task, 'retry_policy', None)
+            if policy:
+                policy.call(self.map_func_task[task], task)
+            else:
+                self.map_func_task[task](task)
         self.event_end_task(task)
 
     def start(self):
         for task in self.cursor:
             try:
-                task_print = str(task).split('|')[1]
-                LOG.info('%s Start task: %s', '-' * 8, task_print)
-                self.run_task(task)
-                LOG.info('%s End task: %s', '-' * 8, task_print)
+                self.process_task(task)
+                self.save_journal()
             except Exception as e:
+                task = self.get_failed_task(task)
+                if getattr(task, 'error_handler', None):
+                    self.handle_error(task, e)
+                    continue
                 self.status_error = ERROR
                 self.exception = e
+                self.failed_task = task
                 traceback.print_exc()
                 self.error_task(task, e)
                 break
 
+    def get_failed_task(self, task):
+        return task
+
+    def handle_error(self, task, e):
+        LOG.error("Task %s failed, going on with %s:\n%s", task,
+                  task.error_handler, traceback.format_exc())
+        self.event_error_task(task, e)
+        self.namespace.vars[ERROR_INFO] = {
+            'task': str(task),
+            'error': "%s: %s" % (e.__class__.__name__, e)
+        }
+        self.cursor.jump(task.error_handler)
+
+    def process_task(self, task):
+        task_print = str(task).split('|')[1]
+        LOG.info('%s Start task: %s', '-' * 8, task_print)
+        self.run_task(task)
+        LOG.info('%s End task: %s', '-' * 8, task_print)
+
+    def save_journal(self):
+        if not self.journal:
+            return
+        try:
+            self.journal.save(self.namespace, self.cursor)
+        except Exception as e:
+            LOG.warning("Can't write journal %s: %s", self.journal.path, e)
+
     def task_run(self, task):
         task(namespace=self.namespace)
 
     def addCursor(self, cursor):
         self.cursor = cursor
 
+    def addJournal(self, journal):
+        self.journal = journal
+
+    def addProfiler(self, profiler):
+        self.profiler = profiler
+
 
 class SchedulerThread(BaseScheduler):
+    """
+    Runs the net of every WrapThreadTask in a forked process of the pool
+    shared by the children of this scheduler, at most thread_workers of
+    them at a time (0 - no limit). What the child writes to its namespace
+    is merged back into the namespace of this scheduler when the child is
+    waited for (WaitThreadTask, WaitThreadAllTask or the end of the net),
+    an exception of the child is raised there.
+    """
+
     def __init__(self, namespace=None, thread_task=None, cursor=None,
-                 scheduler_parent=None):
+                 scheduler_parent=None, thread_workers=None):
         super(SchedulerThread, self).__init__(namespace, cursor)
         self.map_func_task[WrapThreadTask()] = self.task_run_thread
         self.child_threads = dict()
         self.thread_task = thread_task
         self.scheduler_parent = scheduler_parent
+        if thread_workers is None:
+            thread_workers = getattr(scheduler_parent, 'thread_workers', 0)
+        self.thread_workers = thread_workers
+        self.pool = None
 
     def event_start_children(self, thread_task):
-        self.child_threads[thread_task] = True
+        self.child_threads[id(thread_task)] = thread_task
         return True
 
     def event_stop_children(self, thread_task):
-        del self.child_threads[thread_task]
+        del self.child_threads[id(thread_task)]
         return True
 
     def trigger_start_scheduler(self):
@@ -110,25 +174,81 @@ class SchedulerThread(BaseScheduler):
             self.start_separate_thread()
 
     def start_separate_thread(self):
-        p = multiprocessing.Process(target=self.start_current_thread)
-        self.namespace.vars[CHILDREN][self.thread_task]['process'] = p
-        p.start()
+        self.trigger_start_scheduler()
+        job = self.scheduler_parent.get_pool().submit(self.thread_task,
+                                                      self.run_forked)
+        children = self.scheduler_parent.namespace.vars[CHILDREN]
+        children[id(self.thread_task)]['job'] = job
 
     def start_current_thread(self):
         self.trigger_start_scheduler()
-        super(SchedulerThread, self).start()
+        self.run_current_thread()
         self.trigger_stop_scheduler()
 
+    def run_current_thread(self):
+        super(SchedulerThread, self).start()
+        if self.status_error == ERROR:
+            self.terminate_children()
+            return
+        try:
+            self.wait_children()
+        except Exception as e:
+            self.status_error = ERROR
+            self.exception = e
+
+    def run_forked(self):
+        self.run_current_thread()
+        if self.status_error == ERROR:
+            raise self.exception
+        written, deleted = self.namespace.vars.changes()
+        written.pop(CHILDREN, None)
+        return written, deleted
+
+    def get_pool(self):
+        if self.pool is None:
+            self.pool = ProcessPool(self.thread_workers)
+        return self.pool
+
+    def wait_child(self, thread_task):
+        """
+        Waiting for the child run by thread_task and merging what it wrote
+        to the namespace into this one.
+        """
+
+        if id(thread_task) not in self.child_threads:
+            return
+        child = self.namespace.vars[CHILDREN][id(thread_task)]
+        try:
+            written, deleted = self.pool.wait(child['job'])
+        finally:
+            self.event_stop_children(thread_task)
+        namespace = child['namespace']
+        namespace.vars.update(written)
+        for key in deleted:
+            if key in namespace.vars:
+                del namespace.vars[key]
+        self.namespace.merge(namespace)
+
+    def wait_children(self):
+        for thread_task in self.child_threads.values():
+            self.wait_child(thread_task)
+
+    def terminate_children(self):
+        if self.pool:
+            self.pool.terminate()
+        self.child_threads.clear()
+
     def fork(self, thread_task, is_deep_copy=False):
         namespace = self.namespace.fork(is_deep_copy)
+        namespace.vars[CHILDREN] = dict()
         scheduler = self.__class__(namespace=namespace,
                                    thread_task=thread_task,
                                    cursor=Cursor(thread_task.getNet()),
                                    scheduler_parent=self)
-        self.namespace.vars[CHILDREN][thread_task] = {
+        self.namespace.vars[CHILDREN][id(thread_task)] = {
             'namespace': namespace,
             'scheduler': scheduler,
-            'process': None
+            'job': None
         }
         return scheduler
 
@@ -139,6 +259,147 @@ class SchedulerThread(BaseScheduler):
 
 class Scheduler(SchedulerThread):
     def __init__(self, namespace=None, thread_task=False, cursor=None,
-                 scheduler_parent=None):
+                 scheduler_parent=None, thread_workers=None):
         super(Scheduler, self).__init__(namespace, thread_task, cursor,
-                                        scheduler_parent)
+                                        scheduler_parent, thread_workers)
+
+
+class DagScheduler(Scheduler):
+    """
+    Runs tasks which declare their dependencies (see Element.depends_on)
+    concurrently, each one in a forked worker, and merges what they return
+    into the namespace. Tasks without declared dependencies, branches and
+    thread tasks are run one by one as Scheduler does, so without any
+    declaration the process is the same as with Scheduler. With
+    auto_parallel dependencies of undeclared tasks are inferred from the
+    keys of the namespace they read and write (see dependencies).
+    """
+
+    def __init__(self, namespace=None, thread_task=False, cursor=None,
+                 scheduler_parent=None, workers=None, thread_workers=None,
+                 auto_parallel=None):
+        super(DagScheduler, self).__init__(namespace, thread_task, cursor,
+                                           scheduler_parent, thread_workers)
+        if workers is None:
+            workers = getattr(scheduler_parent, 'workers', 1)
+        if auto_parallel is None:
+            auto_parallel = getattr(scheduler_parent, 'auto_parallel', False)
+        self.workers = workers
+        self.auto_parallel = auto_parallel
+        self.window_failed = None
+
+    def get_failed_task(self, task):
+        failed, self.window_failed = self.window_failed, None
+        return failed or task
+
+    def process_task(self, task):
+        window = self.get_window(task)
+        if len(window) < 2 or self.workers < 2:
+            return super(DagScheduler, self).process_task(task)
+        self.run_window(window)
+        for _ in window[1:]:
+            self.cursor.next()
+
+    @staticmethod
+    def is_plain(task):
+        return (isinstance(task, BaseTask) and
+                len(task.next_element) == 1 and
+                not task.parall_elem and
+                not dependencies.overrides_call(task))
+
+    def get_window(self, task):
+        """
+        Getting the task and the following tasks with declared
+        dependencies, up to the first branch, thread or undeclared task
+        (any task with auto_parallel).
+        """
+
+        window = []
+        visited = set()
+        while (task and self.is_plain(task) and id(task) not in visited and
+               (not window or task.depends is not None or
+                self.auto_parallel)):
+            window.append(task)
+            visited.add(id(task))
+            task = task.next_element[0]
+        return window
+
+    def get_depends(self, window):
+        index = dict((id(task), i) for i, task in enumerate(window))
+        inferred = None
+        if self.auto_parallel:
+            inferred = dependencies.infer_depends(window)
+        depends = []
+        for i, task in enumerate(window):
+            if task.depends is None and inferred:
+                depends.append(inferred[i])
+            elif task.depends is None:
+                depends.append(set(range(i)))
+            else:
+                depends.append(set(index[id(dep)] for dep in task.depends
+                                   if index.get(id(dep), i) < i))
+        return depends
+
+    def run_window(self, window):
+        """
+        Running tasks of the window as soon as their dependencies are done.
+        When a task fails, no more tasks are started, the running ones are
+        finished and the error is raised with window_failed set to the
+        failed task.
+        """
+
+        depends = self.get_depends(window)
+        done = set()
+        started = set()
+        error = None
+        with ProcessPool(self.workers) as workers:
+            while len(done) < len(window) and error is None:
+                ready = [i for i in xrange(len(window))
+                         if i not in started and depends[i] <= done]
+                if len(ready) == 1 and not workers.is_busy():
+                    started.add(ready[0])
+                    self.window_failed = window[ready[0]]
+                    super(DagScheduler, self).process_task(window[ready[0]])
+                    self.window_failed = None
+                    done.add(ready[0])
+                    continue
+                for i in ready:
+                    started.add(i)
+                    LOG.info('%s Start task: %s', '-' * 8,
+                             str(window[i]).split('|')[1])
+                    self.event_start_task(window[i])
+                    workers.submit(i, self.task_run_forked, window[i])
+                error = self.finish_job(window, workers.wait_any(), done)
+            for job in workers.wait_all():
+                failed = self.finish_job(window, job, done)
+                error = error or failed
+        if error:
+            self.window_failed, e = error
+            raise e
+
+    def finish_job(self, window, job, done):
+        """ Merging the result of the job, (task, error) if it failed """
+
+        try:
+            result, usage = job.get()
+        except Exception as e:
+            LOG.error("Task %s failed: %s", window[job.key], e)
+            self.event_error_task(window[job.key], e)
+            return window[job.key], e
+        if type(result) == dict:
+            self.namespace.vars.update(result)
+        if self.profiler:
+            self.profiler.set_usage(window[job.key], usage)
+        self.event_end_task(window[job.key])
+        LOG.info('%s End task: %s', '-' * 8,
+                 str(window[job.key]).split('|')[1])
+        done.add(job.key)
+
+    def task_run_forked(self, task):
+        start = profiler.snapshot()
+        policy = getattr(task, 'retry_policy', None)
+        if policy:
+            result = policy.call(task.execute, self.namespace.vars)
+        else:
+            result = task.execute(self.namespace.vars)
+        return result, profiler.usage_since(start)
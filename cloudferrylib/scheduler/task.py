@@ -13,6 +13,9 @@
 # limitations under the License.
 
 __author__ = 'mirrorcoder'
+import inspect
+
+from cloudferrylib.scheduler import coroutine
 from cloudferrylib.scheduler.cursor import DEFAULT
 from cloudferrylib.scheduler.utils.equ_instance import EquInstance
 
@@ -26,10 +29,38 @@ class Element(object):
         self.next_element = [None]
         self.parall_elem = []
         self.num_element = DEFAULT
+        self.depends = None
+        self.retry_policy = None
+        self.error_handler = None
 
     def set_next_path(self, num):
         self.num_element = num
 
+    def depends_on(self, *elements):
+        """
+        Declares the only elements this one needs to be finished before it
+        starts, so it can run together with other elements. Elements which
+        declare nothing wait for everything before them.
+        """
+
+        self.depends = (self.depends or []) + list(elements)
+        return self
+
+    def with_retry(self, policy):
+        """ Retrying the element by the policy (see RetryPolicy) """
+
+        self.retry_policy = policy
+        return self
+
+    def on_error(self, element):
+        """
+        Going on with the element instead of stopping the process when this
+        one fails, the error is kept in the namespace (ERROR_INFO).
+        """
+
+        self.error_handler = element
+        return self
+
     def go(self, delta):
         if delta == START:
             return self.go_start()
@@ -84,6 +115,10 @@ class AltSyntax(ClassicSyntax):
 
 
 class BaseTask(AltSyntax, EquInstance):
+    # keys of the namespace the task reads and writes, found in the source
+    # of run if they are not declared (see dependencies)
+    reads = None
+    writes = None
 
     def __init__(self):
         self.class_name = BaseTask.__name__
@@ -93,10 +128,19 @@ class BaseTask(AltSyntax, EquInstance):
         pass
 
     def __call__(self, namespace=None):
-        result = self.run(**namespace.vars)
+        result = self.execute(namespace.vars)
         if type(result) == dict:
             namespace.vars.update(result)
 
+    def execute(self, variables):
+        """ Result of run, coroutines are run to the end """
+
+        result = self.run(**variables)
+        if inspect.isgenerator(result):
+            # run is a coroutine, see coroutine.EventLoop
+            result = coroutine.run(result)
+        return result
+
     def __repr__(self):
         return "BaseTask|%s" % self.__class__.__name__
 
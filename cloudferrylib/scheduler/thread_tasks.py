@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and#
 # limitations under the License.
 
+from cloudferrylib.scheduler.namespace import CHILDREN
 from task import Task
 from utils.equ_instance import EquInstance
 __author__ = 'mirrorcoder'
@@ -30,19 +31,24 @@ class WrapThreadTask(EquInstance):
     def getNet(self):
         return self.net
 
+    def __repr__(self):
+        return "WrapThreadTask|%s" % self.__class__.__name__
+
 
 class WaitThreadTask(Task):
     def __init__(self, tt):
         self.tt = tt
         super(WaitThreadTask, self).__init__()
 
-    def run(self, __children__={}, **kwargs):
-        if __children__:
-            __children__[self.tt]['process'].join()
+    def __call__(self, namespace=None):
+        child = namespace.vars[CHILDREN].get(id(self.tt))
+        if child:
+            child['scheduler'].scheduler_parent.wait_child(self.tt)
 
 
 class WaitThreadAllTask(Task):
-    def run(self, __children__={}, **kwargs):
-        if __children__:
-            for p in __children__:
-                __children__[p]['process'].join()
+    def __call__(self, namespace=None):
+        children = namespace.vars[CHILDREN]
+        for child in children.values():
+            child['scheduler'].scheduler_parent.wait_child(
+                child['scheduler'].thread_task)
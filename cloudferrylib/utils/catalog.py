@@ -0,0 +1,77 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import threading
+import time
+
+
+class Catalog(object):
+    """
+    Objects listed by list_func kept for `ttl` seconds (0 - listed on every
+    call) with indexes by the attributes of `keys`, so lookups by name or
+    id don't list all the objects again. Objects created or updated by the
+    process are put in by add, so they are found before the next refresh.
+    """
+
+    def __init__(self, list_func, keys=('id', 'name'), ttl=0):
+        self.list_func = list_func
+        self.keys = keys
+        self.ttl = ttl
+        self.objects = []
+        self.indexes = dict((key, {}) for key in keys)
+        self.loaded = None
+        self.lock = threading.Lock()
+
+    def is_expired(self):
+        return self.loaded is None or time.time() - self.loaded >= self.ttl
+
+    def refresh(self):
+        objects = self.list_func()
+        with self.lock:
+            self.objects = []
+            self.indexes = dict((key, {}) for key in self.keys)
+            for obj in objects:
+                self._add(obj)
+            self.loaded = time.time()
+
+    def invalidate(self):
+        self.loaded = None
+
+    def list(self):
+        if self.is_expired():
+            self.refresh()
+        return list(self.objects)
+
+    def get(self, key, value, default=None):
+        if self.is_expired():
+            self.refresh()
+        return self.indexes[key].get(value, default)
+
+    def add(self, obj):
+        """ Putting the created or updated object in (by id) """
+
+        with self.lock:
+            self._add(obj)
+
+    def _add(self, obj):
+        old = self.indexes['id'].get(getattr(obj, 'id', None))
+        if old is not None:
+            self.objects[self.objects.index(old)] = obj
+            for key, index in self.indexes.iteritems():
+                if index.get(getattr(old, key, None)) is old:
+                    del index[getattr(old, key)]
+        else:
+            self.objects.append(obj)
+        for key, index in self.indexes.iteritems():
+            index.setdefault(getattr(obj, key, None), obj)
@@ -0,0 +1,168 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import contextlib
+import multiprocessing
+import time
+
+from cloudferrylib.utils import utils
+
+
+LOG = utils.get_log(__name__)
+
+# fields of the state shared by the processes
+LIMIT, ACTIVE, EPOCH_START, BYTES, SECONDS, COUNT, ERRORS, LAST_RATE, \
+    LAST_STREAM_RATE = range(9)
+
+_gate = None
+
+
+class AimdController(object):
+    """
+    Additive increase, multiplicative decrease of the number of concurrent
+    transfers. Every epoch the limit grows by `increase` while the total
+    bytes/s of the finished transfers keeps growing by min_gain at least.
+    When it doesn't, adding streams doesn't help any more and the limit
+    goes one step back. When more than max_error_rate of the transfers
+    fail, or bytes/s of a stream falls below stream_drop of what it was
+    while the total doesn't grow, the limit is multiplied by `decrease`.
+    """
+
+    def __init__(self, min_limit=1, max_limit=8, increase=1, decrease=0.5,
+                 min_gain=0.05, max_error_rate=0.2, stream_drop=0.5):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.min_gain = min_gain
+        self.max_error_rate = max_error_rate
+        self.stream_drop = stream_drop
+
+    def adjust(self, limit, rate, stream_rate, error_rate, last_rate,
+               last_stream_rate):
+        grows = not last_rate or rate >= last_rate * (1 + self.min_gain)
+        if error_rate > self.max_error_rate or (
+                not grows and last_stream_rate and
+                stream_rate < last_stream_rate * self.stream_drop):
+            limit *= self.decrease
+        elif grows:
+            limit += self.increase
+        else:
+            limit -= self.increase
+        return min(max(limit, self.min_limit), self.max_limit)
+
+
+class Stream(object):
+    """ Transfer running in a slot, `bytes` is set by the transfer """
+
+    def __init__(self):
+        self.bytes = None
+
+
+class TransferGate(object):
+    """
+    Limits the number of transfers run at the same time by all the
+    processes forked after the gate is made, the limit is adjusted by
+    the controller at the end of every epoch from the transfers finished
+    in it. Transfers of unknown size count for errors only.
+    """
+
+    def __init__(self, controller, start=None, epoch=60, poll=1):
+        self.controller = controller
+        self.epoch = epoch
+        self.poll = poll
+        self.cond = multiprocessing.Condition()
+        self.state = multiprocessing.Array('d', 9, lock=False)
+        self.state[LIMIT] = start or controller.min_limit
+        self.state[EPOCH_START] = time.time()
+
+    @property
+    def limit(self):
+        return int(self.state[LIMIT])
+
+    def acquire(self):
+        with self.cond:
+            while self.state[ACTIVE] >= int(self.state[LIMIT]):
+                self.cond.wait(self.poll)
+            self.state[ACTIVE] += 1
+
+    def release(self, size, seconds, failed=False):
+        with self.cond:
+            self.state[ACTIVE] -= 1
+            if failed:
+                self.state[ERRORS] += 1
+            elif size:
+                self.state[BYTES] += size
+                self.state[SECONDS] += seconds
+                self.state[COUNT] += 1
+            self.end_epoch()
+            self.cond.notify_all()
+
+    def end_epoch(self):
+        now = time.time()
+        elapsed = now - self.state[EPOCH_START]
+        finished = self.state[COUNT] + self.state[ERRORS]
+        if elapsed < self.epoch or not finished:
+            return
+        rate = self.state[BYTES] / elapsed
+        stream_rate = (self.state[BYTES] / self.state[SECONDS]
+                       if self.state[SECONDS] else 0)
+        limit = self.controller.adjust(
+            self.state[LIMIT], rate, stream_rate,
+            self.state[ERRORS] / finished, self.state[LAST_RATE],
+            self.state[LAST_STREAM_RATE])
+        if int(limit) != int(self.state[LIMIT]):
+            LOG.info("Concurrent transfers: %d -> %d (%.1f MB/s)",
+                     self.state[LIMIT], limit, rate / 1024 / 1024)
+        self.state[LIMIT] = limit
+        if self.state[COUNT]:
+            self.state[LAST_RATE] = rate
+            self.state[LAST_STREAM_RATE] = stream_rate
+        for field in (BYTES, SECONDS, COUNT, ERRORS):
+            self.state[field] = 0
+        self.state[EPOCH_START] = now
+
+    @contextlib.contextmanager
+    def slot(self):
+        self.acquire()
+        stream = Stream()
+        start = time.time()
+        try:
+            yield stream
+        except Exception:
+            self.release(0, time.time() - start, failed=True)
+            raise
+        self.release(stream.bytes, time.time() - start)
+
+
+def init(max_transfers, epoch=60):
+    """ Adaptive limit of transfers up to max_transfers, 0 - no limit """
+
+    global _gate
+    _gate = None
+    if max_transfers:
+        _gate = TransferGate(AimdController(max_limit=max_transfers),
+                             epoch=epoch)
+    return _gate
+
+
+@contextlib.contextmanager
+def transfer_slot():
+    """ Slot of the gate for a transfer, it is not limited without gate """
+
+    if _gate is None:
+        yield Stream()
+    else:
+        with _gate.slot() as stream:
+            yield stream
@@ -0,0 +1,152 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from cloudferrylib.utils import utils
+
+
+LOG = utils.get_log(__name__)
+
+_manager = None
+
+
+class LockManager(object):
+    """
+    Locks and once-only results keyed by the identity of a resource (image
+    checksum, network, tenant...) shared by all the workers of the
+    migration. Locks are fcntl locks on files of `path`, so they work for
+    forked workers, threads and workers of other processes on the host (or
+    on other hosts if path is on a file system with working flock). The
+    result of once is kept in the same directory, so a worker waiting for
+    the lock gets what the first one did instead of doing it again.
+    """
+
+    def __init__(self, path=None):
+        self.temporary = not path
+        self.path = path or tempfile.mkdtemp(prefix='cloudferry-locks-')
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+    def get_name(self, kind, key):
+        return os.path.join(self.path, "%s-%s" % (
+            kind, hashlib.sha1(repr(key)).hexdigest()))
+
+    def lock(self, kind, key):
+        """ Exclusive lock of the resource for the block """
+
+        return self.lock_name(self.get_name(kind, key))
+
+    @contextlib.contextmanager
+    def lock_name(self, name):
+        with open(name + '.lock', 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get_result(self, kind, key):
+        try:
+            with open(self.get_name(kind, key) + '.json') as f:
+                return True, json.load(f)
+        except IOError:
+            return False, None
+
+    def set_result(self, kind, key, result):
+        name = self.get_name(kind, key)
+        with open(name + '.tmp', 'w') as f:
+            json.dump(result, f)
+        os.rename(name + '.tmp', name + '.json')
+
+    def once(self, kind, key, func, *args, **kwargs):
+        """
+        Running func for the resource only once, other callers wait for it
+        and get its result, which must be serializable to json. If func
+        fails, the next caller runs it again.
+        """
+
+        done, result = self.get_result(kind, key)
+        if done:
+            return result
+        with self.lock(kind, key):
+            done, result = self.get_result(kind, key)
+            if done:
+                LOG.debug("Reusing result of %s %s", kind, key)
+                return result
+            result = func(*args, **kwargs)
+            self.set_result(kind, key, result)
+            return result
+
+    def forget(self, kind, key):
+        """ Dropping the result of once for the resource """
+
+        with self.lock(kind, key):
+            try:
+                os.remove(self.get_name(kind, key) + '.json')
+            except OSError:
+                pass
+
+    def pop_results(self, kind):
+        """ Results of once for all the resources of kind, dropped """
+
+        results = []
+        for file_name in sorted(os.listdir(self.path)):
+            if not (file_name.startswith(kind + '-') and
+                    file_name.endswith('.json')):
+                continue
+            name = os.path.join(self.path, file_name[:-len('.json')])
+            with self.lock_name(name):
+                try:
+                    with open(name + '.json') as f:
+                        results.append(json.load(f))
+                    os.remove(name + '.json')
+                except (IOError, OSError):
+                    pass
+        return results
+
+    def cleanup(self):
+        if self.temporary:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+def init(path=None):
+    """
+    Locks of the migration in path, a temporary directory by default. It
+    has to be called before workers are forked to share the directory.
+    """
+
+    global _manager
+    _manager = LockManager(path)
+    return _manager
+
+
+def get_manager():
+    if _manager is None:
+        init()
+    return _manager
+
+
+def lock(kind, key):
+    return get_manager().lock(kind, key)
+
+
+def once(kind, key, func, *args, **kwargs):
+    return get_manager().once(kind, key, func, *args, **kwargs)
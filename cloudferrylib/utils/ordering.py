@@ -0,0 +1,97 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+from cloudferrylib.utils import plan as migration_plan
+from cloudferrylib.utils import utils as utl
+from cloudferrylib.utils import waves
+
+
+FIFO = 'fifo'
+LPT = 'lpt'
+WAVES = waves.WAVES
+
+
+def get_size(obj_id, obj, plan=None):
+    """
+    Bytes to move for the object: planned ones if the object is in the
+    plan, the size of a volume otherwise, 0 if nothing is known.
+    """
+
+    if plan:
+        planned = plan[migration_plan.INSTANCES].get(obj_id)
+        if planned:
+            return sum(planned[migration_plan.BYTES].values())
+    volume = obj.get(utl.VOLUME_BODY) if isinstance(obj, dict) else None
+    if isinstance(volume, dict) and volume.get('size'):
+        return volume['size'] * migration_plan.GB
+    return 0
+
+
+class FifoPolicy(object):
+    """ Objects are migrated in the order they are given """
+
+    def order(self, objs, plan=None):
+        return objs.items()
+
+
+class LptPolicy(object):
+    """
+    Largest objects first (longest processing time), so the big ones don't
+    start last and stretch the whole migration when workers run in parallel.
+    """
+
+    def order(self, objs, plan=None):
+        return sorted(objs.iteritems(),
+                      key=lambda item: get_size(item[0], item[1], plan),
+                      reverse=True)
+
+
+class WavePolicy(object):
+    """
+    Objects by waves of the wave planner (see waves.plan_waves), waves are
+    taken from the plan if it has them. Executors which know waves wait
+    for a wave to finish before the next one is started.
+    """
+
+    def waves(self, objs, plan=None):
+        if plan and plan.get(WAVES):
+            ids = [[i for i in wave if i in objs] for wave in plan[WAVES]]
+            planned = set(i for wave in ids for i in wave)
+            ids.append([i for i in objs if i not in planned])
+        else:
+            sizes = dict((obj_id, get_size(obj_id, obj, plan))
+                         for obj_id, obj in objs.iteritems())
+            ids = waves.plan_waves(objs, sizes)
+        return [[(i, objs[i]) for i in wave] for wave in ids if wave]
+
+    def order(self, objs, plan=None):
+        return [item for wave in self.waves(objs, plan) for item in wave]
+
+
+POLICIES = {
+    FIFO: FifoPolicy,
+    LPT: LptPolicy,
+    WAVES: WavePolicy
+}
+
+
+def register(name, policy):
+    POLICIES[name] = policy
+
+
+def get_policy(name):
+    if name not in POLICIES:
+        raise ValueError("Unknown order of migration %s, known ones: %s" %
+                         (name, ", ".join(sorted(POLICIES))))
+    return POLICIES[name]()
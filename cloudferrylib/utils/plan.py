@@ -0,0 +1,59 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import json
+
+from cloudferrylib.utils import throughput
+from cloudferrylib.utils import waves
+
+
+GB = 1024 * throughput.MB
+
+INSTANCES = 'instances'
+BYTES = 'bytes'
+ESTIMATE = 'estimate'
+INFO = 'info'
+
+
+def dump(plan, path):
+    """ Writing the plan to path and its report to path.txt """
+
+    with open(path, 'w') as f:
+        json.dump(plan, f, indent=2, sort_keys=True)
+    with open('%s.txt' % path, 'w') as f:
+        f.write(report(plan))
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def report(plan):
+    line = "%-36s %-24s %-20s %-14s %10s %10s %10s %10s\n"
+    lines = [line % ('Instance', 'Name', 'Host', 'Transporter', 'Disk, GB',
+                     'Eph., GB', 'Vol., GB', 'Time, s')]
+    for instance_id, item in sorted(plan[INSTANCES].iteritems()):
+        sizes = item[BYTES]
+        lines.append(line % (
+            instance_id, item['name'], item['host_src'], item['transporter'],
+            '%.1f' % (float(sizes['diff']) / GB),
+            '%.1f' % (float(sizes['ephemeral']) / GB),
+            '%.1f' % (float(sizes['volumes']) / GB),
+            '%d' % item[ESTIMATE]))
+    lines.append("Total: %.1f GB, about %d s\n" % (
+        float(plan[BYTES]) / GB, plan[ESTIMATE]))
+    for num, wave in enumerate(plan.get(waves.WAVES, []), 1):
+        lines.append("Wave %d: %s\n" % (num, ", ".join(wave)))
+    return ''.join(lines)
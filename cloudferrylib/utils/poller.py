@@ -0,0 +1,122 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import time
+
+from cloudferrylib.utils import timeout_exception
+from cloudferrylib.utils import utils
+
+
+LOG = utils.get_log(__name__)
+
+
+class Waiter(object):
+    def __init__(self, res_id, status, deadline=None, callback=None):
+        self.res_id = res_id
+        self.status = status.lower()
+        self.deadline = deadline
+        self.callback = callback
+        self.last_status = None
+
+
+class StatusPoller(object):
+    """
+    Waits for many resources of one service to reach their statuses.
+
+    Every tick statuses of all the waited resources are taken with one call
+    of list_func(since), since is the time of the previous call if the
+    service supports changes-since and None otherwise. With one resource to
+    wait for, or for resources the list misses, get_func(id) is used. While
+    nothing changes the interval between ticks grows up to max_interval.
+    """
+
+    def __init__(self, get_func, list_func=None, changes_since=False,
+                 interval=1, max_interval=10, margin=5):
+        self.get_func = get_func
+        self.list_func = list_func
+        self.changes_since = changes_since
+        self.interval = interval
+        self.max_interval = max_interval
+        self.margin = margin
+        self.waiters = {}
+        self.since = None
+
+    def add(self, res_id, status, timeout=None, callback=None):
+        deadline = time.time() + timeout if timeout else None
+        waiter = Waiter(res_id, status, deadline, callback)
+        self.waiters[res_id] = waiter
+        return waiter
+
+    def get_statuses(self):
+        pending = [w for w in self.waiters.itervalues()]
+        statuses = {}
+        if self.list_func and len(pending) > 1:
+            since = None
+            if self.changes_since and all(w.last_status for w in pending):
+                since = self.since
+            self.since = time.time() - self.margin
+            statuses = dict((obj.id, obj.status)
+                            for obj in self.list_func(since))
+            if since:
+                for waiter in pending:
+                    statuses.setdefault(waiter.res_id, waiter.last_status)
+        for waiter in pending:
+            if waiter.res_id not in statuses:
+                statuses[waiter.res_id] = self.get_func(waiter.res_id).status
+        return statuses
+
+    def poll(self, res_ids=None):
+        """
+        One tick, returns waiters which got their statuses. Deadlines are
+        checked for res_ids only (all by default).
+        """
+
+        statuses = self.get_statuses()
+        now = time.time()
+        done = []
+        for res_id, waiter in self.waiters.items():
+            status = statuses[res_id]
+            waiter.last_status = status
+            if status and status.lower() == waiter.status:
+                del self.waiters[res_id]
+                done.append(waiter)
+                if waiter.callback:
+                    waiter.callback(res_id, status)
+            elif (waiter.deadline and waiter.deadline < now and
+                  (res_ids is None or res_id in res_ids)):
+                del self.waiters[res_id]
+                raise timeout_exception.TimeoutException(
+                    status, waiter.status,
+                    "Timeout of waiting for %s to be %s, it is %s" %
+                    (res_id, waiter.status, status))
+        return done
+
+    def wait(self, res_ids=None):
+        """ Polling until the resources (all by default) get statuses """
+
+        res_ids = set(self.waiters if res_ids is None else res_ids)
+        interval = self.interval
+        try:
+            while res_ids & set(self.waiters):
+                if self.poll(res_ids):
+                    interval = self.interval
+                else:
+                    interval = min(interval * 2, self.max_interval)
+                if res_ids & set(self.waiters):
+                    time.sleep(interval)
+        except Exception:
+            # nobody waits for the rest of them any more
+            for res_id in res_ids:
+                self.waiters.pop(res_id, None)
+            raise
@@ -0,0 +1,177 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import collections
+import cProfile
+import functools
+import json
+import os
+import pstats
+import time
+
+from fabric import operations
+
+
+API_CALLS = 'api_calls'
+REMOTE_COMMANDS = 'remote_commands'
+WALL = 'wall'
+CPU = 'cpu'
+COUNT = 'count'
+FAILED = 'failed'
+
+USAGE = [WALL, CPU, API_CALLS, REMOTE_COMMANDS]
+
+counters = collections.defaultdict(int)
+
+_profiler = None
+
+
+def count(name, value=1):
+    counters[name] += value
+
+
+def get_profiler():
+    return _profiler
+
+
+def counted_remote_command(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        count(REMOTE_COMMANDS)
+        return func(*args, **kwargs)
+    wrapper.counted = True
+    wrapper.wrapped = func
+    return wrapper
+
+
+def snapshot():
+    return {
+        WALL: time.time(),
+        CPU: sum(os.times()[:2]),
+        API_CALLS: counters[API_CALLS],
+        REMOTE_COMMANDS: counters[REMOTE_COMMANDS]
+    }
+
+
+def usage_since(start):
+    now = snapshot()
+    return dict((k, now[k] - start[k]) for k in USAGE)
+
+
+class Profiler(object):
+    """
+    Collects wall time, CPU time, API calls and remote commands of tasks,
+    summed up by class of task. Tasks of classes from profile_classes are
+    also run under cProfile.
+    """
+
+    def __init__(self, profile_classes=()):
+        self.profile_classes = set(profile_classes or [])
+        self.records = {}
+        self.running = {}
+        self.profiles = {}
+
+    def install(self):
+        global _profiler
+        _profiler = self
+        if not getattr(operations._run_command, 'counted', False):
+            operations._run_command = counted_remote_command(
+                operations._run_command)
+
+    def uninstall(self):
+        """ Restoring fabric and dropping the global profiler """
+
+        global _profiler
+        if _profiler is self:
+            _profiler = None
+        if getattr(operations._run_command, 'counted', False):
+            operations._run_command = operations._run_command.wrapped
+
+    def fork(self):
+        """ Getting empty profiler for the forked process """
+
+        profiler = Profiler(self.profile_classes)
+        profiler.install()
+        return profiler
+
+    @staticmethod
+    def get_name(task):
+        return task.__class__.__name__
+
+    def start_task(self, task):
+        prof = None
+        if self.get_name(task) in self.profile_classes:
+            prof = cProfile.Profile()
+            prof.enable()
+        self.running[id(task)] = [snapshot(), prof, None]
+
+    def set_usage(self, task, usage):
+        """
+        Sets usage of the task run in another process, only the wall time
+        is measured here then.
+        """
+
+        if id(task) in self.running:
+            self.running[id(task)][2] = usage
+
+    def stop_task(self, task, failed=False):
+        if id(task) not in self.running:
+            return
+        start, prof, usage = self.running.pop(id(task))
+        if prof:
+            prof.disable()
+            self.add_profile(self.get_name(task), prof)
+        if usage:
+            usage = dict(usage, wall=time.time() - start[WALL])
+        else:
+            usage = usage_since(start)
+        self.add(self.get_name(task), usage, failed)
+
+    def add_profile(self, name, prof):
+        if name in self.profiles:
+            self.profiles[name].add(prof)
+        else:
+            self.profiles[name] = pstats.Stats(prof)
+
+    def add(self, name, usage, failed=False, calls=1):
+        record = self.records.setdefault(
+            name, dict([(COUNT, 0), (FAILED, 0)] + [(k, 0) for k in USAGE]))
+        record[COUNT] += calls
+        record[FAILED] += int(failed)
+        for k in USAGE:
+            record[k] += usage[k]
+
+    def merge(self, records):
+        for name, record in records.iteritems():
+            self.add(name, record, record[FAILED], record[COUNT])
+
+    def report(self):
+        line = "%-40s %8s %8s %12s %12s %10s %10s\n"
+        lines = [line % ('Task', 'Count', 'Failed', 'Wall, s', 'CPU, s',
+                         'API calls', 'Commands')]
+        records = sorted(self.records.iteritems(),
+                         key=lambda r: r[1][WALL], reverse=True)
+        for name, r in records:
+            lines.append(line % (name, r[COUNT], r[FAILED],
+                                 '%.2f' % r[WALL], '%.2f' % r[CPU],
+                                 r[API_CALLS], r[REMOTE_COMMANDS]))
+        return ''.join(lines)
+
+    def dump(self, path):
+        with open('%s.json' % path, 'w') as f:
+            json.dump(self.records, f, indent=2, sort_keys=True)
+        with open('%s.txt' % path, 'w') as f:
+            f.write(self.report())
+        for name, stats in self.profiles.iteritems():
+            stats.dump_stats('%s.%s.prof' % (path, name))
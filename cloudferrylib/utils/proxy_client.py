@@ -13,6 +13,9 @@
 # limitations under the License.
 import time
 import inspect
+
+from cloudferrylib.utils import profiler
+
 method_wrapper = type(object().__str__)
 
 base_types = [inspect.types.BooleanType,
@@ -54,19 +57,24 @@ def is_wrapping(x):
 
 
 class Proxy:
-    def __init__(self, client, retry, wait_time):
+    def __init__(self, client, retry, wait_time, limiter=None, name=None):
         self.client = client
         self.retry = retry
         self.wait_time = wait_time
+        self.limiter = limiter
+        self.name = name
 
     def wait(self):
         time.sleep(self.wait_time)
 
     def __call__(self, *args, **kwargs):
+        profiler.count(profiler.API_CALLS)
         c = 0
         result = None
         is_retry = True
         while is_retry:
+            if self.limiter:
+                self.limiter.acquire(self.name)
             try:
                 result = self.client(*args, **kwargs)
                 is_retry = False
@@ -81,5 +89,5 @@ class Proxy:
     def __getattr__(self, name):
         attr = getattr(self.client, name)
         if inspect.ismethod(attr) or (type(attr) is method_wrapper) or is_wrapping(attr):
-            return Proxy(attr, self.retry, self.wait_time)
+            return Proxy(attr, self.retry, self.wait_time, self.limiter, name)
         return attr
@@ -0,0 +1,95 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import multiprocessing
+import time
+
+
+READ = 'read'
+WRITE = 'write'
+
+# calls of clients named so only read the state of the cloud
+READ_PREFIXES = ('get', 'list', 'find', 'show', 'data', 'head')
+
+_limiters = {}
+
+
+class TokenBucket(object):
+    """
+    `rate` calls per second with bursts of `burst` calls at most. The
+    bucket is shared by the processes forked after it is made, so the rate
+    is kept for all the workers together.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1)
+        self.lock = multiprocessing.Lock()
+        # tokens, time of the last refill
+        self.state = multiprocessing.Array('d', [self.burst, time.time()],
+                                           lock=False)
+
+    def take(self):
+        """ Taking a token, returns seconds to wait for it if there is none """
+
+        with self.lock:
+            now = time.time()
+            tokens = min(self.burst,
+                         self.state[0] + (now - self.state[1]) * self.rate)
+            self.state[1] = now
+            if tokens >= 1:
+                self.state[0] = tokens - 1
+                return 0
+            self.state[0] = tokens
+            return (1 - tokens) / self.rate
+
+    def acquire(self):
+        wait = self.take()
+        while wait:
+            time.sleep(wait)
+            wait = self.take()
+
+
+class ServiceLimiter(object):
+    """ Separate buckets for reads and writes of an API endpoint """
+
+    def __init__(self, read_rate=0, write_rate=0, burst=1):
+        self.buckets = {
+            READ: TokenBucket(read_rate, burst) if read_rate else None,
+            WRITE: TokenBucket(write_rate, burst) if write_rate else None
+        }
+
+    @staticmethod
+    def get_kind(name):
+        return READ if (name or '').lower().startswith(READ_PREFIXES) \
+            else WRITE
+
+    def acquire(self, name):
+        bucket = self.buckets[self.get_kind(name)]
+        if bucket:
+            bucket.acquire()
+
+
+def get_limiter(endpoint, service, read_rate=0, write_rate=0, burst=1):
+    """
+    Limiter of the service of the cloud at endpoint, one for all the
+    clients of it, None if its calls are not limited.
+    """
+
+    if not read_rate and not write_rate:
+        return None
+    key = (endpoint, service)
+    if key not in _limiters:
+        _limiters[key] = ServiceLimiter(read_rate, write_rate, burst)
+    return _limiters[key]
@@ -0,0 +1,65 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import json
+import os
+
+
+MB = 1024 * 1024
+
+
+class ThroughputHistory(object):
+    """
+    Bytes moved and seconds spent on that between pairs of hosts in the
+    previous runs, kept in a json file. Estimates for hosts never seen fall
+    back to all the pairs of the source host, then to all the pairs, then
+    to default_rate (bytes per second).
+    """
+
+    DEFAULT_RATE = 50 * MB
+
+    def __init__(self, path=None, default_rate=DEFAULT_RATE):
+        self.path = path
+        self.default_rate = default_rate
+        self.pairs = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.pairs = json.load(f)
+
+    def record(self, host_src, host_dst, size, seconds):
+        total = self.pairs.setdefault(host_src, {}).setdefault(host_dst,
+                                                               [0, 0.0])
+        total[0] += size
+        total[1] += seconds
+
+    def get_rate(self, host_src, host_dst=None):
+        dsts = self.pairs.get(host_src, {})
+        if host_dst in dsts:
+            totals = [dsts[host_dst]]
+        elif dsts:
+            totals = dsts.values()
+        else:
+            totals = [t for d in self.pairs.values() for t in d.values()]
+        size = sum(t[0] for t in totals)
+        seconds = sum(t[1] for t in totals)
+        return size / seconds if size and seconds else self.default_rate
+
+    def estimate(self, size, host_src, host_dst=None):
+        return size / float(self.get_rate(host_src, host_dst))
+
+    def save(self):
+        tmp_path = '%s.tmp' % self.path
+        with open(tmp_path, 'w') as f:
+            json.dump(self.pairs, f, indent=2, sort_keys=True)
+        os.rename(tmp_path, self.path)
@@ -101,6 +101,21 @@ class ext_dict(dict):
         raise AttributeError("Exporter has no attribute %s" % name)
 
 
+def update_path(obj, path, value):
+    """
+    Getting copy of obj with value set by path, f.e.
+    update_path(info, ['instances', inst_id, 'diff', 'path_dst'], path).
+    Only dicts on the path are copied, everything else is shared with obj,
+    so obj itself and other references to it stay unchanged.
+    """
+
+    if not path:
+        return value
+    new_obj = dict(obj)
+    new_obj[path[0]] = update_path(obj.get(path[0], {}), path[1:], value)
+    return new_obj
+
+
 def get_snapshots_list_repository(path=PATH_TO_SNAPSHOTS):
     path_source = path+'/source'
     path_dest = path+'/dest'
@@ -189,7 +204,7 @@ class GeneratorPassword:
         return self.__generate_password()
 
     def __generate_password(self):
-        random.seed = (os.urandom(1024))
+        random.seed(os.urandom(1024))
         return ''.join(random.choice(self.chars) for i in range(self.length))
 
 
@@ -0,0 +1,177 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import collections
+
+from cloudferrylib.utils import utils as utl
+
+
+WAVES = 'waves'
+
+TENANT = 'tenant'
+HOST = 'host'
+IMAGE = 'image'
+VOLUME = 'volume'
+NETWORK = 'network'
+SECURITY_GROUP = 'security_group'
+
+# instances sharing these are not migrated in the same wave: they would
+# wait for each other on the same volume. Shared images are not a conflict,
+# they are uploaded and downloaded once for all the instances of the image
+CONFLICTS = (VOLUME,)
+# instances of a source host migrated in the same wave
+HOST_LIMIT = 2
+
+
+class Wave(object):
+    def __init__(self):
+        self.ids = []
+        self.used = set()
+        self.hosts = collections.defaultdict(int)
+
+    def fits(self, other, host_limit=None, max_size=None):
+        """ Whether instances of the other wave can join this one """
+
+        if max_size and len(self.ids) + len(other.ids) > max_size:
+            return False
+        if self.used & other.used:
+            return False
+        return not host_limit or all(
+            self.hosts[host] + count <= host_limit
+            for host, count in other.hosts.iteritems())
+
+    def copy(self):
+        wave = Wave()
+        wave.add(self)
+        return wave
+
+    def add(self, other):
+        self.ids.extend(other.ids)
+        self.used.update(other.used)
+        for host, count in other.hosts.iteritems():
+            self.hosts[host] += count
+
+
+def get_networks_map(network_info):
+    """ Ids of networks of read_info of NeutronNetwork by tenant and name """
+
+    networks = {}
+    for net in (network_info or {}).get('networks', []):
+        networks[(net['tenant_id'], net['name'])] = net['id']
+        if net['shared']:
+            networks.setdefault((None, net['name']), net['id'])
+    return networks
+
+
+def get_dependencies(instance, networks=None):
+    """ Resources the instance (info of NovaCompute) depends on """
+
+    body = instance[utl.INSTANCE_BODY]
+    tenant_id = body.get('tenant_id')
+    deps = set()
+    if body.get('host'):
+        deps.add((HOST, body['host']))
+    if body.get('image_id'):
+        deps.add((IMAGE, body['image_id']))
+    for volume in body.get('volumes', []):
+        deps.add((VOLUME, volume['id']))
+    for interface in body.get('interfaces', []):
+        name = interface['name']
+        net_id = (networks or {}).get((tenant_id, name),
+                                      (networks or {}).get((None, name), name))
+        deps.add((NETWORK, net_id))
+    for security_group in body.get('security_groups', []):
+        deps.add((SECURITY_GROUP, tenant_id, security_group))
+    return deps
+
+
+def plan_waves(instances, sizes=None, network_info=None,
+               conflicts=CONFLICTS, max_size=None, host_limit=HOST_LIMIT):
+    """
+    Grouping instances into waves, instances of a wave are migrated at the
+    same time and waves one after another.
+
+    Instances of a tenant take consecutive waves, so the downtime of the
+    tenant is not scattered over the whole migration, but tenants share
+    waves: instances of a tenant (largest tenant first) are put from the
+    first wave where they fit. Inside a wave there are no instances sharing a
+    resource of `conflicts`, no more than host_limit instances of a source
+    host and no more than max_size instances. Instances sharing networks
+    and security groups go next to each other. Returns lists of ids of
+    instances.
+    """
+
+    sizes = sizes or {}
+    networks = get_networks_map(network_info)
+    deps = dict((obj_id, get_dependencies(instance, networks))
+                for obj_id, instance in instances.iteritems())
+    tenants = collections.defaultdict(list)
+    for obj_id, instance in instances.iteritems():
+        tenants[instance[utl.INSTANCE_BODY].get('tenant_id')].append(obj_id)
+
+    def tenant_key(tenant_id):
+        return (-sum(sizes.get(i, 0) for i in tenants[tenant_id]), tenant_id)
+
+    def instance_key(obj_id):
+        affinity = sorted(d for d in deps[obj_id]
+                          if d[0] in (NETWORK, SECURITY_GROUP))
+        return (affinity, -sizes.get(obj_id, 0), obj_id)
+
+    def get_wave(obj_id):
+        wave = Wave()
+        wave.ids.append(obj_id)
+        wave.used.update(d for d in deps[obj_id] if d[0] in conflicts)
+        host = instances[obj_id][utl.INSTANCE_BODY].get('host')
+        if host:
+            wave.hosts[host] += 1
+        return wave
+
+    def place(ids, start):
+        """
+        Waves by index with the instances of the tenant put to the first
+        wave from start they fit in without leaving a gap after the waves
+        taken by the tenant already, None if they don't fit
+        """
+
+        placed = {}
+        last = start - 1
+        for obj_id in ids:
+            one = get_wave(obj_id)
+            for index in xrange(start, last + 2):
+                if index not in placed:
+                    placed[index] = (waves[index].copy()
+                                     if index < len(waves) else Wave())
+                if placed[index].fits(one, host_limit, max_size):
+                    placed[index].add(one)
+                    last = max(last, index)
+                    break
+            else:
+                return None
+        return placed
+
+    waves = []
+    for tenant_id in sorted(tenants, key=tenant_key):
+        ids = sorted(tenants[tenant_id], key=instance_key)
+        for start in xrange(len(waves) + 1):
+            placed = place(ids, start)
+            if placed is not None:
+                break
+        for index in sorted(placed):
+            if not placed[index].ids:
+                continue
+            if index < len(waves):
+                waves[index] = placed[index]
+            else:
+                waves.append(placed[index])
+    return [wave.ids for wave in waves]
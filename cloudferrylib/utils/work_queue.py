@@ -0,0 +1,167 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import collections
+import json
+import sqlite3
+import time
+
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    kind TEXT,
+    payload TEXT,
+    state TEXT,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    updated REAL,
+    collected INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+Job = collections.namedtuple('Job', ['key', 'kind', 'payload', 'state',
+                                     'worker', 'result', 'error'])
+
+
+class WorkQueue(object):
+    """
+    Jobs shared by the coordinator and the workers in a SQLite database,
+    workers on other hosts need the file on a shared file system. Payloads
+    and results are kept as JSON. A job claimed by a worker which has not
+    reported it for `lease` seconds is given to another worker (never if
+    lease is None). Every call opens its own connection, so the queue is
+    safe to use in forked processes.
+    """
+
+    def __init__(self, path, lease=None):
+        self.path = path
+        self.lease = lease
+        conn = self.connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    def execute(self, sql, *args):
+        conn = self.connect()
+        try:
+            return conn.execute(sql, args).fetchall()
+        finally:
+            conn.close()
+
+    def reset(self):
+        self.execute("DELETE FROM jobs")
+        self.execute("DELETE FROM meta")
+
+    def put(self, key, payload, kind=None):
+        self.execute("INSERT OR REPLACE INTO jobs "
+                     "(key, kind, payload, state, updated) "
+                     "VALUES (?, ?, ?, ?, ?)",
+                     key, kind, json.dumps(payload, default=str), PENDING,
+                     time.time())
+
+    def seal(self):
+        """ No more jobs will be put, workers stop when jobs are over """
+
+        self.execute("INSERT OR REPLACE INTO meta VALUES ('sealed', '1')")
+
+    def is_sealed(self):
+        return bool(self.execute(
+            "SELECT value FROM meta WHERE name = 'sealed'"))
+
+    def claim(self, worker):
+        """ Taking the next job for the worker, None if there is none """
+
+        now = time.time()
+        expired = now - self.lease if self.lease else 0
+        conn = self.connect()
+        try:
+            # the write lock is taken at once, so no one takes the job too
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT key, kind, payload FROM jobs "
+                "WHERE state = ? OR (state = ? AND updated < ?) "
+                "ORDER BY rowid LIMIT 1",
+                (PENDING, RUNNING, expired)).fetchone()
+            if row:
+                conn.execute("UPDATE jobs SET state = ?, worker = ?, "
+                             "updated = ? WHERE key = ?",
+                             (RUNNING, worker, now, row[0]))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        if not row:
+            return None
+        return Job(row[0], row[1], json.loads(row[2]), RUNNING, worker,
+                   None, None)
+
+    def renew(self, key, worker):
+        """ Keeping the job of the worker from being given to another one """
+
+        self.execute("UPDATE jobs SET updated = ? "
+                     "WHERE key = ? AND state = ? AND worker = ?",
+                     time.time(), key, RUNNING, worker)
+
+    def last_update(self):
+        """ Time the last running job was claimed or renewed, None if none """
+
+        return self.execute("SELECT MAX(updated) FROM jobs WHERE state = ?",
+                            RUNNING)[0][0]
+
+    def done(self, key, result):
+        self.execute("UPDATE jobs SET state = ?, result = ?, updated = ? "
+                     "WHERE key = ?",
+                     DONE, json.dumps(result, default=str), time.time(), key)
+
+    def fail(self, key, error):
+        self.execute("UPDATE jobs SET state = ?, error = ?, updated = ? "
+                     "WHERE key = ?",
+                     FAILED, error, time.time(), key)
+
+    def collect(self):
+        """ Finished jobs not collected yet """
+
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT key, kind, state, worker, result, error FROM jobs "
+                "WHERE state IN (?, ?) AND collected = 0",
+                (DONE, FAILED)).fetchall()
+            conn.execute("UPDATE jobs SET collected = 1 "
+                         "WHERE state IN (?, ?)", (DONE, FAILED))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return [Job(key, kind, None, state, worker,
+                    json.loads(result) if result else None, error)
+                for key, kind, state, worker, result, error in rows]
+
+    def counts(self):
+        return dict(self.execute(
+            "SELECT state, COUNT(*) FROM jobs GROUP BY state"))
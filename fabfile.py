@@ -18,6 +18,7 @@ from cloudferrylib.scheduler.scheduler import Scheduler
 import cfglib
 from cloudferrylib.utils import utils as utl
 from cloudferrylib.utils import utils
+from cloudferrylib.utils import plan as migration_plan
 from cloudferrylib.scheduler.scenario import Scenario
 from cloud import cloud_ferry
 env.forward_agent = True
@@ -26,16 +27,78 @@ LOG = utl.get_log(__name__)
 
 
 @task
-def migrate(name_config=None, name_instance=None):
+def migrate(name_config=None, name_instance=None, resume=None):
     """
         :name_config - name of config yaml-file, example 'config.yaml'
+        :resume - path to the journal of the failed migration to continue
     """
     cfglib.collector_configs_plugins()
     cfglib.init_config(name_config)
     utils.init_singletones(cfglib.CONF)
     env.key_filename = cfglib.CONF.migrate.key_filename
     cloud = cloud_ferry.CloudFerry(cfglib.CONF)
-    cloud.migrate(Scenario())
+    cloud.migrate(Scenario(), resume=resume)
+
+
+@task
+def plan(name_config=None, path='migrate.plan'):
+    """
+        Discover instances and estimate their migration without migrating.
+        :name_config - name of config yaml-file, example 'config.yaml'
+        :path - path to write the plan to, the report is written to path.txt
+    """
+    cfglib.collector_configs_plugins()
+    cfglib.init_config(name_config)
+    utils.init_singletones(cfglib.CONF)
+    env.key_filename = cfglib.CONF.migrate.key_filename
+    cloud = cloud_ferry.CloudFerry(cfglib.CONF)
+    LOG.info("Migration plan:\n%s", migration_plan.report(cloud.plan(path)))
+
+
+@task
+def apply(name_config=None, path='migrate.plan'):
+    """
+        Migrate instances of the plan written by plan.
+        :name_config - name of config yaml-file, example 'config.yaml'
+        :path - path to the plan
+    """
+    cfglib.collector_configs_plugins()
+    cfglib.init_config(name_config)
+    utils.init_singletones(cfglib.CONF)
+    env.key_filename = cfglib.CONF.migrate.key_filename
+    cloud = cloud_ferry.CloudFerry(cfglib.CONF)
+    cloud.migrate(Scenario(), plan_path=path)
+
+
+@task
+def worker(name_config=None, queue=None):
+    """
+        Migrate instances put to the work queue by migrate on another host.
+        :name_config - name of config yaml-file of this transition host,
+                       give workers different ssh_transfer_port
+        :queue - path to the work queue, migrate.work_queue by default
+    """
+    cfglib.collector_configs_plugins()
+    cfglib.init_config(name_config)
+    utils.init_singletones(cfglib.CONF)
+    env.key_filename = cfglib.CONF.migrate.key_filename
+    cloud = cloud_ferry.CloudFerry(cfglib.CONF)
+    done = cloud.work(queue or cfglib.CONF.migrate.work_queue, Scenario())
+    LOG.info("Worker is finished, %s jobs done", done)
+
+
+@task
+def dependencies(name_config=None):
+    """
+        Show keys of the namespace tasks of the migration read and write
+        and tasks which can run together with auto_parallel.
+        :name_config - name of config yaml-file, example 'config.yaml'
+    """
+    cfglib.collector_configs_plugins()
+    cfglib.init_config(name_config)
+    utils.init_singletones(cfglib.CONF)
+    cloud = cloud_ferry.CloudFerry(cfglib.CONF)
+    LOG.info("Dependencies of tasks:\n%s", cloud.dependencies(Scenario()))
 
 
 @task
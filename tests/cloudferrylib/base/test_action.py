@@ -0,0 +1,68 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from cloudferrylib.base.action import action
+from cloudferrylib.utils import locks
+from tests import test
+
+
+class ActionMemoizeTestCase(test.TestCase):
+    def setUp(self):
+        super(ActionMemoizeTestCase, self).setUp()
+        self.manager = locks.LockManager()
+        patcher = mock.patch('cloudferrylib.utils.locks._manager',
+                             self.manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cfg = mock.Mock()
+        self.cfg.migrate.memoize = True
+        self.action = action.Action({'cfg': self.cfg})
+
+    def tearDown(self):
+        super(ActionMemoizeTestCase, self).tearDown()
+        self.manager.cleanup()
+
+    def test_memoize(self):
+        func = mock.Mock(return_value='file')
+        self.assertEqual('file', self.action.memoize('image_file',
+                                                     ['host', 'id1'], func))
+        self.assertEqual('file', self.action.memoize('image_file',
+                                                     ['host', 'id1'], func))
+        self.assertEqual(1, func.call_count)
+        self.action.memoize('image_file', ['host', 'id2'], func)
+        self.assertEqual(2, func.call_count)
+
+    def test_invalid_result(self):
+        func = mock.Mock(side_effect=['old', 'new'])
+        self.action.memoize('image_file', ['host', 'id1'], func)
+        self.assertEqual('new', self.action.memoize(
+            'image_file', ['host', 'id1'], func,
+            valid=lambda result: result == 'new'))
+
+    def test_invalidate(self):
+        func = mock.Mock(side_effect=['old', 'new'])
+        self.action.memoize('image_file', {'image': 'id1'}, func)
+        self.action.invalidate('image_file', {'image': 'id1'})
+        self.assertEqual('new', self.action.memoize(
+            'image_file', {'image': 'id1'}, func))
+
+    def test_disabled(self):
+        self.cfg.migrate.memoize = False
+        func = mock.Mock(return_value='file')
+        self.action.memoize('image_file', ['host', 'id1'], func)
+        self.action.memoize('image_file', ['host', 'id1'], func)
+        self.assertEqual(2, func.call_count)
@@ -0,0 +1,98 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+
+import mock
+
+from cloudferrylib.base.action import distributed_iter
+from cloudferrylib.utils import work_queue
+from tests.cloudferrylib.base import test_parallel_iter
+from tests import test
+
+
+class DyingMigrate(test_parallel_iter.FakeMigrate):
+    def run(self, info=None, **kwargs):
+        for inst in info['instances'].itervalues():
+            if inst.get('dying'):
+                os._exit(1)
+        return super(DyingMigrate, self).run(info=info, **kwargs)
+
+
+class DistributedIterTestCase(test.TestCase):
+    def setUp(self):
+        super(DistributedIterTestCase, self).setUp()
+        self.fake_init = {
+            'src_cloud': mock.Mock(),
+            'dst_cloud': mock.Mock(),
+            'cfg': mock.Mock(**{'migrate.migration_order': 'fifo',
+                                'migrate.instances_workers': 1,
+                                'migrate.work_queue': '',
+                                'migrate.work_queue_lease': 600})
+        }
+        self.kwargs = {
+            'info_iter': {'instances': dict(
+                ('id%d' % i, {'name': 'vm%d' % i}) for i in range(4))},
+            'info_result': {'instances': {}}
+        }
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        self.path = os.path.join(path, 'queue.db')
+
+    def test_run(self):
+        self.kwargs['info_iter']['instances']['id1']['broken'] = True
+        action = distributed_iter.DistributedIter(
+            self.fake_init, test_parallel_iter.FakeMigrate, self.path, 2,
+            quarantine_name='quarantine', poll_interval=0.1)
+        result = action.run(**self.kwargs)
+        instances = result['info_result']['instances']
+        self.assertEqual(['id0', 'id2', 'id3'], sorted(instances))
+        self.assertNotEqual(os.getpid(), instances['id2']['pid'])
+        self.assertEqual(['id1'], result['quarantine']['instances'].keys())
+        self.assertEqual({}, self.kwargs['info_iter']['instances'])
+
+    def test_work(self):
+        queue = work_queue.WorkQueue(self.path)
+        queue.put('id1', {'name': 'vm1'}, 'instances')
+        queue.seal()
+        action = distributed_iter.DistributedIter(
+            self.fake_init, test_parallel_iter.FakeMigrate, self.path)
+        self.assertEqual(1, action.work({}, 'w1'))
+        job, = queue.collect()
+        self.assertEqual('w1', job.worker)
+        self.assertEqual(os.getpid(),
+                         job.result['instances']['id1']['pid'])
+
+    def test_queue_from_config(self):
+        action = distributed_iter.DistributedIter(
+            self.fake_init, test_parallel_iter.FakeMigrate)
+        self.assertFalse(action.is_enabled())
+        self.fake_init['cfg'].migrate.work_queue = self.path
+        action = distributed_iter.DistributedIter(
+            self.fake_init, test_parallel_iter.FakeMigrate)
+        self.assertTrue(action.is_enabled())
+        self.assertEqual((self.path, 600), (action.queue_path, action.lease))
+
+    def test_run_with_dying_worker(self):
+        self.kwargs['info_iter']['instances']['id1']['dying'] = True
+        action = distributed_iter.DistributedIter(
+            self.fake_init, DyingMigrate, self.path, 2,
+            quarantine_name='quarantine', poll_interval=0.1, lease=0.5)
+        result = action.run(**self.kwargs)
+        self.assertEqual(['id0', 'id2', 'id3'],
+                         sorted(result['info_result']['instances']))
+        self.assertEqual(['id1'], result['quarantine']['instances'].keys())
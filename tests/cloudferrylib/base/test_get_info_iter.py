@@ -0,0 +1,68 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from cloudferrylib.base.action import get_info_iter
+from tests import test
+
+
+class GetInfoIterTestCase(test.TestCase):
+    def test_run(self):
+        fake_init = {
+            'src_cloud': mock.Mock(),
+            'dst_cloud': mock.Mock(),
+            'cfg': mock.Mock(**{'migrate.migration_order': 'fifo'})
+        }
+        info_iter = {'instances': {'id1': {'name': 'vm1'},
+                                   'id2': {'name': 'vm2'}}}
+        action = get_info_iter.GetInfoIter(fake_init)
+        taken = {}
+        while info_iter['instances']:
+            res = action.run(info_iter=info_iter)
+            self.assertIs(info_iter, res['info_iter'])
+            self.assertEqual(1, len(res['info']['instances']))
+            taken.update(res['info']['instances'])
+        self.assertEqual(['id1', 'id2'], sorted(taken))
+
+    def test_run_largest_first(self):
+        fake_init = {
+            'src_cloud': mock.Mock(),
+            'dst_cloud': mock.Mock(),
+            'cfg': mock.Mock(**{'migrate.migration_order': 'fifo'})
+        }
+        info_iter = {'volumes': {'id1': {'volume': {'size': 1}},
+                                 'id2': {'volume': {'size': 3}},
+                                 'id3': {'volume': {'size': 2}}}}
+        action = get_info_iter.GetInfoIter(fake_init, resource_name='volumes',
+                                           policy='lpt')
+        taken = []
+        while info_iter['volumes']:
+            res = action.run(info_iter=info_iter)
+            taken.extend(res['info']['volumes'])
+        self.assertEqual(['id2', 'id3', 'id1'], taken)
+
+    def test_policy_from_config(self):
+        fake_init = {
+            'src_cloud': mock.Mock(),
+            'dst_cloud': mock.Mock(),
+            'cfg': mock.Mock(**{'migrate.migration_order': 'lpt'})
+        }
+        info_iter = {'volumes': {'id1': {'volume': {'size': 1}},
+                                 'id2': {'volume': {'size': 3}}}}
+        action = get_info_iter.GetInfoIter(fake_init, resource_name='volumes')
+        self.assertEqual('lpt', action.policy)
+        res = action.run(info_iter=info_iter)
+        self.assertEqual(['id2'], res['info']['volumes'].keys())
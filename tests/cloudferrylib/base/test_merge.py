@@ -0,0 +1,47 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from cloudferrylib.base.action import merge
+from tests import test
+
+
+class MergeTestCase(test.TestCase):
+    def setUp(self):
+        super(MergeTestCase, self).setUp()
+        self.fake_init = {
+            'src_cloud': mock.Mock(),
+            'dst_cloud': mock.Mock(),
+            'cfg': mock.Mock()
+        }
+        self.result = {'instances': {'id1': {'name': 'vm1'}}}
+        self.info = {'instances': {'id2': {'name': 'vm2'}}}
+
+    def test_merge_to_itself(self):
+        action = merge.Merge(self.fake_init, 'info', 'info_result',
+                             'info_result', 'instances')
+        res = action.run(info=self.info, info_result=self.result)
+        self.assertIs(self.result, res['info_result'])
+        self.assertEqual(['id1', 'id2'], sorted(self.result['instances']))
+        self.assertIs(self.info['instances']['id2'],
+                      self.result['instances']['id2'])
+
+    def test_merge_to_another(self):
+        action = merge.Merge(self.fake_init, 'info', 'info_result',
+                             'info_new', 'instances')
+        res = action.run(info=self.info, info_result=self.result)
+        self.assertEqual(['id1', 'id2'], sorted(res['info_new']['instances']))
+        self.assertEqual(['id1'], self.result['instances'].keys())
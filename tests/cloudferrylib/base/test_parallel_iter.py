@@ -0,0 +1,100 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+import os
+import time
+
+import mock
+
+from cloudferrylib.base.action import parallel_iter
+from cloudferrylib.scheduler import task
+from tests import test
+
+
+class FakeMigrate(task.Task):
+    def run(self, info=None, **kwargs):
+        for inst in info['instances'].itervalues():
+            if inst.get('broken'):
+                raise ValueError('broken instance')
+            inst['pid'] = os.getpid()
+        return {'info': info}
+
+
+class TimedMigrate(task.Task):
+    def run(self, info=None, **kwargs):
+        for inst in info['instances'].itervalues():
+            inst['start'] = time.time()
+            time.sleep(inst['duration'])
+            inst['end'] = time.time()
+        return {'info': info}
+
+
+class ParallelIterTestCase(test.TestCase):
+    def setUp(self):
+        super(ParallelIterTestCase, self).setUp()
+        self.fake_init = {
+            'src_cloud': mock.Mock(),
+            'dst_cloud': mock.Mock(),
+            'cfg': mock.Mock(**{'migrate.migration_order': 'fifo'})
+        }
+        self.kwargs = {
+            'info_iter': {'instances': dict(
+                ('id%d' % i, {'name': 'vm%d' % i}) for i in range(4))},
+            'info_result': {'instances': {}}
+        }
+
+    def test_run(self):
+        action = parallel_iter.ParallelIter(self.fake_init, FakeMigrate, 2)
+        result = action.run(**self.kwargs)
+        instances = result['info_result']['instances']
+        self.assertEqual(['id0', 'id1', 'id2', 'id3'], sorted(instances))
+        self.assertEqual('vm2', instances['id2']['name'])
+        self.assertNotEqual(os.getpid(), instances['id2']['pid'])
+        self.assertEqual({}, self.kwargs['info_iter']['instances'])
+
+    def test_run_with_failed_instance(self):
+        self.kwargs['info_iter']['instances']['id1']['broken'] = True
+        action = parallel_iter.ParallelIter(self.fake_init, FakeMigrate, 2)
+        self.assertRaises(RuntimeError, action.run, **self.kwargs)
+        self.assertEqual(['id0', 'id2', 'id3'],
+                         sorted(self.kwargs['info_result']['instances']))
+
+    def test_run_with_quarantine(self):
+        self.kwargs['info_iter']['instances']['id1']['broken'] = True
+        action = parallel_iter.ParallelIter(self.fake_init, FakeMigrate, 2,
+                                            quarantine_name='quarantine')
+        result = action.run(**self.kwargs)
+        self.assertEqual(['id0', 'id2', 'id3'],
+                         sorted(result['info_result']['instances']))
+        self.assertEqual(
+            {'instances': {'id1': {'task': 'BaseTask|FakeMigrate',
+                                   'error': 'ValueError: broken instance'}}},
+            result['quarantine'])
+
+    def test_run_by_waves(self):
+        for inst in self.kwargs['info_iter']['instances'].itervalues():
+            inst['instance'] = {'tenant_id': 't1', 'host': 'h1'}
+            inst['duration'] = 0.05
+        self.kwargs['info_iter']['instances']['id0']['duration'] = 0.3
+        self.kwargs['plan'] = {'waves': [['id0', 'id1'], ['id2', 'id3']]}
+        action = parallel_iter.ParallelIter(self.fake_init, TimedMigrate, 3,
+                                            policy='waves')
+        result = action.run(**self.kwargs)
+        instances = result['info_result']['instances']
+        self.assertEqual(['id0', 'id1', 'id2', 'id3'], sorted(instances))
+        first_end = max(instances[i]['end'] for i in ('id0', 'id1'))
+        second_start = min(instances[i]['start'] for i in ('id2', 'id3'))
+        self.assertLessEqual(first_end, second_start)
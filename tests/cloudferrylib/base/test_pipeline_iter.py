@@ -0,0 +1,92 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import mock
+
+from cloudferrylib.base.action import pipeline_iter
+from cloudferrylib.scheduler import task
+from tests import test
+
+
+class FakePrepare(task.Task):
+    def run(self, info=None, **kwargs):
+        for inst in info['instances'].itervalues():
+            if inst.get('broken'):
+                raise ValueError('broken instance')
+            inst['prepared'] = os.getpid()
+        return {'info': info, 'prepared': True}
+
+
+class FakeTransfer(task.Task):
+    def run(self, info=None, prepared=False, **kwargs):
+        for inst in info['instances'].itervalues():
+            inst['transferred'] = prepared
+        return {'info': info}
+
+
+class PipelineIterTestCase(test.TestCase):
+    def setUp(self):
+        super(PipelineIterTestCase, self).setUp()
+        self.fake_init = {
+            'src_cloud': mock.Mock(),
+            'dst_cloud': mock.Mock(),
+            'cfg': mock.Mock(**{'migrate.migration_order': 'fifo',
+                                'migrate.instances_workers': 1,
+                                'migrate.pipeline_queue_size': 1})
+        }
+        self.kwargs = {
+            'info_iter': {'instances': dict(
+                ('id%d' % i, {'name': 'vm%d' % i}) for i in range(4))},
+            'info_result': {'instances': {}}
+        }
+
+    def test_run(self):
+        action = pipeline_iter.PipelineIter(self.fake_init,
+                                            [FakePrepare, FakeTransfer])
+        result = action.run(**self.kwargs)
+        instances = result['info_result']['instances']
+        self.assertEqual(['id0', 'id1', 'id2', 'id3'], sorted(instances))
+        self.assertEqual('vm2', instances['id2']['name'])
+        self.assertTrue(instances['id2']['transferred'])
+        self.assertNotEqual(os.getpid(), instances['id2']['prepared'])
+        self.assertEqual({}, self.kwargs['info_iter']['instances'])
+        self.assertNotIn('prepared', self.kwargs)
+
+    def test_run_with_quarantine(self):
+        self.kwargs['info_iter']['instances']['id1']['broken'] = True
+        action = pipeline_iter.PipelineIter(self.fake_init,
+                                            [FakePrepare, FakeTransfer],
+                                            quarantine_name='quarantine')
+        result = action.run(**self.kwargs)
+        self.assertEqual(['id0', 'id2', 'id3'],
+                         sorted(result['info_result']['instances']))
+        self.assertEqual(['id1'], result['quarantine']['instances'].keys())
+
+    def test_spawn_with_full_queue(self):
+        action = pipeline_iter.PipelineIter(self.fake_init,
+                                            [FakePrepare, FakeTransfer])
+        workers = mock.Mock()
+        queues = [pipeline_iter.collections.deque(['id1', 'id2']),
+                  pipeline_iter.collections.deque(['id0'])]
+        running = [0, 1]
+        action.spawn(workers, queues, running, {'id0': {}, 'id1': {}})
+        self.assertFalse(workers.submit.called)
+        running = [0, 0]
+        action.spawn(workers, queues, running, {'id0': {}, 'id1': {}})
+        self.assertEqual([(1, 'id0'), (0, 'id1')],
+                         [c[0][0] for c in workers.submit.call_args_list])
+        self.assertEqual([1, 1], running)
@@ -0,0 +1,35 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from cloudferrylib.base.action import quarantine
+from tests import test
+
+
+class QuarantineTestCase(test.TestCase):
+    def test_run(self):
+        fake_init = {
+            'src_cloud': mock.Mock(),
+            'dst_cloud': mock.Mock(),
+            'cfg': mock.Mock()
+        }
+        action = quarantine.Quarantine(fake_init)
+        error = {'task': 'BaseTask|TransportInstance', 'error': 'failed'}
+        result = action.run(info={'instances': {'id1': {}}},
+                            quarantine={'instances': {'id0': {}}},
+                            __error__=error)
+        self.assertEqual({'instances': {'id0': {}, 'id1': error}},
+                         result['quarantine'])
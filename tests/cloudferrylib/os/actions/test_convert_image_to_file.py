@@ -0,0 +1,60 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from cloudferrylib.os.actions import cleanup_images
+from cloudferrylib.os.actions import convert_image_to_file
+from cloudferrylib.utils import locks
+from tests import test
+
+
+class ConvertImageToFileTestCase(test.TestCase):
+    def setUp(self):
+        super(ConvertImageToFileTestCase, self).setUp()
+        self.manager = locks.LockManager()
+        self.addCleanup(self.manager.cleanup)
+        patcher = mock.patch('cloudferrylib.utils.locks._manager',
+                             self.manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for name in ('run', 'settings', 'forward_agent'):
+            patcher = mock.patch.object(convert_image_to_file, name)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+        cfg = mock.Mock()
+        cfg.migrate.memoize = True
+        self.cloud = mock.MagicMock()
+        self.cloud.cloud_config.cloud.host = 'host'
+        self.cloud.cloud_config.cloud.temp = '/tmp'
+        self.init = {'cfg': cfg, 'src_cloud': self.cloud,
+                     'dst_cloud': mock.MagicMock()}
+
+    def get_commands(self):
+        return [c[0][0].split()[0] for c in self.run.call_args_list]
+
+    def test_cached_image_is_removed_by_cleanup(self):
+        convertor = convert_image_to_file.ConvertImageToFile(
+            self.init, cloud='src_cloud')
+        convertor.run(image_id='id1', base_filename='/tmp/a_base')
+        convertor.run(image_id='id1', base_filename='/tmp/b_base')
+        self.assertEqual(['glance', 'test', 'cp', 'test', 'cp'],
+                         self.get_commands())
+
+        self.run.reset_mock()
+        cleanup_images.CleanupImages(self.init).run(info={'instances': {}})
+        self.run.assert_called_once_with('rm -f /tmp/image_id1_base')
+        self.settings.assert_called_with(host_string='host', warn_only=True)
+        self.assertEqual([], self.manager.pop_results('image_file'))
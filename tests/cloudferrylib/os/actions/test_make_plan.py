@@ -0,0 +1,82 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+import mock
+
+from cloudferrylib.os.actions import make_plan
+from cloudferrylib.utils import plan
+from tests import test
+
+
+GB = plan.GB
+
+
+class MakePlanTestCase(test.TestCase):
+    def setUp(self):
+        super(MakePlanTestCase, self).setUp()
+        self.src_compute = mock.Mock()
+        self.src_compute.config.compute.backend = 'iscsi'
+        self.src_compute.get_flavor_from_id.return_value = mock.Mock(
+            disk=20, ephemeral=10)
+        self.src_storage = mock.Mock()
+        self.src_storage.get_volume_by_id.return_value = mock.Mock(size=5)
+        self.dst_compute = mock.Mock()
+        self.dst_compute.config.compute.backend = 'ceph'
+        self.fake_src_cloud = mock.Mock()
+        self.src_network = mock.Mock()
+        self.src_network.get_networks.return_value = []
+        self.fake_src_cloud.resources = {'compute': self.src_compute,
+                                         'storage': self.src_storage,
+                                         'network': self.src_network}
+        self.fake_dst_cloud = mock.Mock()
+        self.fake_dst_cloud.resources = {'compute': self.dst_compute}
+        self.fake_config = mock.Mock()
+        self.fake_config.migrate.throughput_path = None
+        self.fake_config.migrate.default_throughput = 10
+        self.fake_config.migrate.wave_size = 0
+        self.fake_config.migrate.wave_host_limit = 2
+        self.fake_init = {
+            'src_cloud': self.fake_src_cloud,
+            'dst_cloud': self.fake_dst_cloud,
+            'cfg': self.fake_config
+        }
+        self.info = {'instances': {
+            'id1': {'instance': {'name': 'vm1',
+                                 'flavor_id': 'f1',
+                                 'is_ephemeral': True,
+                                 'volumes': [{'id': 'v1'}, {'id': 'v2'}]},
+                    'diff': {'path_src': 'disk', 'host_src': 'host1'}},
+            'id2': {'instance': {'name': 'vm2',
+                                 'flavor_id': 'f1',
+                                 'is_ephemeral': False,
+                                 'volumes': [{'id': 'v3'}]},
+                    'diff': {'path_src': None, 'host_src': 'host1'}}}}
+
+    def test_run(self):
+        result = make_plan.MakePlan(self.fake_init).run(info=self.info)
+        migration_plan = result['plan']
+        item = migration_plan['instances']['id1']
+        self.assertEqual({'diff': 20 * GB, 'ephemeral': 10 * GB,
+                          'volumes': 10 * GB}, item['bytes'])
+        self.assertEqual('SSHFileToCeph', item['transporter'])
+        self.assertEqual(40 * 1024 / 10.0, item['estimate'])
+        self.assertEqual({'diff': 0, 'ephemeral': 0, 'volumes': 5 * GB},
+                         migration_plan['instances']['id2']['bytes'])
+        self.assertEqual(45 * GB, migration_plan['bytes'])
+        self.assertIs(self.info, migration_plan['info'])
+        self.assertEqual([['id1', 'id2']], migration_plan['waves'])
+        self.src_compute.get_flavor_from_id.assert_called_once_with('f1')
+        self.assertIn('vm1', plan.report(migration_plan))
@@ -14,6 +14,8 @@
 #    under the License.
 
 
+import itertools
+
 import mock
 
 from novaclient.v1_1 import client as nova_client
@@ -102,56 +104,62 @@ class NovaComputeTestCase(test.TestCase):
 
         self.assertEqual('start', status)
 
-    @mock.patch('cloudferrylib.os.compute.nova_compute.time.sleep')
+    @mock.patch('cloudferrylib.utils.poller.time')
     @mock.patch('cloudferrylib.os.compute.nova_compute.NovaCompute.get_status')
-    def test_change_status_active(self, mock_get, mock_sleep):
+    def test_change_status_active(self, mock_get, mock_time):
+        mock_time.time.side_effect = itertools.count(0, 10)
         mock_get.return_value = 'shutoff'
         self.nova_client.change_status('active', instance=self.fake_instance_0)
         self.fake_instance_0.start.assert_called_once_with()
-        mock_sleep.assert_called_with(2)
+        self.assertTrue(mock_time.sleep.called)
 
-    @mock.patch('cloudferrylib.os.compute.nova_compute.time.sleep')
+    @mock.patch('cloudferrylib.utils.poller.time')
     @mock.patch('cloudferrylib.os.compute.nova_compute.NovaCompute.get_status')
-    def test_change_status_shutoff(self, mock_get, mock_sleep):
+    def test_change_status_shutoff(self, mock_get, mock_time):
+        mock_time.time.side_effect = itertools.count(0, 10)
         mock_get.return_value = 'active'
         self.nova_client.change_status('shutoff',
                                        instance=self.fake_instance_0)
         self.fake_instance_0.stop.assert_called_once_with()
-        mock_sleep.assert_called_with(2)
+        self.assertTrue(mock_time.sleep.called)
 
-    @mock.patch('cloudferrylib.os.compute.nova_compute.time.sleep')
+    @mock.patch('cloudferrylib.utils.poller.time')
     @mock.patch('cloudferrylib.os.compute.nova_compute.NovaCompute.get_status')
-    def test_change_status_resume(self, mock_get, mock_sleep):
+    def test_change_status_resume(self, mock_get, mock_time):
+        mock_time.time.side_effect = itertools.count(0, 10)
         mock_get.return_value = 'suspend'
         self.nova_client.change_status('active', instance=self.fake_instance_0)
         self.fake_instance_0.resume.assert_called_once_with()
-        mock_sleep.assert_called_with(2)
+        self.assertTrue(mock_time.sleep.called)
 
-    @mock.patch('cloudferrylib.os.compute.nova_compute.time.sleep')
+    @mock.patch('cloudferrylib.utils.poller.time')
     @mock.patch('cloudferrylib.os.compute.nova_compute.NovaCompute.get_status')
-    def test_change_status_paused(self, mock_get, mock_sleep):
+    def test_change_status_paused(self, mock_get, mock_time):
+        mock_time.time.side_effect = itertools.count(0, 10)
         mock_get.return_value = 'active'
         self.nova_client.change_status('paused', instance=self.fake_instance_0)
         self.fake_instance_0.pause.assert_called_once_with()
-        mock_sleep.assert_called_with(2)
+        self.assertTrue(mock_time.sleep.called)
 
-    @mock.patch('cloudferrylib.os.compute.nova_compute.time.sleep')
+    @mock.patch('cloudferrylib.utils.poller.time')
     @mock.patch('cloudferrylib.os.compute.nova_compute.NovaCompute.get_status')
-    def test_change_status_unpaused(self, mock_get, mock_sleep):
+    def test_change_status_unpaused(self, mock_get, mock_time):
+        mock_time.time.side_effect = itertools.count(0, 10)
         mock_get.return_value = 'paused'
         self.nova_client.change_status('active',
                                        instance=self.fake_instance_0)
         self.fake_instance_0.unpause.assert_called_once_with()
-        mock_sleep.assert_called_with(2)
+        self.assertTrue(mock_time.sleep.called)
 
-    @mock.patch('cloudferrylib.os.compute.nova_compute.time.sleep')
+    @mock.patch('cloudferrylib.utils.poller.time')
     @mock.patch('cloudferrylib.os.compute.nova_compute.NovaCompute.get_status')
-    def test_change_status_suspend(self, mock_get, mock_sleep):
+    def test_change_status_suspend(self, mock_get, mock_time):
+        mock_time.time.side_effect = itertools.count(0, 10)
         mock_get.return_value = 'active'
         self.nova_client.change_status('suspend',
                                        instance=self.fake_instance_0)
         self.fake_instance_0.suspend.assert_called_once_with()
-        mock_sleep.assert_called_with(2)
+        self.assertTrue(mock_time.sleep.called)
 
     def test_change_status_same(self):
         self.mock_client().servers.get('fake_instance_id').status = 'stop'
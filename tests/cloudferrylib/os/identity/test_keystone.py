@@ -200,6 +200,20 @@ class KeystoneIdentityTestCase(test.TestCase):
 
         self.assertEqual(self.fake_tenant_0, tenant)
 
+    def test_catalog(self):
+        config = utils.ext_dict(FAKE_CONFIG, identity=utils.ext_dict(
+            {'catalog_ttl': 300}))
+        identity = keystone.KeystoneIdentity(config, self.fake_cloud)
+        self.mock_client().tenants.list.return_value = [self.fake_tenant_0]
+        self.mock_client().tenants.create.return_value = self.fake_tenant_1
+
+        self.assertEqual('tenant_id_0',
+                         identity.get_tenant_id_by_name('tenant_name_0'))
+        identity.create_tenant('tenant_name_1')
+        self.assertEqual('tenant_id_1',
+                         identity.get_tenant_id_by_name('tenant_name_1'))
+        self.assertEqual(1, self.mock_client().tenants.list.call_count)
+
     def test_get_users_list(self):
         fake_users_list = [self.fake_user_0, self.fake_user_1]
         self.mock_client().users.list.return_value = fake_users_list
@@ -287,6 +301,45 @@ class KeystoneIdentityTestCase(test.TestCase):
 
         self.assertEquals(fake_info, info)
 
+    @mock.patch('cloudferrylib.os.identity.keystone.mysql_connector.'
+                'MysqlConnector')
+    def test_get_user_tenants_roles_from_db(self, mock_connector):
+        self.keystone_client.config = utils.ext_dict(
+            FAKE_CONFIG, mysql=utils.ext_dict())
+        self.mock_client().tenants.list.return_value = [self.fake_tenant_0,
+                                                        self.fake_tenant_1]
+        self.mock_client().users.list.return_value = [self.fake_user_0,
+                                                      self.fake_user_1]
+        self.mock_client().roles.list.return_value = [self.fake_role_0,
+                                                      self.fake_role_1]
+        mock_connector().execute.return_value = [
+            ('user_id_0', 'tenant_id_1', 'role_id_1'),
+            ('user_id_1', 'deleted_tenant_id', 'role_id_0')]
+
+        user_tenants_roles = self.keystone_client._get_user_tenants_roles()
+
+        self.assertEqual(
+            {'user_name_0': {'tenant_name_1': [
+                {'role': {'name': 'role_name_1', 'id': 'role_id_1'}}]},
+             'user_name_1': {}},
+            user_tenants_roles)
+        self.assertFalse(self.mock_client().roles.roles_for_user.called)
+
+    def test_get_user_tenants_roles_by_api(self):
+        self.mock_client().tenants.list.return_value = [self.fake_tenant_0,
+                                                        self.fake_tenant_1]
+        self.mock_client().users.list.return_value = [self.fake_user_0]
+        self.mock_client().roles.roles_for_user.side_effect = (
+            lambda user_id, tenant_id: [self.fake_role_0]
+            if tenant_id == 'tenant_id_0' else [])
+
+        user_tenants_roles = self.keystone_client._get_user_tenants_roles()
+
+        self.assertEqual(
+            {'user_name_0': {'tenant_name_0': [
+                {'role': {'name': 'role_name_0', 'id': 'role_id_0'}}]}},
+            user_tenants_roles)
+
     def test_deploy(self):
         fake_tenants_list = [self.fake_tenant_0, self.fake_tenant_1]
         fake_users_list = [self.fake_user_0, self.fake_user_1]
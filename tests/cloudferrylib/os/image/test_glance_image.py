@@ -222,8 +222,10 @@ class GlanceImageTestCase(test.TestCase):
         fake_images2 = [self.fake_image_1, self.fake_image_2]
         fake_images3 = [self.fake_image_1]
 
+        # the last check before upload is made under the lock of the image
         self.glance_mock_client().images.list.side_effect = (fake_images1,
                                                              fake_images2,
+                                                             fake_images1,
                                                              fake_images3)
 
         new_info = self.glance_image.deploy(self.fake_result_info)
@@ -0,0 +1,70 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from cloudferrylib.utils import catalog
+from tests import test
+
+
+def fake_object(obj_id, name):
+    obj = mock.Mock()
+    obj.id = obj_id
+    obj.name = name
+    return obj
+
+
+class CatalogTestCase(test.TestCase):
+    def setUp(self):
+        super(CatalogTestCase, self).setUp()
+        self.objects = [fake_object('id0', 'name0'),
+                        fake_object('id1', 'name1')]
+        self.list_func = mock.Mock(return_value=self.objects)
+
+    @mock.patch('cloudferrylib.utils.catalog.time.time')
+    def test_ttl(self, mock_time):
+        mock_time.side_effect = [0, 10, 59, 60, 60]
+        objects = catalog.Catalog(self.list_func, ttl=60)
+        self.assertEqual(self.objects[1], objects.get('name', 'name1'))
+        self.assertEqual(self.objects[0], objects.get('id', 'id0'))
+        self.assertIsNone(objects.get('name', 'name2'))
+        self.assertEqual(1, self.list_func.call_count)
+        self.assertEqual(self.objects, objects.list())
+        self.assertEqual(2, self.list_func.call_count)
+
+    def test_without_ttl(self):
+        objects = catalog.Catalog(self.list_func)
+        objects.list()
+        objects.list()
+        self.assertEqual(2, self.list_func.call_count)
+
+    def test_add(self):
+        objects = catalog.Catalog(self.list_func, ttl=60)
+        objects.list()
+        renamed = fake_object('id1', 'name2')
+        objects.add(renamed)
+        objects.add(fake_object('id3', 'name3'))
+        self.assertEqual(renamed, objects.get('name', 'name2'))
+        self.assertIsNone(objects.get('name', 'name1'))
+        self.assertEqual(['id0', 'id1', 'id3'],
+                         [obj.id for obj in objects.list()])
+        self.assertEqual(1, self.list_func.call_count)
+
+    def test_invalidate(self):
+        objects = catalog.Catalog(self.list_func, ttl=60)
+        objects.list()
+        objects.invalidate()
+        objects.list()
+        self.assertEqual(2, self.list_func.call_count)
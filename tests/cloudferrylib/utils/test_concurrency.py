@@ -0,0 +1,104 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+import time
+
+import mock
+
+from cloudferrylib.utils import concurrency
+from tests import test
+
+
+class AimdControllerTestCase(test.TestCase):
+    def setUp(self):
+        super(AimdControllerTestCase, self).setUp()
+        self.controller = concurrency.AimdController(max_limit=4)
+
+    def test_increase_while_rate_grows(self):
+        self.assertEqual(2, self.controller.adjust(1, 100, 100, 0, 0, 0))
+        self.assertEqual(3, self.controller.adjust(2, 200, 100, 0, 100, 100))
+        self.assertEqual(4, self.controller.adjust(4, 300, 75, 0, 200, 100))
+
+    def test_back_off_on_plateau(self):
+        self.assertEqual(2, self.controller.adjust(3, 201, 67, 0, 200, 100))
+
+    def test_decrease_on_errors(self):
+        self.assertEqual(2, self.controller.adjust(4, 400, 100, 0.5,
+                                                   300, 100))
+        self.assertEqual(1, self.controller.adjust(1, 400, 100, 0.5,
+                                                   300, 100))
+
+    def test_decrease_on_stream_drop(self):
+        self.assertEqual(2, self.controller.adjust(4, 200, 40, 0, 200, 100))
+
+
+class TransferGateTestCase(test.TestCase):
+    def test_limit(self):
+        gate = concurrency.TransferGate(concurrency.AimdController(),
+                                        start=2, poll=0.01)
+        peak = multiprocessing.Value('i', 0)
+        running = multiprocessing.Value('i', 0)
+
+        def transfer():
+            with gate.slot():
+                with running.get_lock():
+                    running.value += 1
+                    peak.value = max(peak.value, running.value)
+                time.sleep(0.1)
+                with running.get_lock():
+                    running.value -= 1
+
+        processes = [multiprocessing.Process(target=transfer)
+                     for _ in range(5)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        self.assertEqual(2, peak.value)
+        self.assertEqual(0, gate.state[concurrency.ACTIVE])
+
+    @mock.patch('cloudferrylib.utils.concurrency.time.time')
+    def test_epoch(self, mock_time):
+        mock_time.return_value = 0
+        gate = concurrency.TransferGate(concurrency.AimdController(),
+                                        epoch=10)
+        with gate.slot() as stream:
+            stream.bytes = 1000
+            mock_time.return_value = 5
+        self.assertEqual(1, gate.limit)
+        with gate.slot() as stream:
+            stream.bytes = 1000
+            mock_time.return_value = 10
+        self.assertEqual(2, gate.limit)
+        self.assertEqual(200, gate.state[concurrency.LAST_RATE])
+        self.assertEqual(0, gate.state[concurrency.BYTES])
+
+    def test_failed_transfer(self):
+        gate = concurrency.TransferGate(concurrency.AimdController())
+
+        def fail():
+            with gate.slot():
+                raise ValueError()
+
+        self.assertRaises(ValueError, fail)
+        self.assertEqual(1, gate.state[concurrency.ERRORS])
+        self.assertEqual(0, gate.state[concurrency.ACTIVE])
+
+    def test_without_gate(self):
+        concurrency.init(0)
+        with concurrency.transfer_slot() as stream:
+            stream.bytes = 1
+        self.assertIsNone(concurrency._gate)
@@ -0,0 +1,90 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+import time
+
+from cloudferrylib.scheduler import pool
+from cloudferrylib.utils import locks
+from tests import test
+
+
+class LockManagerTestCase(test.TestCase):
+    def setUp(self):
+        super(LockManagerTestCase, self).setUp()
+        self.manager = locks.LockManager()
+
+    def tearDown(self):
+        super(LockManagerTestCase, self).tearDown()
+        self.manager.cleanup()
+
+    def test_once_runs_only_once(self):
+        calls = multiprocessing.Value('i', 0)
+
+        def upload(name):
+            with calls.get_lock():
+                calls.value += 1
+            time.sleep(0.1)
+            return {'id': name}
+
+        with pool.ProcessPool(4) as workers:
+            for i in xrange(4):
+                workers.submit(i, self.manager.once, 'image', 'checksum',
+                               upload, 'image-%d' % i)
+            results = [job.get() for job in workers.wait_all()]
+        self.assertEqual(1, calls.value)
+        self.assertEqual(1, len(set(r['id'] for r in results)))
+
+    def test_once_retries_after_failure(self):
+        def fail():
+            raise ValueError('fail')
+
+        self.assertRaises(ValueError, self.manager.once, 'image', 'a', fail)
+        self.assertEqual('ok', self.manager.once('image', 'a', lambda: 'ok'))
+        self.assertEqual('ok', self.manager.once('image', 'a', fail))
+
+    def test_forget(self):
+        self.manager.once('network', 'a', lambda: 1)
+        self.manager.forget('network', 'a')
+        self.assertEqual(2, self.manager.once('network', 'a', lambda: 2))
+
+    def test_lock_is_exclusive(self):
+        running = multiprocessing.Value('i', 0)
+        peak = multiprocessing.Value('i', 0)
+
+        def work(key):
+            with self.manager.lock('network', key):
+                with running.get_lock():
+                    running.value += 1
+                    peak.value = max(peak.value, running.value)
+                time.sleep(0.05)
+                with running.get_lock():
+                    running.value -= 1
+
+        with pool.ProcessPool(3) as workers:
+            for i in xrange(3):
+                workers.submit(i, work, 'net')
+            for job in workers.wait_all():
+                job.get()
+        self.assertEqual(1, peak.value)
+
+    def test_pop_results(self):
+        self.manager.once('image_file', 'a', lambda: 'a')
+        self.manager.once('image_file', 'b', lambda: 'b')
+        self.manager.once('image', 'a', lambda: 'image')
+        self.assertEqual(['a', 'b'],
+                         sorted(self.manager.pop_results('image_file')))
+        self.assertEqual([], self.manager.pop_results('image_file'))
+        self.assertEqual('image', self.manager.once('image', 'a', None))
@@ -0,0 +1,80 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from cloudferrylib.utils import ordering
+from cloudferrylib.utils import plan
+from tests import test
+
+
+class OrderingTestCase(test.TestCase):
+    def setUp(self):
+        super(OrderingTestCase, self).setUp()
+        self.instances = {'id1': {}, 'id2': {}, 'id3': {}}
+        self.plan = {'instances': {
+            'id1': {'bytes': {'diff': 1, 'ephemeral': 0, 'volumes': 1}},
+            'id2': {'bytes': {'diff': 5, 'ephemeral': 0, 'volumes': 0}},
+            'id3': {'bytes': {'diff': 1, 'ephemeral': 2, 'volumes': 0}}}}
+
+    def test_get_size(self):
+        self.assertEqual(2, ordering.get_size('id1', {}, self.plan))
+        self.assertEqual(0, ordering.get_size('id4', {}, self.plan))
+        self.assertEqual(2 * plan.GB,
+                         ordering.get_size('v1', {'volume': {'size': 2}}))
+
+    def test_lpt(self):
+        policy = ordering.get_policy(ordering.LPT)
+        self.assertEqual(['id2', 'id3', 'id1'],
+                         [k for k, v in policy.order(self.instances,
+                                                     self.plan)])
+
+    def test_fifo(self):
+        policy = ordering.get_policy(ordering.FIFO)
+        self.assertEqual(self.instances.keys(),
+                         [k for k, v in policy.order(self.instances,
+                                                     self.plan)])
+
+    def test_unknown_policy(self):
+        self.assertRaises(ValueError, ordering.get_policy, 'random')
+
+    def test_register(self):
+        class Reversed(ordering.FifoPolicy):
+            def order(self, objs, plan=None):
+                return sorted(objs.iteritems(), reverse=True)
+        ordering.register('reversed', Reversed)
+        self.addCleanup(ordering.POLICIES.pop, 'reversed')
+        self.assertEqual(['id3', 'id2', 'id1'],
+                         [k for k, v in ordering.get_policy(
+                             'reversed').order(self.instances)])
+
+    def test_waves_from_plan(self):
+        self.plan['waves'] = [['id2'], ['id1', 'id4']]
+        policy = ordering.get_policy(ordering.WAVES)
+        self.assertEqual([['id2'], ['id1'], ['id3']],
+                         [[k for k, v in wave]
+                          for wave in policy.waves(self.instances,
+                                                   self.plan)])
+        self.assertEqual(['id2', 'id1', 'id3'],
+                         [k for k, v in policy.order(self.instances,
+                                                     self.plan)])
+
+    def test_waves_without_plan(self):
+        instances = {
+            'id1': {'instance': {'tenant_id': 't1', 'host': 'h1'}},
+            'id2': {'instance': {'tenant_id': 't1', 'host': 'h1'}},
+            'id3': {'instance': {'tenant_id': 't1', 'host': 'h1'}}}
+        policy = ordering.get_policy(ordering.WAVES)
+        self.assertEqual([['id1', 'id2'], ['id3']],
+                         [[k for k, v in wave]
+                          for wave in policy.waves(instances)])
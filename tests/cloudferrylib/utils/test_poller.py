@@ -0,0 +1,115 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+import mock
+
+from cloudferrylib.utils import poller
+from cloudferrylib.utils import timeout_exception
+from tests import test
+
+
+class FakeResource(object):
+    def __init__(self, res_id, statuses):
+        self.id = res_id
+        self.statuses = iter(statuses)
+        self.status = None
+
+    def tick(self):
+        self.status = next(self.statuses, self.status)
+        return self
+
+
+class StatusPollerTestCase(test.TestCase):
+    def setUp(self):
+        super(StatusPollerTestCase, self).setUp()
+        self.resources = {
+            'id1': FakeResource('id1', ['building', 'active']),
+            'id2': FakeResource('id2', ['building', 'building', 'active']),
+            'id3': FakeResource('id3', ['error'])
+        }
+        self.list_func = mock.Mock(side_effect=lambda since: [
+            r.tick() for r in self.resources.values()])
+        self.get_func = mock.Mock(
+            side_effect=lambda res_id: self.resources[res_id].tick())
+        self.time_patch = mock.patch('cloudferrylib.utils.poller.time')
+        self.mock_time = self.time_patch.start()
+        self.addCleanup(self.time_patch.stop)
+        self.mock_time.time.side_effect = itertools.count(0, 1)
+
+    def test_one_list_call_per_tick(self):
+        status_poller = poller.StatusPoller(self.get_func, self.list_func)
+        done = []
+        status_poller.add('id1', 'ACTIVE',
+                          callback=lambda i, s: done.append(i))
+        status_poller.add('id2', 'active',
+                          callback=lambda i, s: done.append(i))
+        status_poller.wait()
+        self.assertEqual(['id1', 'id2'], done)
+        self.assertEqual(2, self.list_func.call_count)
+        self.get_func.assert_called_once_with('id2')
+        self.assertEqual({}, status_poller.waiters)
+
+    def test_one_resource_uses_get(self):
+        status_poller = poller.StatusPoller(self.get_func, self.list_func)
+        status_poller.add('id1', 'active')
+        status_poller.wait(['id1'])
+        self.assertFalse(self.list_func.called)
+        self.assertEqual(2, self.get_func.call_count)
+
+    def test_backoff(self):
+        status_poller = poller.StatusPoller(self.get_func, interval=1,
+                                            max_interval=3)
+        status_poller.add('id3', 'active', timeout=100)
+        self.assertRaises(timeout_exception.TimeoutException,
+                          status_poller.wait)
+        self.assertEqual([2, 3, 3],
+                         [c[0][0] for c in
+                          self.mock_time.sleep.call_args_list[:3]])
+
+    def test_timeout(self):
+        status_poller = poller.StatusPoller(self.get_func)
+        status_poller.add('id3', 'active', timeout=5)
+        self.assertRaises(timeout_exception.TimeoutException,
+                          status_poller.wait)
+        self.assertEqual({}, status_poller.waiters)
+
+    def test_changes_since(self):
+        status_poller = poller.StatusPoller(self.get_func, self.list_func,
+                                            changes_since=True, margin=0)
+        status_poller.add('id1', 'active')
+        status_poller.add('id2', 'active')
+        status_poller.wait()
+        sinces = [c[0][0] for c in self.list_func.call_args_list]
+        self.assertIsNone(sinces[0])
+        self.assertIsNotNone(sinces[1])
+
+    def test_timeout_drops_waiters_of_failed_wait(self):
+        status_poller = poller.StatusPoller(self.get_func, self.list_func)
+        status_poller.add('id2', 'active', timeout=1)
+        status_poller.add('id3', 'active', timeout=1)
+        self.assertRaises(timeout_exception.TimeoutException,
+                          status_poller.wait, ['id2', 'id3'])
+        self.assertEqual({}, status_poller.waiters)
+        status_poller.add('id1', 'active')
+        status_poller.wait(['id1'])
+
+    def test_timeout_of_other_waiters_is_not_raised(self):
+        status_poller = poller.StatusPoller(self.get_func, self.list_func)
+        status_poller.add('id3', 'active', timeout=1)
+        status_poller.add('id1', 'active')
+        status_poller.wait(['id1'])
+        self.assertEqual(['id3'], status_poller.waiters.keys())
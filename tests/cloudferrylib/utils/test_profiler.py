@@ -0,0 +1,112 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+import shutil
+import tempfile
+
+from fabric import operations
+
+from cloudferrylib.scheduler import cursor
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import scheduler
+from cloudferrylib.scheduler import task
+from cloudferrylib.utils import profiler
+from tests import test
+
+
+class CallApi(task.Task):
+    def run(self, **kwargs):
+        profiler.count(profiler.API_CALLS, 2)
+
+
+class RunCommand(task.Task):
+    def run(self, **kwargs):
+        profiler.count(profiler.REMOTE_COMMANDS)
+
+
+class Fail(task.Task):
+    def run(self, **kwargs):
+        raise RuntimeError("fail")
+
+
+class ProfilerTestCase(test.TestCase):
+    def setUp(self):
+        super(ProfilerTestCase, self).setUp()
+        self.profiler = profiler.Profiler(['RunCommand'])
+        self.profiler.install()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        super(ProfilerTestCase, self).tearDown()
+        self.profiler.uninstall()
+        shutil.rmtree(self.path)
+
+    def run_net(self, net):
+        sched = scheduler.Scheduler(namespace=namespace.Namespace(),
+                                    cursor=cursor.Cursor(net))
+        sched.addProfiler(self.profiler)
+        sched.start()
+        return sched
+
+    def test_records_by_class(self):
+        self.run_net(CallApi() >> RunCommand() >> CallApi())
+        records = self.profiler.records
+        self.assertEqual(2, records['CallApi'][profiler.COUNT])
+        self.assertEqual(4, records['CallApi'][profiler.API_CALLS])
+        self.assertEqual(1, records['RunCommand'][profiler.REMOTE_COMMANDS])
+        self.assertEqual(0, records['RunCommand'][profiler.API_CALLS])
+
+    def test_failed_task(self):
+        self.run_net(CallApi() >> Fail())
+        self.assertEqual(1, self.profiler.records['Fail'][profiler.FAILED])
+        self.assertEqual(0, self.profiler.records['CallApi'][profiler.FAILED])
+
+    def test_merge(self):
+        self.run_net(CallApi())
+        forked = self.profiler.fork()
+        forked.add('CallApi', dict.fromkeys(profiler.USAGE, 1))
+        self.profiler.merge(forked.records)
+        self.assertEqual(2, self.profiler.records['CallApi'][profiler.COUNT])
+        self.assertEqual(3,
+                         self.profiler.records['CallApi'][profiler.API_CALLS])
+
+    def test_set_usage(self):
+        t = CallApi()
+        self.profiler.start_task(t)
+        self.profiler.set_usage(t, dict.fromkeys(profiler.USAGE, 5))
+        self.profiler.stop_task(t)
+        record = self.profiler.records['CallApi']
+        self.assertEqual(5, record[profiler.API_CALLS])
+        self.assertLess(record[profiler.WALL], 5)
+
+    def test_dump(self):
+        self.run_net(CallApi() >> RunCommand())
+        path = os.path.join(self.path, 'migrate.profile')
+        self.profiler.dump(path)
+        with open(path + '.json') as f:
+            self.assertEqual(set(['CallApi', 'RunCommand']),
+                             set(json.load(f)))
+        with open(path + '.txt') as f:
+            self.assertIn('RunCommand', f.read())
+        self.assertTrue(os.path.exists(path + '.RunCommand.prof'))
+        self.assertFalse(os.path.exists(path + '.CallApi.prof'))
+
+    def test_uninstall(self):
+        self.assertTrue(getattr(operations._run_command, 'counted', False))
+        self.profiler.uninstall()
+        self.assertFalse(getattr(operations._run_command, 'counted', False))
+        self.assertIsNone(profiler.get_profiler())
@@ -0,0 +1,86 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from cloudferrylib.utils import proxy_client
+from cloudferrylib.utils import rate_limit
+from tests import test
+
+
+@mock.patch('cloudferrylib.utils.rate_limit.time')
+class TokenBucketTestCase(test.TestCase):
+    def test_burst(self, mock_time):
+        mock_time.time.return_value = 100
+        bucket = rate_limit.TokenBucket(2, burst=3)
+        self.assertEqual([0, 0, 0], [bucket.take() for _ in range(3)])
+        self.assertEqual(0.5, bucket.take())
+
+    def test_rate(self, mock_time):
+        mock_time.time.return_value = 100
+        bucket = rate_limit.TokenBucket(2)
+        bucket.take()
+        mock_time.time.return_value = 100.25
+        self.assertEqual(0.25, bucket.take())
+        mock_time.time.return_value = 100.5
+        self.assertEqual(0, bucket.take())
+        # tokens are not saved over the burst while nothing is called
+        mock_time.time.return_value = 200
+        self.assertEqual(0, bucket.take())
+        self.assertEqual(0.5, bucket.take())
+
+    def test_acquire(self, mock_time):
+        mock_time.time.side_effect = [100, 100, 100, 100.5]
+        bucket = rate_limit.TokenBucket(2)
+        bucket.acquire()
+        bucket.acquire()
+        mock_time.sleep.assert_called_once_with(0.5)
+
+
+class ServiceLimiterTestCase(test.TestCase):
+    def test_get_kind(self):
+        get_kind = rate_limit.ServiceLimiter.get_kind
+        self.assertEqual(rate_limit.READ, get_kind('list_ports'))
+        self.assertEqual(rate_limit.READ, get_kind('get'))
+        self.assertEqual(rate_limit.WRITE, get_kind('create_port'))
+        self.assertEqual(rate_limit.WRITE, get_kind(None))
+
+    def test_only_writes_limited(self):
+        limiter = rate_limit.ServiceLimiter(write_rate=1)
+        self.assertIsNone(limiter.buckets[rate_limit.READ])
+        with mock.patch.object(limiter.buckets[rate_limit.WRITE],
+                               'acquire') as acquire:
+            limiter.acquire('list')
+            self.assertFalse(acquire.called)
+            limiter.acquire('create')
+            acquire.assert_called_once_with()
+
+    def test_get_limiter(self):
+        self.addCleanup(rate_limit._limiters.clear)
+        self.assertIsNone(rate_limit.get_limiter('1.1.1.1', 'compute'))
+        limiter = rate_limit.get_limiter('1.1.1.1', 'compute', 1, 1)
+        self.assertIs(limiter,
+                      rate_limit.get_limiter('1.1.1.1', 'compute', 1, 1))
+        self.assertIsNot(limiter,
+                         rate_limit.get_limiter('2.2.2.2', 'compute', 1, 1))
+
+    def test_proxy(self):
+        limiter = mock.Mock()
+        client = mock.Mock()
+        client.servers.create.side_effect = [ValueError(), 'id']
+        proxy = proxy_client.Proxy(client, 1, 0, limiter)
+        self.assertEqual('id', proxy.servers.create(name='vm'))
+        self.assertEqual([mock.call('create'), mock.call('create')],
+                         limiter.acquire.call_args_list)
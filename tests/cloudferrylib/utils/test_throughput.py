@@ -0,0 +1,50 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+
+from cloudferrylib.utils import throughput
+from tests import test
+
+
+class ThroughputHistoryTestCase(test.TestCase):
+    def setUp(self):
+        super(ThroughputHistoryTestCase, self).setUp()
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        self.path = os.path.join(path, 'migrate.throughput')
+        self.history = throughput.ThroughputHistory(self.path,
+                                                    default_rate=100)
+        self.history.record('h1', 'h2', 1000, 10)
+        self.history.record('h1', 'h2', 1000, 10)
+        self.history.record('h1', 'h3', 3000, 10)
+        self.history.record('h4', 'h2', 6000, 10)
+
+    def test_get_rate(self):
+        self.assertEqual(100, self.history.get_rate('h1', 'h2'))
+        self.assertEqual(5000 / 30.0, self.history.get_rate('h1'))
+        self.assertEqual(11000 / 40.0, self.history.get_rate('h5'))
+        self.assertEqual(throughput.ThroughputHistory.DEFAULT_RATE,
+                         throughput.ThroughputHistory().get_rate('h1'))
+
+    def test_estimate(self):
+        self.assertEqual(50, self.history.estimate(5000, 'h1', 'h2'))
+
+    def test_save(self):
+        self.history.save()
+        loaded = throughput.ThroughputHistory(self.path)
+        self.assertEqual(300, loaded.get_rate('h1', 'h3'))
@@ -0,0 +1,48 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from cloudferrylib.utils import utils
+from tests import test
+
+
+class UpdatePathTestCase(test.TestCase):
+    def setUp(self):
+        super(UpdatePathTestCase, self).setUp()
+        self.info = {
+            'instances': {
+                'id1': {'instance': {'flavor_id': 'f1'},
+                        'diff': {'path_src': 'p1'},
+                        'meta': {'volume': []}},
+                'id2': {'instance': {'flavor_id': 'f2'}}}}
+
+    def test_update_path(self):
+        new_info = utils.update_path(
+            self.info, ['instances', 'id1', 'diff', 'path_dst'], 'p2')
+        self.assertEqual('p2', new_info['instances']['id1']['diff']['path_dst'])
+        self.assertEqual('p1', new_info['instances']['id1']['diff']['path_src'])
+        self.assertNotIn('path_dst', self.info['instances']['id1']['diff'])
+
+    def test_update_path_shares_other_branches(self):
+        new_info = utils.update_path(
+            self.info, ['instances', 'id1', 'diff', 'path_dst'], 'p2')
+        self.assertIs(self.info['instances']['id2'],
+                      new_info['instances']['id2'])
+        self.assertIs(self.info['instances']['id1']['meta'],
+                      new_info['instances']['id1']['meta'])
+
+    def test_update_path_creates_missing(self):
+        new_info = utils.update_path(self.info, ['images', 'id3'], {})
+        self.assertEqual({}, new_info['images']['id3'])
+        self.assertNotIn('images', self.info)
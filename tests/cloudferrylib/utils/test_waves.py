@@ -0,0 +1,129 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from cloudferrylib.utils import waves
+from tests import test
+
+
+def make_instance(tenant, host, image=None, volumes=(), nets=()):
+    return {'instance': {
+        'tenant_id': tenant,
+        'host': host,
+        'image_id': image,
+        'volumes': [{'id': v} for v in volumes],
+        'interfaces': [{'name': n} for n in nets],
+        'security_groups': ['default']}}
+
+
+class WavesTestCase(test.TestCase):
+    def test_get_dependencies(self):
+        network_info = {'networks': [
+            {'id': 'n1', 'name': 'net', 'tenant_id': 't1', 'shared': False},
+            {'id': 'n2', 'name': 'net', 'tenant_id': 't2', 'shared': False},
+            {'id': 'n3', 'name': 'ext', 'tenant_id': 't0', 'shared': True}]}
+        deps = waves.get_dependencies(
+            make_instance('t2', 'h1', 'img', ['v1'], ['net', 'ext']),
+            waves.get_networks_map(network_info))
+        self.assertEqual(set([('host', 'h1'), ('image', 'img'),
+                              ('volume', 'v1'), ('network', 'n2'),
+                              ('network', 'n3'),
+                              ('security_group', 't2', 'default')]), deps)
+
+    def test_host_limit_splits_waves(self):
+        instances = {
+            'a1': make_instance('t1', 'h1'),
+            'a2': make_instance('t1', 'h1'),
+            'a3': make_instance('t1', 'h1'),
+            'a4': make_instance('t1', 'h2'),
+        }
+        self.assertEqual([['a1', 'a2', 'a4'], ['a3']],
+                         waves.plan_waves(instances))
+        self.assertEqual([['a1', 'a4'], ['a2'], ['a3']],
+                         waves.plan_waves(instances, host_limit=1))
+
+    def test_volumes_split_waves(self):
+        instances = {
+            'a1': make_instance('t1', 'h1', 'img', ['v1']),
+            'a2': make_instance('t1', 'h2', 'img', ['v1']),
+            'a3': make_instance('t1', 'h3', 'img'),
+        }
+        self.assertEqual([['a1', 'a3'], ['a2']],
+                         waves.plan_waves(instances))
+
+    def test_tenants_share_waves(self):
+        instances = {
+            'a1': make_instance('t1', 'h1'),
+            'a2': make_instance('t1', 'h1'),
+            'a3': make_instance('t1', 'h1'),
+            'b1': make_instance('t2', 'h2', 'img'),
+            'b2': make_instance('t2', 'h2', 'img'),
+            'b3': make_instance('t2', 'h2', 'img'),
+            'c1': make_instance('t3', 'h1'),
+        }
+        sizes = {'a1': 1, 'a2': 1, 'a3': 1, 'b1': 5, 'b2': 1, 'b3': 1,
+                 'c1': 1}
+        result = waves.plan_waves(instances, sizes, host_limit=1)
+        # t2 is the largest, t1 joins its waves from the first one, t3
+        # fits after t1 only
+        self.assertEqual([['b1', 'a1'], ['b2', 'a2'], ['b3', 'a3'],
+                          ['c1']], result)
+
+    def test_tenants_contiguous(self):
+        instances = {
+            'a1': make_instance('t1', 'h1'),
+            'a2': make_instance('t1', 'h1'),
+            'b1': make_instance('t2', 'h2'),
+            'b2': make_instance('t2', 'h3'),
+            'b3': make_instance('t2', 'h1'),
+        }
+        sizes = {'a1': 5, 'a2': 5, 'b1': 1, 'b2': 1, 'b3': 1}
+        result = waves.plan_waves(instances, sizes, host_limit=1)
+        # b3 fits neither in the first nor in the second wave, t2 would
+        # take the first and the third one, so it starts in the second
+        self.assertEqual([['a1'], ['a2', 'b1', 'b2'], ['b3']], result)
+
+    def test_wide_waves(self):
+        # 600 instances of 30 tenants, an image per tenant, on 40 hosts
+        instances = dict(
+            ('i%03d' % i, make_instance('t%d' % (i % 30), 'h%d' % (i % 40),
+                                        'img%d' % (i % 30), ['v%d' % i],
+                                        ['net']))
+            for i in range(600))
+        result = waves.plan_waves(instances)
+        self.assertEqual(sorted(instances),
+                         sorted(i for wave in result for i in wave))
+        self.assertLessEqual(len(result), 10)
+        for wave in result:
+            hosts = [instances[i]['instance']['host'] for i in wave]
+            self.assertLessEqual(max(hosts.count(h) for h in hosts), 2)
+        for tenant in range(30):
+            taken = [n for n, wave in enumerate(result)
+                     if any(instances[i]['instance']['tenant_id'] ==
+                            't%d' % tenant for i in wave)]
+            self.assertEqual(range(taken[0], taken[-1] + 1), taken)
+
+    def test_max_size(self):
+        instances = dict(('i%d' % i, make_instance('t1', 'h%d' % i))
+                         for i in range(5))
+        self.assertEqual([['i0', 'i1'], ['i2', 'i3'], ['i4']],
+                         waves.plan_waves(instances, max_size=2))
+
+    def test_conflicts(self):
+        instances = {
+            'a1': make_instance('t1', 'h1', volumes=['v1']),
+            'a2': make_instance('t1', 'h2', volumes=['v1']),
+        }
+        self.assertEqual([['a1', 'a2']],
+                         waves.plan_waves(instances, conflicts=()))
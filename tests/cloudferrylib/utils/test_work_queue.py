@@ -0,0 +1,86 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+
+import mock
+
+from cloudferrylib.utils import work_queue
+from tests import test
+
+
+class WorkQueueTestCase(test.TestCase):
+    def setUp(self):
+        super(WorkQueueTestCase, self).setUp()
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        self.queue = work_queue.WorkQueue(os.path.join(path, 'queue.db'))
+
+    def test_claim(self):
+        self.queue.put('id1', {'name': 'vm1'}, 'instances')
+        self.queue.put('id2', {'name': 'vm2'}, 'instances')
+        job = self.queue.claim('w1')
+        self.assertEqual(('id1', 'instances', {'name': 'vm1'}, 'w1'),
+                         (job.key, job.kind, job.payload, job.worker))
+        self.assertEqual('id2', self.queue.claim('w2').key)
+        self.assertIsNone(self.queue.claim('w3'))
+        self.assertEqual({'running': 2}, self.queue.counts())
+
+    def test_collect(self):
+        self.queue.put('id1', {})
+        self.queue.put('id2', {})
+        self.queue.claim('w1')
+        self.queue.claim('w1')
+        self.queue.done('id1', {'instances': {'id1': {}}})
+        self.queue.fail('id2', 'ValueError: broken')
+        jobs = sorted(self.queue.collect())
+        self.assertEqual([('id1', 'done', {'instances': {'id1': {}}}, None),
+                          ('id2', 'failed', None, 'ValueError: broken')],
+                         [(j.key, j.state, j.result, j.error) for j in jobs])
+        self.assertEqual([], self.queue.collect())
+
+    def test_seal_and_reset(self):
+        self.assertFalse(self.queue.is_sealed())
+        self.queue.put('id1', {})
+        self.queue.seal()
+        self.assertTrue(self.queue.is_sealed())
+        self.queue.reset()
+        self.assertFalse(self.queue.is_sealed())
+        self.assertIsNone(self.queue.claim('w1'))
+
+    @mock.patch('cloudferrylib.utils.work_queue.time.time')
+    def test_lease(self, mock_time):
+        self.queue.lease = 10
+        mock_time.return_value = 100
+        self.queue.put('id1', {})
+        self.queue.claim('w1')
+        mock_time.return_value = 105
+        self.assertIsNone(self.queue.claim('w2'))
+        mock_time.return_value = 111
+        self.assertEqual('w2', self.queue.claim('w2').worker)
+
+    @mock.patch('cloudferrylib.utils.work_queue.time.time')
+    def test_renew(self, mock_time):
+        self.queue.lease = 10
+        mock_time.return_value = 100
+        self.queue.put('id1', {})
+        self.queue.claim('w1')
+        mock_time.return_value = 108
+        self.queue.renew('id1', 'w1')
+        self.assertEqual(108, self.queue.last_update())
+        mock_time.return_value = 111
+        self.assertIsNone(self.queue.claim('w2'))
@@ -13,6 +13,17 @@
 # limitations under the License.
 
 
+from benchmark import *
+from coroutine import *
 from cursor import *
+from dag_scheduler import *
+from dependencies import *
+from journal import *
+from namespace import *
+from pool import *
+from registry import *
+from retry import *
+from scenario import *
 from scheduler import *
 from task import *
+from thread_tasks import *
@@ -0,0 +1,171 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+"""
+Overhead of the scheduler itself on synthetic nets of no-op tasks:
+
+    python -m tests.scheduler.benchmark [size ...]
+"""
+
+import gc
+import logging
+import resource
+import sys
+import time
+
+from cloudferrylib.scheduler import cursor
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import scenario
+from cloudferrylib.scheduler import scheduler
+from cloudferrylib.scheduler import task
+from tests import test
+
+
+SIZES = [1000, 10000, 100000]
+
+
+class NoopTask(task.Task):
+    runs = 0
+
+    def run(self, **kwargs):
+        NoopTask.runs += 1
+
+
+class SwitchTask(task.Task):
+    """ Every other switch takes the alternative path """
+
+    count = 0
+
+    def __init__(self):
+        SwitchTask.count += 1
+        self.path = SwitchTask.count % 2
+        super(SwitchTask, self).__init__()
+
+    def run(self, **kwargs):
+        self.set_next_path(self.path)
+
+
+def build_net(size, branch_every=10, thread_every=10):
+    """
+    Chain of about size tasks with a branch (switch | alternative) and a
+    thread (task & task) every branch_every and thread_every tasks.
+    """
+
+    first = prev = NoopTask()
+    count = 1
+    while count < size:
+        if branch_every and count % branch_every == 0:
+            switch, alternative, join = SwitchTask(), NoopTask(), NoopTask()
+            alternative - join
+            prev = prev >> (switch | alternative) >> join
+            count += 3
+        elif thread_every and count % thread_every == thread_every / 2:
+            elem = NoopTask()
+            elem & NoopTask()
+            prev = prev >> elem
+            count += 2
+        else:
+            prev = prev >> NoopTask()
+            count += 1
+    return first
+
+
+def bench_cursor(size):
+    net = build_net(size)
+    return sum(1 for _ in cursor.Cursor(net))
+
+
+def bench_scheduler(size):
+    s = scheduler.Scheduler(namespace=namespace.Namespace(),
+                            cursor=cursor.Cursor(build_net(size)))
+    runs = NoopTask.runs
+    s.start()
+    if s.status_error == scheduler.ERROR:
+        raise s.exception
+    return NoopTask.runs - runs
+
+
+def bench_fork(size, variables=100):
+    ns = namespace.Namespace(dict(('v%d' % i, i) for i in xrange(variables)))
+    for i in xrange(size):
+        child = ns.fork()
+        child.vars['v%d' % (i % variables)] += 1
+        child.vars['x'] = i
+        ns.merge(child)
+    return size
+
+
+def bench_construct_net(size):
+    names = ['t%d' % i for i in xrange(size)]
+    tasks = dict((name, NoopTask()) for name in names)
+    process = [{name: True} for name in names]
+    scenario.Scenario(cache_path='').construct_net(process, tasks)
+    return size
+
+
+BENCHMARKS = [
+    ('Cursor', bench_cursor),
+    ('BaseScheduler.start', bench_scheduler),
+    ('Namespace.fork', bench_fork),
+    ('Scenario.construct_net', bench_construct_net),
+]
+
+
+def measure(func, size):
+    """ Getting (tasks, seconds, growth of max RSS in KB) of the run """
+
+    gc.collect()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    done = func(size)
+    seconds = time.time() - start
+    return (done, seconds,
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss)
+
+
+def run(sizes=SIZES):
+    results = []
+    for name, func in BENCHMARKS:
+        for size in sizes:
+            results.append((name, size) + measure(func, size))
+    return results
+
+
+def report(results):
+    line = "%-24s %8s %8s %10s %12s %10s\n"
+    lines = [line % ('Benchmark', 'Size', 'Tasks', 'Seconds', 'Tasks/s',
+                     'RSS, KB')]
+    for name, size, done, seconds, rss in results:
+        lines.append(line % (name, size, done, '%.3f' % seconds,
+                             '%.0f' % (done / seconds if seconds else 0),
+                             rss))
+    return ''.join(lines)
+
+
+class BenchmarkTestCase(test.TestCase):
+    def test_run(self):
+        results = run([100])
+        self.assertEqual(len(BENCHMARKS), len(results))
+        self.assertIn('BaseScheduler.start', report(results))
+
+    def test_build_net(self):
+        visited = bench_cursor(100)
+        self.assertTrue(0 < visited <= 100)
+        self.assertTrue(0 < bench_scheduler(100) <= 100)
+
+
+if __name__ == '__main__':
+    # logging of every task to the console would be measured otherwise
+    scheduler.LOG.setLevel(logging.WARNING)
+    sys.stdout.write(report(run([int(s) for s in sys.argv[1:]] or SIZES)))
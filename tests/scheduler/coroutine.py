@@ -0,0 +1,143 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import threading
+import time
+
+from cloudferrylib.scheduler import coroutine
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import task
+from tests import test
+
+
+def slow_double(x, delay=0.1):
+    time.sleep(delay)
+    return threading.current_thread().name, x * 2
+
+
+def fail(msg):
+    raise ValueError(msg)
+
+
+class Resource(object):
+    def double(self, x):
+        return x * 2
+
+
+def doubles(xs):
+    results = yield [coroutine.call(slow_double, x) for x in xs]
+    raise coroutine.Return([r for _, r in results])
+
+
+class EventLoopTestCase(test.TestCase):
+    def setUp(self):
+        super(EventLoopTestCase, self).setUp()
+        self.loop = coroutine.EventLoop(10)
+
+    def tearDown(self):
+        self.loop.close()
+        super(EventLoopTestCase, self).tearDown()
+
+    def test_calls_run_together(self):
+        start = time.time()
+        self.assertEqual(range(0, 20, 2), self.loop.run(doubles(range(10))))
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_nested_coroutines(self):
+        def outer():
+            first = yield doubles([1, 2])
+            second = yield [doubles([3]), doubles([4])]
+            raise coroutine.Return(first + second)
+
+        self.assertEqual([2, 4, [6], [8]], self.loop.run(outer()))
+
+    def test_exception(self):
+        def catch():
+            try:
+                yield coroutine.call(fail, 'failed')
+            except ValueError as e:
+                raise coroutine.Return(str(e))
+
+        self.assertEqual('failed', self.loop.run(catch()))
+        self.assertRaises(ValueError, self.loop.run,
+                          [coroutine.call(slow_double, 1),
+                           coroutine.call(fail, 'failed')])
+
+    def test_exclusive_calls(self):
+        results = self.loop.run([coroutine.remote(slow_double, x, 0)
+                                 for x in range(5)])
+        self.assertEqual(1, len(set(name for name, _ in results)))
+
+    def test_adapter(self):
+        adapter = coroutine.Adapter(Resource())
+        self.assertEqual([2, 4], self.loop.run([adapter.double(1),
+                                                adapter.double(2)]))
+
+    def test_wrong_yield(self):
+        def wrong():
+            yield 1
+
+        self.assertRaises(TypeError, self.loop.run, wrong())
+
+
+class NestedRunTestCase(test.TestCase):
+    def setUp(self):
+        super(NestedRunTestCase, self).setUp()
+        coroutine.init(4)
+        self.addCleanup(coroutine.init, None)
+
+    def run_in_thread(self, func):
+        results = []
+
+        def target():
+            results.append(func())
+            coroutine.get_loop().close()
+
+        thread = threading.Thread(target=target)
+        thread.daemon = True
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive(), "the loop hangs")
+        return results[0]
+
+    def test_run_in_calls(self):
+        def nested(x):
+            return coroutine.run(doubles([x, x]))
+
+        self.assertEqual(
+            [[x * 2, x * 2] for x in range(30)],
+            self.run_in_thread(lambda: coroutine.run(
+                [coroutine.call(nested, x) for x in range(30)])))
+
+    def test_run_in_coroutine(self):
+        def outer():
+            first = coroutine.run(doubles([1]))
+            second = yield doubles([2])
+            raise coroutine.Return(first + second)
+
+        self.assertEqual([2, 4], self.run_in_thread(
+            lambda: coroutine.run(outer())))
+
+
+class CoroutineTask(task.Task):
+    def run(self, xs=(), **kwargs):
+        result = yield doubles(xs)
+        raise coroutine.Return({'doubles': result})
+
+
+class CoroutineTaskTestCase(test.TestCase):
+    def test_run(self):
+        ns = namespace.Namespace({'xs': [1, 2, 3]})
+        CoroutineTask()(namespace=ns)
+        self.assertEqual([2, 4, 6], ns.vars['doubles'])
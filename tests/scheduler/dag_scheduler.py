@@ -0,0 +1,172 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+
+import os
+import time
+
+import mock
+
+from cloudferrylib.scheduler import coroutine
+from cloudferrylib.scheduler import cursor
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import retry
+from cloudferrylib.scheduler import scheduler
+from cloudferrylib.scheduler import task
+from tests import test
+from tests.scheduler import retry as retry_tests
+
+
+class PidTask(task.Task):
+    def __init__(self, name):
+        self.name = name
+        super(PidTask, self).__init__()
+
+    def run(self, **kwargs):
+        return {self.name: os.getpid()}
+
+
+class CoroutinePidTask(PidTask):
+    def run(self, **kwargs):
+        pid = yield coroutine.call(os.getpid)
+        raise coroutine.Return({self.name: pid})
+
+
+class SlowPidTask(PidTask):
+    def run(self, **kwargs):
+        time.sleep(0.3)
+        return super(SlowPidTask, self).run(**kwargs)
+
+
+class BranchTask(task.Task):
+    def run(self, **kwargs):
+        self.set_next_path(1)
+
+
+class FailTask(task.Task):
+    def run(self, **kwargs):
+        raise ValueError('fail')
+
+
+class DagSchedulerTestCase(test.TestCase):
+    def start(self, net, workers=2):
+        ns = namespace.Namespace({})
+        s = scheduler.DagScheduler(namespace=ns,
+                                   cursor=cursor.Cursor(net),
+                                   workers=workers)
+        s.start()
+        return s, ns.vars
+
+    def test_independent_tasks_run_in_workers(self):
+        a = PidTask('a')
+        b = PidTask('b').depends_on(a)
+        c = PidTask('c').depends_on(a)
+        d = PidTask('d')
+        s, res = self.start(a >> b >> c >> d)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(os.getpid(), res['a'])
+        self.assertEqual(os.getpid(), res['d'])
+        self.assertNotEqual(os.getpid(), res['b'])
+        self.assertNotEqual(os.getpid(), res['c'])
+
+    def test_get_window(self):
+        a = PidTask('a')
+        b = PidTask('b').depends_on(a)
+        c = PidTask('c')
+        d = PidTask('d').depends_on(a)
+        a >> b >> c >> d
+        s = scheduler.DagScheduler(workers=2)
+        self.assertEqual([a, b], s.get_window(a))
+        self.assertEqual([c, d], s.get_window(c))
+        self.assertEqual([set(), set([0])], s.get_depends([a, b]))
+        self.assertEqual([set(), set()], s.get_depends([c, d]))
+
+    def test_without_depends_tasks_run_in_parent(self):
+        a = PidTask('a')
+        b = PidTask('b')
+        s, res = self.start(a >> b)
+        self.assertEqual(os.getpid(), res['a'])
+        self.assertEqual(os.getpid(), res['b'])
+
+    def test_branch(self):
+        a = PidTask('a')
+        br = BranchTask()
+        b = PidTask('b')
+        c = PidTask('c').depends_on(b)
+        d = PidTask('d').depends_on(b)
+        e = PidTask('e')
+        b >> c >> d
+        d - e
+        a >> (br | b) >> e
+        s, res = self.start(a)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertIn('b', res)
+        self.assertNotEqual(os.getpid(), res['c'])
+        self.assertNotEqual(os.getpid(), res['d'])
+        self.assertIn('e', res)
+
+    def test_failed_task(self):
+        a = PidTask('a')
+        b = FailTask().depends_on(a)
+        c = PidTask('c').depends_on(a)
+        d = PidTask('d')
+        s, res = self.start(a >> b >> c >> d)
+        self.assertEqual(scheduler.ERROR, s.status_error)
+        self.assertIsInstance(s.exception, ValueError)
+        self.assertNotIn('d', res)
+
+    def test_failed_task_in_window(self):
+        a = PidTask('a')
+        b = SlowPidTask('b').depends_on(a)
+        c = FailTask().depends_on(a)
+        s, res = self.start(a >> b >> c)
+        self.assertEqual(scheduler.ERROR, s.status_error)
+        self.assertIs(c, s.failed_task)
+        # the running sibling is finished, not killed
+        self.assertIn('b', res)
+
+    def test_error_handler_of_failed_task_in_window(self):
+        handler = PidTask('handler')
+        a = PidTask('a')
+        b = SlowPidTask('b').depends_on(a)
+        c = FailTask().depends_on(a).on_error(handler)
+        d = PidTask('d')
+        handler - d
+        s, res = self.start(a >> b >> c >> d)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertIn('handler', res)
+        self.assertIn('d', res)
+        self.assertIn('FailTask', res[namespace.ERROR_INFO]['task'])
+
+    def test_coroutine_tasks_in_workers(self):
+        a = CoroutinePidTask('a')
+        b = CoroutinePidTask('b').depends_on(a)
+        c = CoroutinePidTask('c').depends_on(a)
+        s, res = self.start(a >> b >> c)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(os.getpid(), res['a'])
+        self.assertNotEqual(os.getpid(), res['b'])
+        self.assertNotEqual(os.getpid(), res['c'])
+
+    @mock.patch('cloudferrylib.scheduler.retry.time.sleep')
+    def test_retry_in_workers(self, sleep):
+        a = PidTask('a')
+        b = retry_tests.FlakyTask('b', 1).depends_on(a)
+        c = retry_tests.FlakyTask('c', 1).depends_on(a)
+        b.with_retry(retry.RetryPolicy(count=1))
+        c.with_retry(retry.RetryPolicy(count=1))
+        s, res = self.start(a >> b >> c)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(2, res['b'])
+        self.assertEqual(2, res['c'])
@@ -0,0 +1,148 @@
+# Copyright 2014: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+import os
+
+from cloudferrylib.scheduler import coroutine
+from cloudferrylib.scheduler import cursor
+from cloudferrylib.scheduler import dependencies
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import scheduler
+from cloudferrylib.scheduler import task
+from cloudferrylib.scheduler import thread_tasks
+from tests import test
+
+
+class ReadWriteTask(task.Task):
+    def __init__(self, src, dst):
+        self.src = src
+        self.dst = dst
+        super(ReadWriteTask, self).__init__()
+
+    def run(self, **kwargs):
+        return {self.dst: (kwargs.get(self.src), os.getpid())}
+
+
+class NamedArgsTask(task.Task):
+    def run(self, info=None, **kwargs):
+        if kwargs['flag']:
+            return
+        return {'result': info, 'pid': os.getpid()}
+
+
+class AnyReadTask(task.Task):
+    def run(self, **kwargs):
+        return {'copy': dict(kwargs)}
+
+
+class AnyWriteTask(task.Task):
+    def run(self, **kwargs):
+        return dict(a=kwargs['a'])
+
+
+class CoroutineTask(task.Task):
+    def run(self, **kwargs):
+        yield coroutine.call(len, kwargs['a'])
+        raise coroutine.Return({'b': 1})
+
+
+class DeclaredTask(AnyWriteTask):
+    reads = ['x']
+    writes = ['y']
+
+
+class DependenciesTestCase(test.TestCase):
+    def test_instance_keys(self):
+        self.assertEqual((set(['a']), set(['b'])),
+                         dependencies.get_reads_writes(ReadWriteTask('a', 'b')))
+
+    def test_named_args(self):
+        self.assertEqual((set(['info', 'flag']), set(['result', 'pid'])),
+                         dependencies.get_reads_writes(NamedArgsTask()))
+
+    def test_unknown(self):
+        self.assertEqual((None, set(['copy'])),
+                         dependencies.get_reads_writes(AnyReadTask()))
+        self.assertEqual((set(['a']), None),
+                         dependencies.get_reads_writes(AnyWriteTask()))
+
+    def test_coroutine(self):
+        self.assertEqual((set(['a']), set(['b'])),
+                         dependencies.get_reads_writes(CoroutineTask()))
+
+    def test_declared(self):
+        self.assertEqual((set(['x']), set(['y'])),
+                         dependencies.get_reads_writes(DeclaredTask()))
+
+    def test_infer_depends(self):
+        window = [ReadWriteTask('a', 'b'),
+                  ReadWriteTask('a', 'c'),
+                  ReadWriteTask('b', 'd'),
+                  ReadWriteTask('e', 'a'),
+                  AnyReadTask()]
+        self.assertEqual([set(), set(), set([0]), set([0, 1]),
+                          set([0, 1, 2, 3])],
+                         dependencies.infer_depends(window))
+
+    def test_report(self):
+        net = ReadWriteTask('a', 'b') >> ReadWriteTask('a', 'c')
+        report = dependencies.report(net)
+        self.assertIn("0 ReadWriteTask, 1 ReadWriteTask", report)
+
+    def test_auto_parallel(self):
+        ns = namespace.Namespace({'a': 1})
+        net = (ReadWriteTask('a', 'b') >> ReadWriteTask('a', 'c') >>
+               ReadWriteTask('b', 'd'))
+        s = scheduler.DagScheduler(namespace=ns, cursor=cursor.Cursor(net),
+                                   workers=2, auto_parallel=True)
+        s.start()
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(1, ns.vars['b'][0])
+        self.assertEqual(1, ns.vars['c'][0])
+        self.assertEqual(ns.vars['b'], ns.vars['d'][0])
+        self.assertNotEqual(os.getpid(), ns.vars['b'][1])
+        self.assertNotEqual(os.getpid(), ns.vars['c'][1])
+
+    def test_side_effects(self):
+        class StopTask(task.Task):
+            def run(self, info=None, **kwargs):
+                pass
+
+        self.assertEqual((set(['info']), set(['info'])),
+                         dependencies.get_reads_writes(StopTask()))
+
+    def test_wait_thread_is_barrier(self):
+        wait = thread_tasks.WaitThreadAllTask()
+        self.assertEqual((None, None), dependencies.get_reads_writes(wait))
+        window = [ReadWriteTask('a', 'b'), wait, ReadWriteTask('x', 'y')]
+        self.assertEqual([set(), set([0]), set([1])],
+                         dependencies.infer_depends(window))
+        s = scheduler.DagScheduler(workers=2, auto_parallel=True)
+        self.assertFalse(s.is_plain(wait))
+
+    def test_auto_parallel_waits_for_threads(self):
+        ns = namespace.Namespace({'a': 1})
+        a = ReadWriteTask('a', 'b')
+        a & thread_tasks.WrapThreadTask(ReadWriteTask('a', 'x'))
+        net = (a >> thread_tasks.WaitThreadAllTask() >>
+               ReadWriteTask('x', 'y') >> ReadWriteTask('x', 'z'))
+        s = scheduler.DagScheduler(namespace=ns, cursor=cursor.Cursor(net),
+                                   workers=2, auto_parallel=True)
+        s.start()
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(ns.vars['x'], ns.vars['y'][0])
+        self.assertEqual(ns.vars['x'], ns.vars['z'][0])
+        self.assertEqual({}, s.child_threads)
@@ -0,0 +1,158 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+
+from cloudferrylib.scheduler import cursor
+from cloudferrylib.scheduler import journal
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import scheduler
+from cloudferrylib.scheduler import task
+from tests import test
+
+
+class FakeCloud(object):
+    def __init__(self):
+        self.resources = {'compute': object()}
+
+
+class CountTask(task.Task):
+    calls = []
+
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        super(CountTask, self).__init__()
+
+    def run(self, __init_task__=None, **kwargs):
+        CountTask.calls.append(self.name)
+        if self.fail:
+            raise RuntimeError(self.name)
+        return {self.name: __init_task__['src_cloud'].resources['compute']}
+
+
+class AddTask(task.Task):
+    def __init__(self, num, fail=False):
+        self.num = num
+        self.fail = fail
+        super(AddTask, self).__init__()
+
+    def run(self, result=None, **kwargs):
+        if self.fail:
+            raise RuntimeError(self.num)
+        if result is None:
+            return {'result': {'instances': {}}}
+        result['instances'][self.num] = {'id': self.num}
+
+
+class BranchTask(task.Task):
+    def run(self, **kwargs):
+        self.set_next_path(1)
+
+
+class JournalTestCase(test.TestCase):
+    def setUp(self):
+        super(JournalTestCase, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.path = os.path.join(self.tmp_dir, 'migrate.journal')
+        self.init = {'src_cloud': FakeCloud()}
+        CountTask.calls = []
+
+    def get_net(self, fail=False):
+        a = CountTask('a')
+        br = BranchTask()
+        b = CountTask('b')
+        c = CountTask('c', fail)
+        d = CountTask('d')
+        b - c
+        a >> (br | b) >> c >> d
+        return a
+
+    def start(self, fail=False, resume=False):
+        ns = namespace.Namespace({'__init_task__': self.init})
+        cur = cursor.Cursor(self.get_net(fail))
+        if resume:
+            journal.Journal(self.path, self.init).load(ns, cur)
+        s = scheduler.Scheduler(namespace=ns, cursor=cur)
+        s.addJournal(journal.Journal(self.path, self.init))
+        s.start()
+        return s, ns.vars
+
+    def test_resume(self):
+        s, res = self.start(fail=True)
+        self.assertEqual(scheduler.ERROR, s.status_error)
+        self.assertEqual(['a', 'b', 'c'], CountTask.calls)
+
+        CountTask.calls = []
+        s, res = self.start(resume=True)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(['c', 'd'], CountTask.calls)
+        self.assertIs(self.init['src_cloud'].resources['compute'], res['a'])
+        self.assertIs(self.init, res['__init_task__'])
+        self.assertIn('b', res)
+
+    def test_load_for_another_net(self):
+        self.start(fail=True)
+        ns = namespace.Namespace({})
+        cur = cursor.Cursor(task.Task() >> task.Task())
+        self.assertRaises(journal.JournalError,
+                          journal.Journal(self.path, self.init).load, ns, cur)
+
+    def start_adds(self, fail=False, resume=False):
+        net = AddTask(0)
+        for num in range(1, 31):
+            net = net >> AddTask(num, fail and num == 30)
+        ns = namespace.Namespace({'__init_task__': self.init})
+        cur = cursor.Cursor(net)
+        if resume:
+            journal.Journal(self.path, self.init).load(ns, cur)
+        s = scheduler.Scheduler(namespace=ns, cursor=cur)
+        s.addJournal(journal.Journal(self.path, self.init))
+        s.start()
+        return s, ns.vars
+
+    def test_resume_from_deltas(self):
+        s, _ = self.start_adds(fail=True)
+        self.assertEqual(scheduler.ERROR, s.status_error)
+        records = journal.Journal(self.path, self.init).read()
+        self.assertIn('vars', records[0])
+        self.assertNotIn('result', records[-1]['changed'])
+        self.assertEqual(({('instances', 29): {'id': 29}}, []),
+                         records[-1]['entries']['result'])
+
+        s, res = self.start_adds(resume=True)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(dict((num, {'id': num}) for num in range(1, 31)),
+                         res['result']['instances'])
+
+    def test_entries_of_changed_keys(self):
+        instances = dict((num, {'id': num}) for num in range(20))
+        ns = namespace.Namespace({'info': {'instances': instances}})
+        cur = cursor.Cursor(task.Task())
+        j = journal.Journal(self.path)
+        j.save(ns, cur)
+        info = ns.vars['info']
+        self.assertIsInstance(info['instances'], journal.Entries)
+        info['instances'].pop(0)
+        info['instances'][1] = {'id': 'new'}
+        j.save(ns, cur)
+        record = j.read()[-1]
+        self.assertEqual(({('instances', 1): {'id': 'new'}},
+                          [('instances', 0)]),
+                         record['entries']['info'])
+        self.assertFalse(info['instances'].dirty)
@@ -0,0 +1,72 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+
+from cloudferrylib.scheduler import namespace
+from tests import test
+
+
+class NamespaceTestCase(test.TestCase):
+    def setUp(self):
+        super(NamespaceTestCase, self).setUp()
+        self.info = {'instances': {'id1': {'name': 'vm1'}}}
+        self.parent = namespace.Namespace({'info': self.info, 'v1': 1})
+
+    def test_fork_sees_parent(self):
+        child = self.parent.fork()
+        self.assertIs(self.info, child.vars['info'])
+        self.assertEqual(set(['info', 'v1', namespace.CHILDREN]),
+                         set(child.vars))
+
+    def test_fork_writes_are_own(self):
+        child = self.parent.fork()
+        child.vars['v1'] = 2
+        child.vars['v2'] = 3
+        del child.vars['info']
+        self.assertEqual(1, self.parent.vars['v1'])
+        self.assertNotIn('v2', self.parent.vars)
+        self.assertIn('info', self.parent.vars)
+        self.assertNotIn('info', child.vars)
+        self.assertEqual(({'v1': 2, 'v2': 3}, set(['info'])),
+                         child.vars.changes())
+
+    def test_fork_of_fork(self):
+        child = self.parent.fork()
+        child.vars['v2'] = 2
+        grandchild = child.fork()
+        self.assertEqual(2, grandchild.vars['v2'])
+        self.assertEqual(1, grandchild.vars['v1'])
+
+    def test_deep_copy_fork(self):
+        child = self.parent.fork(is_deep_copy=True)
+        child.vars['info']['instances']['id1']['name'] = 'vm2'
+        self.assertEqual('vm1', self.info['instances']['id1']['name'])
+        self.assertEqual(({}, set()), child.vars.changes())
+
+    def test_call_with_kwargs(self):
+        child = self.parent.fork()
+        child.vars['v1'] = 5
+        func = lambda v1=None, **kwargs: v1
+        self.assertEqual(5, func(**child.vars))
+
+    def test_merge(self):
+        child = self.parent.fork()
+        child.vars.update({'v1': 2, 'v2': 3})
+        del child.vars['info']
+        self.parent.merge(child, keys=['v1', 'info'])
+        self.assertEqual(2, self.parent.vars['v1'])
+        self.assertNotIn('v2', self.parent.vars)
+        self.assertNotIn('info', self.parent.vars)
+        self.parent.merge(child)
+        self.assertEqual(3, self.parent.vars['v2'])
@@ -0,0 +1,59 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+
+import os
+
+from cloudferrylib.scheduler import pool
+from tests import test
+
+
+def fake_func(x):
+    return {'x': x, 'pid': os.getpid()}
+
+
+def fake_fail(x):
+    raise ValueError(x)
+
+
+def fake_exit(x):
+    os._exit(3)
+
+
+class ProcessPoolTestCase(test.TestCase):
+    def test_submit_and_wait(self):
+        with pool.ProcessPool(2) as workers:
+            job = workers.submit('a', fake_func, 1)
+            result = workers.wait(job)
+        self.assertEqual(1, result['x'])
+        self.assertNotEqual(os.getpid(), result['pid'])
+
+    def test_wait_all(self):
+        with pool.ProcessPool(2) as workers:
+            for i in range(5):
+                workers.submit(i, fake_func, i)
+            results = dict((job.key, job.get()['x'])
+                           for job in workers.wait_all())
+        self.assertEqual(dict((i, i) for i in range(5)), results)
+        self.assertFalse(workers.is_busy())
+
+    def test_exception_is_passed_to_parent(self):
+        with pool.ProcessPool(1) as workers:
+            job = workers.submit('a', fake_fail, 'boom')
+            self.assertRaises(ValueError, workers.wait, job)
+
+    def test_died_worker(self):
+        with pool.ProcessPool(1) as workers:
+            job = workers.submit('a', fake_exit, 1)
+            self.assertRaises(pool.WorkerError, workers.wait, job)
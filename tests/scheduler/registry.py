@@ -0,0 +1,100 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import os
+import shutil
+import sys
+import tempfile
+
+import mock
+
+from cloudferrylib.base.action import copy_var
+from cloudferrylib.scheduler import registry
+from tests import test
+
+
+class ActionRegistryTestCase(test.TestCase):
+    def setUp(self):
+        super(ActionRegistryTestCase, self).setUp()
+        self.cache = {}
+        self.registry = registry.ActionRegistry(self.cache)
+        self.registry.add_package('cloudferrylib.base.action')
+
+    def test_get_action(self):
+        self.assertIs(copy_var.CopyVar, self.registry['CopyVar'])
+        self.assertIn('CopyVar', self.registry)
+        self.assertTrue(self.registry.changed)
+
+    def test_not_action(self):
+        self.assertRaises(KeyError, lambda: self.registry['NoSuchAction'])
+
+    def test_cache_is_used(self):
+        with mock.patch.object(registry.ActionRegistry,
+                               'get_classes') as get_classes:
+            cached = registry.ActionRegistry(self.cache)
+            cached.add_package('cloudferrylib.base.action')
+        self.assertFalse(get_classes.called)
+        self.assertFalse(cached.changed)
+        self.assertIs(copy_var.CopyVar, cached['CopyVar'])
+
+    def test_changed_module_is_parsed(self):
+        modules = self.cache['cloudferrylib.base.action']
+        mtime, classes = modules['copy_var']
+        modules['copy_var'] = (mtime - 1, [])
+        modules['removed'] = (mtime, ['Removed'])
+        cached = registry.ActionRegistry(self.cache)
+        cached.add_package('cloudferrylib.base.action')
+        self.assertTrue(cached.changed)
+        self.assertEqual((mtime, classes), modules['copy_var'])
+        self.assertNotIn('removed', modules)
+        self.assertNotIn('Removed', cached)
+
+    def test_helper_class_of_same_name(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        package = os.path.join(path, 'registry_actions')
+        os.mkdir(package)
+        with open(os.path.join(package, '__init__.py'), 'w'):
+            pass
+        with open(os.path.join(package, 'a_helper.py'), 'w') as f:
+            f.write("class Same(object):\n"
+                    "    pass\n")
+        with open(os.path.join(package, 'b_action.py'), 'w') as f:
+            f.write("from cloudferrylib.base.action import action\n"
+                    "class Same(action.Action):\n"
+                    "    pass\n")
+        sys.path.insert(0, path)
+        self.addCleanup(sys.path.remove, path)
+        self.registry.add_package('registry_actions')
+        self.assertEqual('registry_actions.b_action',
+                         self.registry['Same'].__module__)
+        self.assertEqual(['registry_actions.b_action'],
+                         self.registry.index['Same'])
+
+
+class GetClassesTestCase(test.TestCase):
+    def test_get_classes(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        file_path = os.path.join(path, 'mod.py')
+        with open(file_path, 'w') as f:
+            f.write("class A(object):\n"
+                    "    class Inner(object):\n"
+                    "        pass\n"
+                    "def b():\n"
+                    "    pass\n"
+                    "class C(A):\n"
+                    "    pass\n")
+        self.assertEqual(['A', 'C'],
+                         registry.ActionRegistry.get_classes(file_path))
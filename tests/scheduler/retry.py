@@ -0,0 +1,98 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import mock
+
+from cloudferrylib.scheduler import cursor
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import retry
+from cloudferrylib.scheduler import scheduler
+from cloudferrylib.scheduler import task
+from tests import test
+
+
+class FlakyTask(task.Task):
+    def __init__(self, name, failures, error=IOError):
+        self.name = name
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+        super(FlakyTask, self).__init__()
+
+    def run(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error('flaky')
+        return {self.name: self.calls}
+
+
+@mock.patch('cloudferrylib.scheduler.retry.time.sleep')
+class RetryPolicyTestCase(test.TestCase):
+    def test_retry(self, sleep):
+        t = FlakyTask('a', 2)
+        policy = retry.RetryPolicy(count=3, backoff=1, factor=3,
+                                   max_backoff=2)
+        self.assertEqual({'a': 3}, policy.call(t.run))
+        self.assertEqual([mock.call(1), mock.call(2)], sleep.call_args_list)
+
+    def test_too_many_failures(self, sleep):
+        t = FlakyTask('a', 3)
+        policy = retry.RetryPolicy(count=2)
+        self.assertRaises(IOError, policy.call, t.run)
+        self.assertEqual(3, t.calls)
+
+    def test_not_retried_exception(self, sleep):
+        t = FlakyTask('a', 1, error=ValueError)
+        policy = retry.RetryPolicy(count=2, exceptions=[IOError])
+        self.assertRaises(ValueError, policy.call, t.run)
+        self.assertEqual(1, t.calls)
+
+
+@mock.patch('cloudferrylib.scheduler.retry.time.sleep')
+class SchedulerErrorsTestCase(test.TestCase):
+    def start(self, net):
+        ns = namespace.Namespace({})
+        s = scheduler.Scheduler(namespace=ns, cursor=cursor.Cursor(net))
+        s.start()
+        return s, ns.vars
+
+    def test_task_retry(self, sleep):
+        a = FlakyTask('a', 1).with_retry(retry.RetryPolicy(count=1))
+        s, res = self.start(a >> FlakyTask('b', 0))
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(2, res['a'])
+        self.assertEqual(1, res['b'])
+
+    def test_on_error(self, sleep):
+        handler = FlakyTask('handler', 0)
+        b = FlakyTask('b', 1, error=ValueError).on_error(handler)
+        d = FlakyTask('d', 0)
+        handler - d
+        s, res = self.start(FlakyTask('a', 0) >> b >> FlakyTask('c', 0) >> d)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(['a', 'd', 'handler'],
+                         sorted(k for k in res if not k.startswith('__')))
+        self.assertEqual('ValueError: flaky',
+                         res[namespace.ERROR_INFO]['error'])
+
+    def test_without_on_error(self, sleep):
+        b = FlakyTask('b', 1, error=ValueError)
+        s, res = self.start(FlakyTask('a', 0) >> b >> FlakyTask('c', 0))
+        self.assertEqual(scheduler.ERROR, s.status_error)
+        self.assertNotIn('c', res)
+
+    def test_handler_in_elements(self, sleep):
+        handler = FlakyTask('handler', 0)
+        a = FlakyTask('a', 0).on_error(handler)
+        self.assertIn(handler, cursor.Cursor.elements(a))
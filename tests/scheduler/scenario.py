@@ -0,0 +1,177 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+
+import mock
+
+from cloudferrylib.base.action import quarantine
+from cloudferrylib.scheduler import scenario
+from cloudferrylib.scheduler import task
+from tests import test
+
+
+class ScenarioTestCase(test.TestCase):
+    def setUp(self):
+        super(ScenarioTestCase, self).setUp()
+        self.tasks = dict((name, task.Task())
+                          for name in ['t1', 't2', 't3', 't4'])
+        self.process = [
+            {'t1': True},
+            {'group': [
+                {'t2': True},
+                {'t3': True}]},
+            {'t4': True}]
+
+    def test_get_groups(self):
+        groups = scenario.Scenario().get_groups(self.process)
+        self.assertEqual(['t2', 't3'], groups['group'])
+        self.assertEqual(['t4'], groups['t4'])
+
+    def test_construct_depends(self):
+        scenario.Scenario().construct_depends(self.process,
+                                              {'group': ['t1']},
+                                              self.tasks)
+        self.assertIs(self.tasks['t1'], self.tasks['t2'].depends[0])
+        self.assertIs(self.tasks['t2'], self.tasks['t3'].depends[0])
+        self.assertIsNone(self.tasks['t4'].depends)
+
+    def test_retry_from_config(self):
+        s = scenario.Scenario()
+        s.cfg = mock.Mock(**{'migrate.task_retry': 2,
+                             'migrate.task_retry_backoff': 1})
+        s.construct_retry(self.process, {'group': {}}, self.tasks)
+        policy = self.tasks['t2'].retry_policy
+        self.assertEqual((2, 1), (policy.count, policy.backoff))
+        self.assertIsNone(self.tasks['t4'].retry_policy)
+
+    def test_no_retry_from_config(self):
+        s = scenario.Scenario()
+        s.cfg = mock.Mock(**{'migrate.task_retry': 0,
+                             'migrate.task_retry_backoff': 1})
+        s.construct_retry(self.process, {'group': {}}, self.tasks)
+        self.assertIsNone(self.tasks['t2'].retry_policy)
+
+    def test_quarantine_off(self):
+        s = scenario.Scenario()
+        s.cfg = mock.Mock(**{'migrate.quarantine_instances': False})
+        self.tasks['q'] = quarantine.Quarantine({})
+        s.construct_on_error(self.process, {'group': ['q', 't4']},
+                             self.tasks)
+        self.assertIsNone(self.tasks['t2'].error_handler)
+        s.cfg.migrate.quarantine_instances = True
+        s.construct_on_error(self.process, {'group': ['q', 't4']},
+                             self.tasks)
+        self.assertIs(self.tasks['q'], self.tasks['t2'].error_handler)
+
+
+class ScenarioCacheTestCase(test.TestCase):
+    def setUp(self):
+        super(ScenarioCacheTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.path_tasks = os.path.join(self.path, 'tasks.yaml')
+        with open(self.path_tasks, 'w') as f:
+            f.write("paths: ['cloudferrylib.base.action']\n"
+                    "tasks:\n"
+                    "  copy: ['CopyVar', 'a', 'b']\n")
+
+    def test_init_tasks(self):
+        s = scenario.Scenario(path_tasks=self.path_tasks)
+        s.init_tasks({})
+        self.assertEqual('CopyVar', s.tasks['copy'].__class__.__name__)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.path, scenario.CACHE_NAME)))
+
+    def test_yaml_from_cache(self):
+        scenario.Scenario(path_tasks=self.path_tasks).init_tasks({})
+        s = scenario.Scenario(path_tasks=self.path_tasks)
+        with mock.patch.object(scenario.yaml, 'load') as load:
+            s.init_tasks({})
+        self.assertFalse(load.called)
+        self.assertFalse(s.cache_changed)
+
+    def test_changed_yaml(self):
+        s = scenario.Scenario(path_tasks=self.path_tasks)
+        s.init_tasks({})
+        with open(self.path_tasks, 'a') as f:
+            f.write("  copy2: ['CopyVar', 'b', 'c']\n")
+        s = scenario.Scenario(path_tasks=self.path_tasks)
+        s.init_tasks({})
+        self.assertIn('copy2', s.tasks)
+
+
+class ScenarioParallelTestCase(test.TestCase):
+    def setUp(self):
+        super(ScenarioParallelTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.path_tasks = os.path.join(self.path, 'tasks.yaml')
+        self.path_scenario = os.path.join(self.path, 'migrate.yaml')
+        with open(self.path_tasks, 'w') as f:
+            f.write("paths: ['cloudferrylib.base.action']\n"
+                    "tasks:\n"
+                    "  t1: ['CopyVar', 'a', 'b']\n"
+                    "  t2: ['CopyVar', 'b', 'c']\n"
+                    "  t3: ['CopyVar', 'c', 'd']\n"
+                    "  iter: ['ParallelIter', 'group']\n"
+                    "  pipeline: ['PipelineIter', ['t2', 't3']]\n")
+        with open(self.path_scenario, 'w') as f:
+            f.write("namespace: {}\n"
+                    "parallel:\n"
+                    "  group: [pipeline, iter]\n"
+                    "process:\n"
+                    "  - t1: True\n"
+                    "  - group:\n"
+                    "      - t2: True\n"
+                    "      - t3: True\n")
+        self.cfg = mock.Mock(**{'migrate.instances_workers': 2,
+                                'migrate.instances_pipeline': False,
+                                'migrate.pipeline_queue_size': 1,
+                                'migrate.migration_order': 'fifo',
+                                'migrate.task_retry': 0})
+
+    def get_scenario(self):
+        s = scenario.Scenario(path_tasks=self.path_tasks,
+                              path_scenario=self.path_scenario)
+        s.init_tasks({'cfg': self.cfg})
+        s.load_scenario()
+        return s
+
+    def test_parallel(self):
+        s = self.get_scenario()
+        net = s.get_net()
+        self.assertIs(s.tasks['t1'], net.go_start())
+        self.assertIs(s.tasks['iter'], net.go_end())
+        group = s.tasks['iter'].net_factory()
+        self.assertEqual(['b', 'c'], [group.go_start().original_info_name,
+                                      group.go_end().original_info_name])
+        self.assertIsNot(group, s.tasks['iter'].net_factory())
+
+    def test_not_parallel(self):
+        self.cfg.migrate.instances_workers = 1
+        s = self.get_scenario()
+        net = s.get_net()
+        self.assertIs(s.tasks['t3'], net.go_end())
+
+    def test_pipeline(self):
+        self.cfg.migrate.instances_pipeline = True
+        s = self.get_scenario()
+        self.assertIs(s.tasks['pipeline'], s.get_net().go_end())
+        stages = [stage() for stage in s.tasks['pipeline'].stages]
+        self.assertEqual(['b', 'c'],
+                         [stage.original_info_name for stage in stages])
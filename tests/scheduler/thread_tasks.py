@@ -0,0 +1,90 @@
+# Copyright (c) 2014 Mirantis Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the License);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an AS IS BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and#
+# limitations under the License.
+
+import os
+
+from cloudferrylib.scheduler import cursor
+from cloudferrylib.scheduler import namespace
+from cloudferrylib.scheduler import scheduler
+from cloudferrylib.scheduler import task
+from cloudferrylib.scheduler import thread_tasks
+from tests import test
+
+
+class PidTask(task.Task):
+    def __init__(self, name):
+        self.name = name
+        super(PidTask, self).__init__()
+
+    def run(self, **kwargs):
+        return {self.name: os.getpid()}
+
+
+class CopyTask(task.Task):
+    def run(self, b=None, **kwargs):
+        return {'copy_b': b}
+
+
+class FailTask(task.Task):
+    def run(self, **kwargs):
+        raise ValueError('fail')
+
+
+class ThreadTasksTestCase(test.TestCase):
+    def start(self, net, thread_workers=0):
+        ns = namespace.Namespace({})
+        s = scheduler.Scheduler(namespace=ns,
+                                cursor=cursor.Cursor(net),
+                                thread_workers=thread_workers)
+        s.start()
+        return s, ns.vars
+
+    def test_wait_merges_result(self):
+        a = PidTask('a')
+        tt = thread_tasks.WrapThreadTask(PidTask('b'))
+        a & tt
+        s, res = self.start(a >> thread_tasks.WaitThreadTask(tt) >>
+                            CopyTask())
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertEqual(os.getpid(), res['a'])
+        self.assertNotEqual(os.getpid(), res['b'])
+        self.assertEqual(res['b'], res['copy_b'])
+
+    def test_wait_all(self):
+        a = PidTask('a')
+        a & thread_tasks.WrapThreadTask(PidTask('b'))
+        a & thread_tasks.WrapThreadTask(PidTask('c'))
+        s, res = self.start(a >> thread_tasks.WaitThreadAllTask(),
+                            thread_workers=1)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertNotEqual(os.getpid(), res['b'])
+        self.assertNotEqual(os.getpid(), res['c'])
+        self.assertEqual({}, s.child_threads)
+
+    def test_children_waited_at_end(self):
+        a = PidTask('a')
+        a & thread_tasks.WrapThreadTask(PidTask('b'))
+        s, res = self.start(a)
+        self.assertEqual(scheduler.NO_ERROR, s.status_error)
+        self.assertIn('b', res)
+
+    def test_exception_of_child(self):
+        a = PidTask('a')
+        tt = thread_tasks.WrapThreadTask(FailTask())
+        a & tt
+        s, res = self.start(a >> thread_tasks.WaitThreadTask(tt) >>
+                            PidTask('c'))
+        self.assertEqual(scheduler.ERROR, s.status_error)
+        self.assertIsInstance(s.exception, ValueError)
+        self.assertNotIn('c', res)